@@ -0,0 +1,239 @@
+"""Importable entry point for comparing basket prices.
+
+    comparison = compare("ז'בוטינסקי 2, רמת גן", [("כוסמת 500 גרם", True), ("שוקולית 500 גרם", False)])
+    async for ranking in comparison:
+        ...  # a provisional Ranking after every finished search
+    result = await comparison.result()
+
+compare_batch() runs many addresses and shopping lists at once, sending each distinct upstream request once.
+Nothing is printed, written to disk or opened. Progress and failures go to the 'wolt_groceries' logger.
+"""
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+from infrastructure.disk_cache import DiskCache, save_in_background
+from infrastructure.geocoder import Geocoder, GEOCODE_CACHE_TTL
+from infrastructure.http_client import HttpClient
+from infrastructure.search_cache import SearchCache, WOLT_SEARCH_TTL, CHP_SEARCH_TTL
+from infrastructure.chp_client import ChpClient, BARCODE_CACHE_TTL
+from infrastructure.wolt_client import WoltClient, VENUE_DETAILS_TTL
+from infrastructure.single_flight import SingleFlight
+from infrastructure.price_stats_cache import PriceStatsCache
+from services.chp_service import ChpService
+from services.search_pipeline import SearchPipeline
+from services.wolt_service import WoltService
+from utils.ranking import Ranking
+from utils.split_basket import SplitBasket, MAX_VENUES
+
+# Searches still running this many seconds into the comparison are dropped and reported as timed out
+DEFAULT_TIMEOUT = 30
+
+
+@dataclass(frozen=True)
+class Caches:
+    """The caches a comparison reads and fills. compare() defaults to in_memory() ones that live for a single
+    comparison; pass the same Caches to every comparison to keep them warm. Fields left as None use the
+    persistent caches under DEFAULT_CACHE_DIR, which are written to disk.
+
+    in_flight holds the searches still running, so comparisons sharing it send each search once.
+    price_stats holds the price statistics duplicate filtering uses once an item has enough of them.
+    venue_details holds the Wolt venues' delivery fees and minimum orders.
+    """
+    wolt_search: SearchCache = None
+    chp_search: SearchCache = None
+    barcodes: DiskCache = None
+    geocode: DiskCache = None
+    in_flight: SingleFlight = None
+    price_stats: PriceStatsCache = None
+    venue_details: DiskCache = None
+
+    @classmethod
+    def in_memory(cls):
+        return cls(
+            wolt_search=SearchCache(None, WOLT_SEARCH_TTL),
+            chp_search=SearchCache(None, CHP_SEARCH_TTL),
+            barcodes=DiskCache(None, BARCODE_CACHE_TTL),
+            geocode=DiskCache(None, GEOCODE_CACHE_TTL),
+            in_flight=SingleFlight(),
+            price_stats=PriceStatsCache(None),
+            venue_details=DiskCache(None, VENUE_DETAILS_TTL)
+        )
+
+    def disk_caches(self):
+        return [
+            self.wolt_search, self.chp_search, self.barcodes, self.geocode, self.price_stats, self.venue_details
+        ]
+
+    @classmethod
+    def on_disk(cls):
+        """The persistent caches, loaded once so a long-running process keeps them in memory too"""
+        return cls(
+            wolt_search=SearchCache.for_wolt(),
+            chp_search=SearchCache.for_chp(),
+            barcodes=ChpClient.default_barcode_cache(),
+            geocode=Geocoder.default_cache(),
+            in_flight=SingleFlight(),
+            price_stats=PriceStatsCache.default(),
+            venue_details=WoltClient.default_venue_cache()
+        )
+
+
+@dataclass(frozen=True)
+class ComparisonResult:
+    ranking: Ranking  # Over the Wolt searches that finished
+    venue_id_to_venue: MappingProxyType
+    average_price_map: MappingProxyType
+    chp_venues: tuple  # Online stores with every must-include item among the CHP searches that finished
+    timed_out_searches: tuple  # Wolt searches that didn't finish, left out of the comparison
+    items_to_search: tuple = ()  # The Wolt searches that finished, as (item name, must include) pairs
+    online_stores: tuple = ()  # Every online store found, with or without every must-include item
+    chp_timed_out_searches: tuple = ()  # CHP searches that didn't finish although the Wolt one did
+
+    @classmethod
+    def from_services(cls, wolt_service, chp_service):
+        chp_venues = tuple(chp_service.get_complete_venues())
+        # The same items add_checkout_costs ranked with
+        items_to_search = tuple(wolt_service.items_to_search)
+        return cls(
+            ranking=wolt_service.ranking(items_to_search, chp_venues),
+            venue_id_to_venue=MappingProxyType(wolt_service.venue_id_to_venue),
+            average_price_map=MappingProxyType(wolt_service.average_price_map),
+            chp_venues=chp_venues,
+            timed_out_searches=tuple(wolt_service.timed_out_searches),
+            items_to_search=items_to_search,
+            online_stores=tuple(chp_service.venues.values()),
+            chp_timed_out_searches=tuple(
+                item for item in chp_service.timed_out_searches if item not in wolt_service.timed_out_searches
+            )
+        )
+
+    def split_basket(self, max_venues=MAX_VENUES, venue_cost=0.0):
+        """The cheapest way to buy the list from up to max_venues Wolt venues and online stores, see SplitBasket.optimize"""
+        return SplitBasket.optimize(
+            self.venue_id_to_venue.values(), self.online_stores, self.items_to_search, self.average_price_map, max_venues, venue_cost
+        )
+
+
+class Comparison:
+    """One basket comparison. Iterate it for provisional rankings, then await result().
+
+    The comparison runs in its own task, which iterating only watches: stopping early doesn't stop
+    it, and result() still returns the final ranking. The venues a provisional ranking points to
+    keep filling in as later searches land; the ranking's own order and totals don't change.
+    """
+
+    def __init__(self, address, items_to_search, http_client=None, parse_pool=None, caches=None, timeout=DEFAULT_TIMEOUT, geocoder=None,
+                 price_history=None, save_caches=True):
+        self.address = address
+        self.items_to_search = list(items_to_search)
+        self.http_client = http_client
+        self.parse_pool = parse_pool
+        self.caches = caches or Caches.in_memory()
+        self.timeout = timeout
+        self.geocoder = geocoder
+        self.price_history = price_history
+        # Write the persistent caches when done; long-running callers turn this off and save them periodically instead
+        self.save_caches = save_caches
+        self._task = None
+        self._rankings = None  # Provisional rankings for the iterator, then None once the comparison is over
+
+    def __aiter__(self):
+        if self._task is not None:
+            raise RuntimeError("A comparison can only be iterated once, before result()")
+        self._rankings = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._run())
+        return self._provisional_rankings()
+
+    async def _provisional_rankings(self):
+        while (ranking := await self._rankings.get()) is not None:
+            yield ranking
+        # Raises the comparison's error, if it failed
+        await self._task
+
+    async def _run(self):
+        http_client = self.http_client or HttpClient()
+        deadline = asyncio.get_running_loop().time() + self.timeout if self.timeout else None
+        try:
+            wolt_service = WoltService(
+                self.address, self.items_to_search, http_client, self.parse_pool,
+                geocoder=self.geocoder or Geocoder(http_client, self.caches.geocode),
+                search_cache=self.caches.wolt_search,
+                single_flight=self.caches.in_flight,
+                price_history=self.price_history,
+                price_stats=self.caches.price_stats if self.caches.price_stats is not None else PriceStatsCache.default(),
+                venue_cache=self.caches.venue_details
+            )
+            chp_service = ChpService(
+                self.address, self.items_to_search, http_client, self.parse_pool,
+                search_cache=self.caches.chp_search,
+                barcode_cache=self.caches.barcodes,
+                single_flight=self.caches.in_flight,
+                price_history=self.price_history
+            )
+            pipeline = SearchPipeline(wolt_service, chp_service)
+            async with aclosing(pipeline.run(deadline)) as rankings:
+                async for ranking in rankings:
+                    if self._rankings is not None:
+                        self._rankings.put_nowait(ranking)
+            # Only the venues the final ranking shows need their delivery fees
+            await wolt_service.add_checkout_costs()
+            await asyncio.gather(wolt_service.record_prices(), chp_service.record_prices())
+            if self.save_caches:
+                await save_in_background(wolt_service.disk_caches() + chp_service.disk_caches())
+            return ComparisonResult.from_services(wolt_service, chp_service)
+        finally:
+            if self._rankings is not None:
+                self._rankings.put_nowait(None)
+            if self.http_client is None:
+                await http_client.close()
+
+    async def result(self):
+        """The final ComparisonResult, running the comparison if it hasn't started yet"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        if self._task.cancelled():
+            raise RuntimeError("The comparison was cancelled before it finished")
+        return await self._task
+
+
+def compare(address, items_to_search, http_client=None, parse_pool=None, caches=None, timeout=DEFAULT_TIMEOUT, price_history=None):
+    """Compare the basket at address. items_to_search is a list of (item name, must include) pairs.
+
+    Pass an HttpClient or ParsePool to share them between comparisons; otherwise a client is
+    opened and closed per comparison and parsing runs on the event loop. Pass a PriceHistory to
+    record the prices seen.
+    """
+    return Comparison(address, items_to_search, http_client, parse_pool, caches, timeout, price_history=price_history)
+
+
+async def compare_batch(addresses, shopping_lists, http_client=None, parse_pool=None, caches=None, timeout=DEFAULT_TIMEOUT,
+                        price_history=None):
+    """Compare every shopping list in shopping_lists at every address, all at once.
+
+    The comparisons share one HTTP client, geocoder and set of caches, and searches that several of
+    them need are sent once with the parsed results handed to each. Wolt searches are shared by
+    addresses in the same search cache grid cell, CHP searches by identical addresses.
+    Addresses missing from the geocode cache are resolved one per second, so give large batches of
+    new addresses a longer timeout.
+    Returns {(address, shopping list index): ComparisonResult}.
+    """
+    own_http_client = http_client is None
+    http_client = http_client or HttpClient()
+    caches = caches or Caches.in_memory()
+    if caches.in_flight is None:
+        caches = replace(caches, in_flight=SingleFlight())
+    # One geocoder, so Nominatim's rate limit holds across the batch
+    geocoder = Geocoder(http_client, caches.geocode)
+    try:
+        comparisons = {
+            (address, list_index): Comparison(address, items_to_search, http_client, parse_pool, caches, timeout, geocoder, price_history)
+            for address in dict.fromkeys(addresses)
+            for list_index, items_to_search in enumerate(shopping_lists)
+        }
+        results = await asyncio.gather(*(comparison.result() for comparison in comparisons.values()))
+        return dict(zip(comparisons, results))
+    finally:
+        if own_http_client:
+            await http_client.close()
@@ -0,0 +1,34 @@
+"""Compare full-page and targeted parsing of saved CHP compare_results pages.
+
+Run from the repository root:
+    python -m benchmarks.bench_chp_parser
+"""
+import os
+import timeit
+
+from infrastructure.chp_parser import parse_compare_results
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+SAMPLE_PAGES = ['chp_compare_results.html', 'chp_compare_results_no_online.html']
+REPEAT = 50
+
+
+def main():
+    for page_name in SAMPLE_PAGES:
+        with open(os.path.join(FIXTURES_DIR, page_name), encoding='utf-8') as f:
+            html = f.read()
+
+        full_results = parse_compare_results(html, fast=False)
+        fast_results = parse_compare_results(html)
+        assert full_results == fast_results, f"Parsers disagree on {page_name}"
+
+        full_time = timeit.timeit(lambda: parse_compare_results(html, fast=False), number=REPEAT) / REPEAT
+        fast_time = timeit.timeit(lambda: parse_compare_results(html), number=REPEAT) / REPEAT
+        print(f"{page_name} ({len(html) // 1024}KB, {len(fast_results)} online stores)")
+        print(f"  full parse:     {full_time * 1000:.2f} ms/page")
+        print(f"  targeted parse: {fast_time * 1000:.2f} ms/page")
+        print(f"  speedup:        {full_time / fast_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Resolve duplicate items at 5k synthetic venues with the ProductMatcher, against the previous
+word-overlap heuristic, for speed and for how often the right product is picked.
+
+Each venue lists the searched product under one of its spellings (geresh or quote, unit written out
+or abbreviated, attached prefix letters) next to near misses: another fat percentage or size, or
+extra words.
+
+Run from the repository root:
+    python -m benchmarks.bench_duplicate_matching
+"""
+import random
+import time
+
+from models.venue import Venue
+from models.venue_item import VenueItem
+from utils.duplicate_items_handler import DuplicateItemsHandler
+from utils.product_matcher import ProductMatcher, tokenize
+
+VENUES = 5000
+# (searched name, spellings of the right product, near misses)
+PRODUCTS = [
+    ("קוטג' 5% 250 גרם", ["קוטג׳ 5% 250 ג", "קוטג' 5% 250 גר", "קוטג 5% 250 גרם"],
+     ["קוטג' 3% 250 גרם", "קוטג' 9% 250 גרם", "קוטג' 5% 500 גרם"]),
+    ("חלב 3% 1 ליטר", ["חלב 3% 1 ל'", "החלב 3% 1 ליטר", "חלב בקרטון 3% 1 ליטר"],
+     ["חלב 1% 1 ליטר", "חלב 3% 2 ליטר", "משקה חלב 3% 1 ליטר שוקו"]),
+    ("פיראוס בולגרית 16%", ["פיראוס בולגרית 16% 250 ג", "גבינה בולגרית פיראוס 16%"],
+     ["פיראוס בולגרית 24%", "פיראוס בולגרית 5% מעודנת"]),
+    ("שוקולית 500 גרם", ["שוקולית 500גרם", "שוקולית 0.5 ק\"ג"],
+     ["שוקולית 1 ק\"ג", "שוקולית לייט 500 גרם מופחת סוכר"]),
+    ("טונה בשמן 160 גרם", ["טונה בשמן 160 ג'", "טונה בשמן קנולה 160 גרם"],
+     ["טונה במים 160 גרם", "טונה בשמן 4 יח 160 גרם"]),
+]
+
+
+def make_venues(seed=0):
+    rng = random.Random(seed)
+    venues = []
+    for venue_number in range(VENUES):
+        slug = f"venue-{venue_number}"
+        venue = Venue(f"Venue {venue_number}", slug, False, "30", True)
+        for searched_name, spellings, near_misses in PRODUCTS:
+            names = [rng.choice(spellings)] + rng.sample(near_misses, rng.randint(1, len(near_misses)))
+            for name in rng.sample(names, len(names)):
+                venue.add_item(VenueItem(name, name, searched_name, 10.0, slug))
+        venues.append(venue)
+    return venues
+
+
+def legacy_filter_out_duplicates(items, average_price_map):
+    """The previous price band, exact match, most words in common, then fewest words heuristic"""
+    searched_name = items[0].searched_name
+    average_price = average_price_map.get(searched_name, 0)
+    items = [item for item in items if average_price * 0.5 <= item.price <= average_price * 1.5]
+    if len(items) <= 1:
+        return items[0] if items else None
+    for item in items:
+        if item.name == searched_name:
+            return item
+    hits = [(item, len(set(searched_name.split()) & set(item.name.split()))) for item in items]
+    best_hit = max(hit for _, hit in hits)
+    return min((item for item, hit in hits if hit == best_hit), key=lambda item: len(item.name.split()))
+
+
+def legacy_choices(venues, average_price_map):
+    return [
+        legacy_filter_out_duplicates(venue.items_for(searched_name), average_price_map)
+        for searched_name, _, _ in PRODUCTS for venue in venues
+    ]
+
+
+def matcher_choices(venues, average_price_map):
+    """What resolve_duplicates picks, without replacing the items"""
+    choices = []
+    for searched_name, _, _ in PRODUCTS:
+        matcher = ProductMatcher(searched_name, [item.name for venue in venues for item in venue.items_for(searched_name)])
+        choices.extend(
+            DuplicateItemsHandler.filter_out_duplicates(venue.items_for(searched_name), average_price_map, matcher=matcher)
+            for venue in venues
+        )
+    return choices
+
+
+def timed(choose, venues, average_price_map, repeats=5):
+    """Best of repeats, each with cold caches"""
+    best_time = float('inf')
+    for _ in range(repeats):
+        tokenize.cache_clear()
+        start_time = time.perf_counter()
+        choices = choose(venues, average_price_map)
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time, choices
+
+
+def accuracy(choices):
+    right = sum(choice.name in spellings for choice, (_, spellings, _) in zip(choices, [
+        product for product in PRODUCTS for _ in range(VENUES)
+    ]))
+    return right / len(choices)
+
+
+def main():
+    venues = make_venues()
+    average_price_map = {searched_name: 10.0 for searched_name, _, _ in PRODUCTS}
+    legacy_time, legacy = timed(legacy_choices, venues, average_price_map)
+    matcher_time, matched = timed(matcher_choices, venues, average_price_map)
+
+    print(f"{VENUES} venues x {len(PRODUCTS)} searched items")
+    print(f"  word overlap:    {legacy_time * 1000:.0f} ms, {accuracy(legacy):.1%} right")
+    print(f"  product matcher: {matcher_time * 1000:.0f} ms, {accuracy(matched):.1%} right")
+    print(f"  speedup:         {legacy_time / matcher_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Memory held per VenueItem at 1M items: the __dict__ model with an eager URL against the slotted, interned one.
+
+Item fields come out of JSON decoding, like search results do, so every repeated string starts as its own copy.
+Run from the repository root:
+    python -m benchmarks.bench_model_memory
+"""
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from models.venue_item import VenueItem
+
+ITEMS = 1000000
+CHUNK = 50000
+VENUES = 2000
+SEARCHED_NAMES = 30
+PRODUCTS_PER_SEARCH = 40
+
+
+class LegacyVenueItem:
+    """VenueItem as it was before __slots__"""
+
+    def __init__(self, name, id, searched_name, price, venue_id):
+        self.name = name
+        self.id = id
+        self.searched_name = searched_name
+        self.price = round(price, 2)
+        self.url = f"https://wolt.com/he/isr/tel-aviv/venue/{venue_id}/itemid-{id}"
+
+    def __hash__(self):
+        return hash(self.name + str(self.price))
+
+    def __eq__(self, other):
+        return self.name == other.name and self.price == other.price
+
+
+def make_chunks():
+    rng = random.Random(0)
+    chunks = []
+    for start in range(0, ITEMS, CHUNK):
+        rows = []
+        for i in range(start, start + CHUNK):
+            searched = rng.randrange(SEARCHED_NAMES)
+            rows.append([
+                f"מוצר {searched} דגם {rng.randrange(PRODUCTS_PER_SEARCH)} 500 גרם",
+                f"{i:024x}",
+                f"מוצר {searched} 500 גרם",
+                rng.randint(500, 5000) / 100,
+                f"venue-{rng.randrange(VENUES)}-tel-aviv"
+            ])
+        chunks.append(json.dumps(rows))
+    return chunks
+
+
+def build(item_class, chunks):
+    """Build the items, decoding one chunk at a time so only the items' own strings are retained"""
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    items = []
+    for chunk in chunks:
+        items.extend(item_class(*row) for row in json.loads(chunk))
+    build_time = time.perf_counter() - start_time
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start_time = time.perf_counter()
+    unique = set(items)
+    hash_time = time.perf_counter() - start_time
+    del unique, items
+    return size, build_time, hash_time
+
+
+def main():
+    chunks = make_chunks()
+    print(f"{ITEMS} items, {VENUES} venues, {SEARCHED_NAMES} searched names")
+    for label, item_class in (('__dict__, eager URL', LegacyVenueItem), ('__slots__, interned', VenueItem)):
+        size, build_time, hash_time = build(item_class, chunks)
+        print(f"  {label:20} {size / 1024 / 1024:7.1f} MB ({size / ITEMS:.0f} bytes/item), "
+              f"built in {build_time:.2f}s (under tracemalloc), set of all items in {hash_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
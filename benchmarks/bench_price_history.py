@@ -0,0 +1,53 @@
+"""Query a price history holding half a year of runs over many addresses.
+
+Run from the repository root:
+    python -m benchmarks.bench_price_history
+"""
+import os
+import random
+import tempfile
+import time
+
+from infrastructure.price_history import PriceHistory, WOLT, DAY
+
+RUNS = 360  # Two runs a day for six months
+VENUES = 400
+ITEMS_TO_SEARCH = [f"searched item {i}" for i in range(25)]
+QUERIES = 200
+
+
+def timed_queries(query, arguments):
+    start_time = time.perf_counter()
+    for argument in arguments:
+        query(*argument)
+    return (time.perf_counter() - start_time) / len(arguments) * 1000
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory, PriceHistory(os.path.join(directory, 'history.sqlite3')) as history:
+        start_time = time.perf_counter()
+        for run in range(RUNS):
+            observations = [
+                (f"venue-{venue}", f"{item} at {venue}", item, round(rng.uniform(5, 50), 2))
+                for venue in rng.sample(range(VENUES), VENUES // 2)
+                for item in ITEMS_TO_SEARCH
+            ]
+            history.record(WOLT, observations, observed_at=run * DAY / 2)
+        record_time = time.perf_counter() - start_time
+        rows = history.connection.execute("SELECT COUNT(*) FROM price_observations").fetchone()[0]
+
+        venues = [(WOLT, f"venue-{rng.randrange(VENUES)}") for _ in range(QUERIES)]
+        items = [(rng.choice(ITEMS_TO_SEARCH),) for _ in range(QUERIES)]
+        products = [(WOLT, venue, f"{item} at {venue[len('venue-'):]}") for (_, venue), (item,) in zip(venues, items)]
+        last_month = RUNS * DAY / 2 - 30 * DAY
+
+        print(f"{rows} observations from {RUNS} runs, recorded in {record_time:.1f} s ({record_time / RUNS * 1000:.1f} ms per run)")
+        print(f"  last seen price of a product:      {timed_queries(history.last_seen_price, products):.3f} ms")
+        print(f"  cheapest last seen prices of item: {timed_queries(history.last_seen_prices, items):.3f} ms")
+        print(f"  daily trend of an item, last month: {timed_queries(lambda item: history.price_trend(item, since=last_month), items):.3f} ms")
+        print(f"  venue history, last month:         {timed_queries(lambda source, venue: history.venue_history(source, venue, since=last_month), venues):.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Rank 10k and 100k synthetic venues from WoltService's PriceMatrix against Ranking.from_venues,
+which walks every venue in Python.
+
+The matrix is filled in a column per search as the searches are folded in, so that cost is
+shown on its own; each provisional and final ranking then only reads it.
+
+Run from the repository root:
+    python -m benchmarks.bench_price_matrix
+"""
+import random
+import time
+from unittest.mock import Mock
+
+from models.wolt_item import WoltItem
+from services.wolt_service import WoltService
+from utils.ranking import Ranking
+
+VENUE_COUNTS = [10000, 100000]
+ITEMS_TO_SEARCH = [(f"searched item {i}", i % 5 != 0) for i in range(30)]
+
+
+def make_search_results(venues, seed=0):
+    rng = random.Random(seed)
+    return {
+        item_to_search: [
+            WoltItem(f"venue-{venue}", f"Venue {venue}", item_to_search, f"{venue}", rng.randint(500, 5000), True, '30-40', False)
+            for venue in range(venues) if rng.random() < 0.9
+        ]
+        for item_to_search, _ in ITEMS_TO_SEARCH
+    }
+
+
+def timed(rank, repeats=5):
+    best_time = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        ranking = rank()
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time, ranking
+
+
+def main():
+    for venues in VENUE_COUNTS:
+        wolt_service = WoltService("benchmark", ITEMS_TO_SEARCH)
+        wolt_service.wolt_client = Mock(fetched_queries=set())
+        fill_time = [0.0]
+        set_column = wolt_service.price_matrix.set_column
+
+        def timed_set_column(searched_name, venues_with_items):
+            start_time = time.perf_counter()
+            set_column(searched_name, venues_with_items)
+            fill_time[0] += time.perf_counter() - start_time
+
+        wolt_service.price_matrix.set_column = timed_set_column
+        for item_to_search, items in make_search_results(venues).items():
+            wolt_service.add_search_results(item_to_search, items)
+
+        venue_list = list(wolt_service.venue_id_to_venue.values())
+        average_price_map = wolt_service.average_price_map
+        legacy_time, legacy = timed(lambda: Ranking.from_venues(venue_list, ITEMS_TO_SEARCH, average_price_map))
+        matrix_time, ranking = timed(lambda: wolt_service.ranking(ITEMS_TO_SEARCH))
+        assert ranking == legacy
+
+        print(f"{venues} venues x {len(ITEMS_TO_SEARCH)} searched items, {ranking.complete_venues_count} complete")
+        print(f"  Ranking.from_venues:       {legacy_time * 1000:.1f} ms")
+        print(f"  Ranking.from_price_matrix: {matrix_time * 1000:.1f} ms")
+        print(f"  filling the matrix:        {fill_time[0] * 1000:.1f} ms in all, once per search")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Cheapest split of a 50 item basket over 2k venues, for up to 1, 2 and 3 venues with and without a cost per venue.
+
+Run from the repository root:
+    python -m benchmarks.bench_split_basket
+"""
+import random
+import time
+
+from models.chp_venue import ChpVenue
+from models.item_bits import ItemBits
+from models.venue import Venue
+from models.venue_item import VenueItem
+from utils.split_basket import SplitBasket
+
+WOLT_VENUES = 1950
+CHP_VENUES = 50
+ITEMS_TO_SEARCH = [(f"searched item {i}", True) for i in range(50)]
+CHAINS = 40
+
+
+def make_venues(seed=0):
+    """Venues of a few chains: a chain's branches share its price level with some noise per item"""
+    rng = random.Random(seed)
+    base_prices = {item_to_search: rng.uniform(5, 50) for item_to_search, _ in ITEMS_TO_SEARCH}
+    chain_levels = [[rng.uniform(0.85, 1.2) for _ in ITEMS_TO_SEARCH] for _ in range(CHAINS)]
+    item_bits = ItemBits(base_prices)
+    wolt_venues = []
+    for venue_number in range(WOLT_VENUES):
+        slug = f"venue-{venue_number}"
+        venue = Venue(f"Venue {venue_number}", slug, False, '30-40', True, item_bits)
+        levels = chain_levels[venue_number % CHAINS]
+        for (item_to_search, _), level in zip(ITEMS_TO_SEARCH, levels):
+            if rng.random() < 0.8:
+                price = base_prices[item_to_search] * level * rng.uniform(0.97, 1.03)
+                venue.add_item(VenueItem(f"{item_to_search} {slug}", '1', item_to_search, price, slug))
+        wolt_venues.append(venue)
+    chp_venues = []
+    for store_number in range(CHP_VENUES):
+        store = ChpVenue(f"Store {store_number}", f"store{store_number}.co.il", item_bits)
+        for item_to_search, _ in ITEMS_TO_SEARCH:
+            if rng.random() < 0.6:
+                store.add_item(item_to_search, round(base_prices[item_to_search] * rng.uniform(0.8, 1.1), 2))
+        chp_venues.append(store)
+    average_price_map = dict(base_prices)
+    return wolt_venues, chp_venues, average_price_map
+
+
+def main():
+    wolt_venues, chp_venues, average_price_map = make_venues()
+    print(f"{len(ITEMS_TO_SEARCH)} items, {len(wolt_venues)} Wolt venues and {len(chp_venues)} online stores")
+    for venue_cost in (0.0, 15.0):
+        for max_venues in (1, 2, 3):
+            start_time = time.perf_counter()
+            basket = SplitBasket.optimize(wolt_venues, chp_venues, ITEMS_TO_SEARCH, average_price_map, max_venues, venue_cost)
+            elapsed = time.perf_counter() - start_time
+            print(f"  up to {max_venues} venues, ₪{venue_cost:.0f} each: ₪{basket.total:8.2f} from {len(basket.purchases)} venues, "
+                  f"{len(basket.missing_items)} missing, {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Build the report Ranking for 100k synthetic venues with bounded heaps against sorting every complete venue.
+
+Run from the repository root:
+    python -m benchmarks.bench_top_k
+"""
+import random
+import time
+
+from models.item_bits import ItemBits
+from models.venue import Venue
+from models.venue_item import VenueItem
+from utils.ranking import Ranking
+
+VENUES = 100000
+SEED_VENUES = 10000
+ITEMS_TO_SEARCH = [(f"searched item {i}", i % 5 != 0) for i in range(30)]
+
+
+def make_venues(seed=0):
+    rng = random.Random(seed)
+    venues = []
+    item_bits = ItemBits(item_to_search for item_to_search, _ in ITEMS_TO_SEARCH)
+    for venue_number in range(SEED_VENUES):
+        slug = f"venue-{venue_number}"
+        venue = Venue(f"Venue {venue_number}", slug, False, '30-40', True, item_bits)
+        for item_to_search, _ in ITEMS_TO_SEARCH:
+            if rng.random() < 0.9:
+                venue.add_item(VenueItem(f"{item_to_search} {slug}", '1', item_to_search, rng.uniform(5, 50), slug))
+            else:
+                venue.add_missing_item(VenueItem(item_to_search, '', item_to_search, 0, slug))
+        venues.append(venue)
+    return venues
+
+
+def legacy_ranking(venues, average_price_map):
+    must_include_items = [item_to_search for item_to_search, must_include in ITEMS_TO_SEARCH if must_include]
+    complete_venues = [venue for venue in venues if all(
+        any(item.searched_name == item_to_search for item in venue.items) for item_to_search in must_include_items)]
+    sorted_venues = sorted(complete_venues, key=lambda v: v.total_normalized_price(average_price_map))
+    most_expensive_venue = max(complete_venues, key=lambda v: v.total_normalized_price(average_price_map), default=None)
+    return sorted_venues, most_expensive_venue
+
+
+def count_totals(venues):
+    """Count the full normalized total computations each ranking makes"""
+    counted = [0]
+    total_normalized_price = Venue.total_normalized_price
+
+    def counting_total_normalized_price(venue, average_price_map):
+        counted[0] += 1
+        return total_normalized_price(venue, average_price_map)
+
+    Venue.total_normalized_price = counting_total_normalized_price
+    return counted, lambda: setattr(Venue, 'total_normalized_price', total_normalized_price)
+
+
+def main():
+    venues = []
+    for seed in range(VENUES // SEED_VENUES):
+        venues += make_venues(seed)
+    average_price_map = {item_to_search: 25.0 for item_to_search, _ in ITEMS_TO_SEARCH}
+
+    counted, restore = count_totals(venues)
+    start_time = time.perf_counter()
+    legacy_sorted, legacy_most_expensive = legacy_ranking(venues, average_price_map)
+    legacy_time = time.perf_counter() - start_time
+    legacy_totals = counted[0]
+
+    counted[0] = 0
+    start_time = time.perf_counter()
+    ranking = Ranking.from_venues(venues, ITEMS_TO_SEARCH, average_price_map)
+    ranking_time = time.perf_counter() - start_time
+    ranking_totals = counted[0]
+    restore()
+
+    assert list(ranking.top_venues) == legacy_sorted[:len(ranking.top_venues)]
+    assert ranking.most_expensive_venue is legacy_most_expensive
+
+    print(f"{len(venues)} venues x {len(ITEMS_TO_SEARCH)} searched items, {ranking.complete_venues_count} complete")
+    print(f"  sort every complete venue: {legacy_time * 1000:.1f} ms, {legacy_totals} totals computed")
+    print(f"  bounded top-k heaps:       {ranking_time * 1000:.1f} ms, {ranking_totals} totals computed")
+
+
+if __name__ == '__main__':
+    main()
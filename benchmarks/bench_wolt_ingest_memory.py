@@ -0,0 +1,72 @@
+"""Memory held by ingested Wolt search results: raw menu items vs projected WoltItem records.
+
+Run from the repository root:
+    python -m benchmarks.bench_wolt_ingest_memory
+"""
+import gc
+import json
+import random
+import tracemalloc
+
+from infrastructure.wolt_parser import parse_wolt_search
+
+SEARCHES = 50
+ITEMS_PER_SEARCH = 400
+
+
+def make_search_response(query, rng):
+    items = []
+    for i in range(ITEMS_PER_SEARCH):
+        venue = rng.randrange(2000)
+        items.append({
+            'link': {'menu_item_details': {'venue_slug': f"venue-{venue}", 'id': f"{query}-{i}"}, 'target': 'menu_item'},
+            'menu_item': {
+                'id': f"{query}-{i}",
+                'name': f"{query} {rng.choice(['גדול', 'קטן', 'מבצע', 'חדש'])}",
+                'description': 'תיאור מוצר ארוך עם פרטים על הרכיבים, האריזה והיצרן ' * 3,
+                'price': rng.randint(500, 5000),
+                'venue_name': f"Venue {venue}",
+                'is_available': True,
+                'estimate_range': '30-40',
+                'show_wolt_plus': bool(venue % 2),
+                'image': {'url': f"https://imageproxy.wolt.com/menu/menu-images/{query}-{i}.jpg", 'blurhash': 'LEHV6nWB2yk8pyo0adR*.7kCMdnj'},
+                'tags': [{'name': 'kosher'}, {'name': 'groceries'}],
+                'currency': 'ILS',
+                'unit_info': '500 גרם',
+                'unit_price': {'price': rng.randint(100, 1000), 'unit': 'kilogram'},
+            }
+        })
+    return json.dumps({'sections': [{'name': 'items', 'items': items}]}).encode()
+
+
+def retained_size(ingest, bodies):
+    gc.collect()
+    tracemalloc.start()
+    retained = [ingest(body) for body in bodies]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return size
+
+
+def ingest_raw(body):
+    # What the pipeline used to keep: every full menu_item dict
+    return [item['menu_item'] for item in json.loads(body)['sections'][0]['items']]
+
+
+def main():
+    rng = random.Random(0)
+    bodies = [make_search_response(f"item {i}", rng) for i in range(SEARCHES)]
+    total_items = SEARCHES * ITEMS_PER_SEARCH
+
+    raw_size = retained_size(ingest_raw, bodies)
+    projected_size = retained_size(parse_wolt_search, bodies)
+    print(f"{total_items} items from {SEARCHES} searches")
+    print(f"  raw menu items:    {raw_size / 1024 / 1024:.1f} MB ({raw_size / total_items:.0f} bytes/item)")
+    print(f"  WoltItem records:  {projected_size / 1024 / 1024:.1f} MB ({projected_size / total_items:.0f} bytes/item)")
+    print(f"  reduction:         {raw_size / projected_size:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
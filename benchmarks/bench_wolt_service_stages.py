@@ -0,0 +1,114 @@
+"""Time folding Wolt searches into 5k synthetic venues with WoltService.add_search_results,
+against the previous implementation that scanned venue.items for every venue and searched item.
+Mapping the found items onto venues is the same for both, so it is timed on its own and the
+stages after it (missing items, average prices, duplicates) are compared without it.
+
+Run from the repository root:
+    python -m benchmarks.bench_wolt_service_stages
+"""
+import random
+import time
+
+from models.venue_item import VenueItem
+from models.wolt_item import WoltItem
+from services.wolt_service import WoltService
+from utils.duplicate_items_handler import DuplicateItemsHandler
+from utils.product_matcher import ProductMatcher
+
+VENUES = 5000
+ITEMS_TO_SEARCH = [(f"searched item {i} 500 גרם", i % 4 != 0) for i in range(30)]
+
+
+def make_search_results(seed=0):
+    """{searched item: the WoltItems its search returns}"""
+    rng = random.Random(seed)
+    results = {item_to_search: [] for item_to_search, _ in ITEMS_TO_SEARCH}
+    for venue_number in range(VENUES):
+        slug = f"venue-{venue_number}"
+        for item_to_search, _ in ITEMS_TO_SEARCH:
+            for variant in range(rng.choice([0, 1, 1, 1, 2, 3])):
+                name = f"{item_to_search} {'גדול ' * variant}".strip()
+                results[item_to_search].append(
+                    WoltItem(slug, f"Venue {venue_number}", name, f"{venue_number}-{variant}", rng.randint(500, 3000), True, '30-40', False)
+                )
+    return results
+
+
+class LegacyWoltService(WoltService):
+    """add_search_results as it was before the searched-name index: every lookup scans venue.items"""
+
+    def add_search_results(self, item_to_search, items):
+        venue_to_items = self.map_items(item_to_search, items)
+
+        for venue in self.venue_id_to_venue.values():
+            if not any(item.searched_name == item_to_search for item in venue.items):
+                venue.add_missing_item(VenueItem(item_to_search, '', item_to_search, 0, venue.slug))
+
+        venues_with_items = [self.venue_id_to_venue[venue_id] for venue_id in venue_to_items]
+        found = [(venue, [item for item in venue.items if item.searched_name == item_to_search]) for venue in venues_with_items]
+        prices = [matching_items[0].price for _, matching_items in found if len(matching_items) == 1]
+        self.average_price_map[item_to_search] = round(sum(prices) / len(prices), 2) if prices else 0
+
+        # The same shared matcher resolve_duplicates uses, so only the scans differ
+        matcher = ProductMatcher(item_to_search, [item.name for _, matching_items in found for item in matching_items])
+        for venue, matching_items in found:
+            if len(matching_items) > 1:
+                venue.replace_items_for(
+                    item_to_search, DuplicateItemsHandler.filter_out_duplicates(matching_items, self.average_price_map, matcher=matcher)
+                )
+
+    def map_items(self, item_to_search, items):
+        """Add the found items to their venues, as every implementation does first"""
+        venue_to_items = self.sort_found_items_by_venue(items, item_to_search)
+        for venue_id, venue_items in venue_to_items.items():
+            venue = self.venue_id_to_venue.get(venue_id)
+            if venue is None:
+                venue = self._create_venue(venue_id, venue_items[0][1])
+                for searched_name in self.completed_searches:
+                    venue.add_missing_item(VenueItem(searched_name, '', searched_name, 0, venue.slug))
+            for searched_name, item in venue_items:
+                venue.add_item(VenueItem(item.name, item.id, searched_name, item.price / 100, venue.slug))
+        self.completed_searches.append(item_to_search)
+        return venue_to_items
+
+
+class MappingOnlyWoltService(LegacyWoltService):
+    """Only the mapping both implementations share, to time the stages after it apart"""
+
+    def add_search_results(self, item_to_search, items):
+        self.map_items(item_to_search, items)
+
+
+def timed(service_class, search_results, repeats=3):
+    """Best of repeats, each folding every search into a fresh service"""
+    best_time = float('inf')
+    for _ in range(repeats):
+        service = service_class("benchmark", ITEMS_TO_SEARCH)
+        start_time = time.perf_counter()
+        for item_to_search, items in search_results.items():
+            service.add_search_results(item_to_search, items)
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time, service
+
+
+def main():
+    search_results = make_search_results()
+    mapping_time, _ = timed(MappingOnlyWoltService, search_results)
+    legacy_time, legacy_service = timed(LegacyWoltService, search_results)
+    indexed_time, indexed_service = timed(WoltService, search_results)
+
+    assert legacy_service.average_price_map == indexed_service.average_price_map
+    for slug, venue in legacy_service.venue_id_to_venue.items():
+        assert venue.items == indexed_service.venue_id_to_venue[slug].items, slug
+        assert venue.missing_items == indexed_service.venue_id_to_venue[slug].missing_items, slug
+
+    legacy_stages_time, indexed_stages_time = legacy_time - mapping_time, indexed_time - mapping_time
+    print(f"{VENUES} venues x {len(ITEMS_TO_SEARCH)} searched items, folded in one search at a time")
+    print(f"  mapping items onto venues:     {mapping_time * 1000:.0f} ms")
+    print(f"  then scanning venue.items:     {legacy_stages_time * 1000:.0f} ms ({legacy_time * 1000:.0f} ms in all)")
+    print(f"  then the searched-name index:  {indexed_stages_time * 1000:.0f} ms ({indexed_time * 1000:.0f} ms in all)")
+    print(f"  speedup after mapping:         {legacy_stages_time / indexed_stages_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
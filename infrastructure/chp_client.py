@@ -1,22 +1,154 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import json
+import os
+import aiohttp
 from urllib.parse import quote, urlencode
+from infrastructure.http_client import HttpClient
+from infrastructure.chp_parser import parse_chp_page
+from infrastructure.search_cache import SearchCache, normalize_query
+from infrastructure.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from infrastructure.parse_pool import ParsePool
+from infrastructure.single_flight import SingleFlight
+from models.chp_result import ChpResult
+from infrastructure.log import get_logger
+
+logger = get_logger(__name__)
+
+CHP_COMPARE_RESULTS_URL = "https://chp.co.il/main_page/compare_results"
+CHP_AUTOCOMPLETE_URL = "https://chp.co.il/autocompletion/product_extended"
+CHP_PAGE_SIZE = 20
+CHP_MAX_PAGES = 3
+BARCODE_CACHE_TTL = 90 * 24 * 60 * 60
+BARCODE_CACHE_MAX_ENTRIES = 5000
+# Cached for items CHP has no barcode for, so they aren't looked up on every run
+NO_BARCODE = '0'
 
 class ChpClient:
-    def __init__(self, address):
+    def __init__(self, address, http_client=None, search_cache=None, parse_pool=None,
+                 page_size=CHP_PAGE_SIZE, max_pages=CHP_MAX_PAGES, barcode_cache=None, single_flight=None):
         self.address = address
-        self.base_url = "https://chp.co.il/main_page/compare_results"
+        self.base_url = CHP_COMPARE_RESULTS_URL
+        self.autocomplete_url = CHP_AUTOCOMPLETE_URL
+        self.http_client = http_client or HttpClient()
+        self.search_cache = search_cache if search_cache is not None else SearchCache.for_chp()
+        self.parse_pool = parse_pool or ParsePool()
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.barcode_cache = barcode_cache if barcode_cache is not None else self.default_barcode_cache()
+        # Shared between clients so identical lookups and searches in flight are only sent once
+        self.single_flight = single_flight or SingleFlight()
+        # Queries this client searched upstream itself, rather than taking the results from the cache or another client
+        self.fetched_queries = set()
+
+    @staticmethod
+    def default_barcode_cache():
+        return DiskCache(os.path.join(DEFAULT_CACHE_DIR, 'chp_barcodes.json'), BARCODE_CACHE_TTL, BARCODE_CACHE_MAX_ENTRIES)
 
-    def search(self, item_query):
+    async def search(self, item_query):
+        """Return the online stores offering the item as ChpResult records"""
+        barcode = await self.resolve_barcode(item_query)
+        # Results are cached by barcode when there is one, so different spellings of an item share them
+        cache_query = f"barcode:{barcode}" if barcode != NO_BARCODE else item_query
+        cached_results = self.search_cache.get_results(cache_query, self.address)
+        if cached_results is not None:
+            return [ChpResult(*result) for result in cached_results]
+        return await self.single_flight.run(
+            ('chp', self.search_cache.search_key(cache_query, self.address)),
+            lambda: self._search(item_query, barcode, cache_query)
+        )
+
+    async def _search(self, item_query, barcode, cache_query):
+        # All pages are requested at once, pages after the first one without online stores are cancelled
+        page_tasks = [
+            asyncio.ensure_future(self._search_page(item_query, barcode, page))
+            for page in range(self.max_pages)
+        ]
+        results = {}
+        complete = True
+        try:
+            for page, page_task in enumerate(page_tasks):
+                page_results = await page_task
+                if page_results is None:
+                    if page == 0:
+                        return []
+                    complete = False
+                    break
+                if not page_results:
+                    break
+                for result in page_results:
+                    # The same store can show up on more than one page, keep its first offer
+                    results.setdefault(result.website, result)
+        finally:
+            for page_task in page_tasks:
+                page_task.cancel()
+
+        results = list(results.values())
+        self.fetched_queries.add(item_query)
+        if complete:
+            self.search_cache.set_results(cache_query, self.address, results)
+        return results
+
+    async def resolve_barcode(self, item_query):
+        """Return the barcode CHP matches the free text item to, or NO_BARCODE.
+        Barcodes are looked up once and then remembered on disk."""
+        key = normalize_query(item_query)
+        barcode = self.barcode_cache.get(key)
+        if barcode is not None:
+            return barcode
+        return await self.single_flight.run(('barcode', key), lambda: self._lookup_barcode(item_query, key))
+
+    async def _lookup_barcode(self, item_query, key):
+        url = f"{self.autocomplete_url}?term={quote(item_query)}&from=0&u=0"
+        try:
+            response = await self.http_client.get(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"CHP barcode lookup for {item_query} failed: {e!r}")
+            return NO_BARCODE
+        if response.status != 200:
+            logger.warning(f"CHP barcode lookup for {item_query} failed with status {response.status}")
+            return NO_BARCODE
+
+        barcode = self._first_barcode(response.body)
+        if barcode is None:
+            return NO_BARCODE
+        self.barcode_cache.set(key, barcode)
+        return barcode
+
+    @staticmethod
+    def _first_barcode(body):
+        """Pick the best match's barcode from an autocomplete response.
+        Returns NO_BARCODE if nothing matched, or None if the response is unusable."""
+        try:
+            suggestions = json.loads(body)
+        except ValueError:
+            return None
+        if not isinstance(suggestions, list):
+            return None
+        for suggestion in suggestions:
+            if not isinstance(suggestion, dict):
+                continue
+            barcode = str(suggestion.get('barcode') or suggestion.get('id') or '')
+            if barcode.isdigit() and len(barcode) >= 8:
+                return barcode
+        return NO_BARCODE
+
+    async def _search_page(self, item_query, barcode, page):
+        body = await self.fetch(item_query, page, barcode)
+        if body is None:
+            return None
+        return await self.parse_pool.run(parse_chp_page, body)
+
+    async def fetch(self, item_query, page=0, barcode=NO_BARCODE):
+        """Return a raw compare results page, or None if the search failed"""
         # Manually build query string
         params = {
             'shopping_address': self.address,
             'shopping_address_street_id': '0',
             'shopping_address_city_id': '0',
             'product_name_or_barcode': item_query,
-            'product_barcode': '0',
-            'from': '0',
-            'num_results': '20'
+            'product_barcode': barcode,
+            'from': str(page * self.page_size),
+            'num_results': str(self.page_size)
         }
         
         # Manually encode each parameter and build the URL
@@ -28,47 +160,12 @@ class ChpClient:
         headers = {
             'User-Agent': 'wolt-prices-comparer'
         }
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        results = []
-        
-        # Find all tables and look for the online stores table
-        tables = soup.find_all('table', class_='results-table')
-        online_stores_table = None
-        
-        # Look for the header that indicates online stores results
-        for h4 in soup.find_all('h4'):
-            if 'תוצאות מחנויות באינטרנט' in h4.text:
-                online_stores_table = h4.find_next('table', class_='results-table')
-                break
-        
-        if not online_stores_table:
-            return results
-
-        # Process rows in the online stores table
-        for row in online_stores_table.find_all('tr'):
-            if row.find('th') or 'display_when_narrow' in row.get('class', []):
-                continue
-                
-            cols = row.find_all('td')
-            if len(cols) >= 5:
-                chain_name = cols[0].text.strip()
-                store_link = cols[1].find('a')
-                store_name = store_link.text.strip() if store_link else cols[1].text.strip()
-                website = cols[2].text.strip()
-                item_url = store_link['href'] if store_link else None
-                try:
-                    price = float(cols[4].text.strip().replace('₪', '').strip())
-                except ValueError:
-                    continue
-                
-                results.append({
-                    'chain_name': chain_name,
-                    'store_name': store_name,
-                    'website': website,
-                    'item_url': item_url,
-                    'price': price
-                })
-
-        return results
+        try:
+            response = await self.http_client.get(url, headers=headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"CHP search for {item_query} (page {page}) failed: {e!r}")
+            return None
+        if response.status != 200:
+            logger.warning(f"CHP search for {item_query} (page {page}) failed with status {response.status}")
+            return None
+        return response.body
@@ -0,0 +1,100 @@
+import re
+from bs4 import BeautifulSoup
+
+from models.chp_result import ChpResult
+
+ONLINE_STORES_HEADER = 'תוצאות מחנויות באינטרנט'
+RESULTS_TABLE_PATTERN = re.compile(r'<table\b[^>]*\bclass\s*=\s*["\'][^"\']*\bresults-table\b', re.IGNORECASE)
+TABLE_TAG_PATTERN = re.compile(r'<(/?)table\b', re.IGNORECASE)
+
+
+def parse_chp_page(body):
+    """Parse a raw CHP response body into compact ChpResult records"""
+    return [ChpResult(**result) for result in parse_compare_results(body.decode('utf-8', errors='replace'))]
+
+
+def parse_compare_results(html, fast=True):
+    """Parse the online stores results out of a CHP compare_results page.
+
+    The fast path cuts the online stores results-table out of the raw page and parses only
+    that fragment with lxml. Pages it can't slice safely fall back to a full parse.
+    """
+    if fast:
+        fragment = _online_stores_table_fragment(html)
+        if fragment is not None:
+            if not fragment:
+                return []
+            table = BeautifulSoup(fragment, 'lxml').find('table')
+            return _parse_online_stores_table(table)
+
+    soup = BeautifulSoup(html, 'html.parser')
+    online_stores_table = None
+
+    # Look for the header that indicates online stores results
+    for h4 in soup.find_all('h4'):
+        if ONLINE_STORES_HEADER in h4.text:
+            online_stores_table = h4.find_next('table', class_='results-table')
+            break
+
+    if not online_stores_table:
+        return []
+    return _parse_online_stores_table(online_stores_table)
+
+
+def _online_stores_table_fragment(html):
+    """Return the raw html of the online stores table, '' if the page has no such table,
+    or None if the page can't be sliced safely"""
+    header_position = html.find(ONLINE_STORES_HEADER)
+    if header_position == -1:
+        # The header text could still be hidden behind markup or character references
+        if 'באינטרנט' in html or '&#' in html:
+            return None
+        return ''
+
+    # Make sure the header text we found is inside an <h4>
+    h4_start = html.rfind('<h4', 0, header_position)
+    if h4_start == -1 or html.rfind('</h4', 0, header_position) > h4_start:
+        return None
+
+    table_match = RESULTS_TABLE_PATTERN.search(html, header_position)
+    if not table_match:
+        return ''
+
+    # Find the matching closing tag, allowing for nested tables
+    depth = 0
+    for tag_match in TABLE_TAG_PATTERN.finditer(html, table_match.start()):
+        depth += -1 if tag_match.group(1) else 1
+        if depth == 0:
+            return html[table_match.start():html.find('>', tag_match.end()) + 1]
+    return None
+
+
+def _parse_online_stores_table(online_stores_table):
+    results = []
+
+    # Process rows in the online stores table
+    for row in online_stores_table.find_all('tr'):
+        if row.find('th') or 'display_when_narrow' in row.get('class', []):
+            continue
+
+        cols = row.find_all('td')
+        if len(cols) >= 5:
+            chain_name = cols[0].text.strip()
+            store_link = cols[1].find('a')
+            store_name = store_link.text.strip() if store_link else cols[1].text.strip()
+            website = cols[2].text.strip()
+            item_url = store_link['href'] if store_link else None
+            try:
+                price = float(cols[4].text.strip().replace('₪', '').strip())
+            except ValueError:
+                continue
+
+            results.append({
+                'chain_name': chain_name,
+                'store_name': store_name,
+                'website': website,
+                'item_url': item_url,
+                'price': price
+            })
+
+    return results
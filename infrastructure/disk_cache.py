@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from infrastructure.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'WOLT_GROCERIES_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'wolt-groceries')
+)
+
+
+class DiskCache:
+    """Size-bounded LRU key/value cache with per-entry TTL, persisted as a JSON file"""
+
+    def __init__(self, path, ttl, max_entries=1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, value), least recently used first
+        self._dirty = False
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache file {self.path}: {e}")
+            return
+        now = time.time()
+        for key, (stored_at, value) in data.items():
+            if now - stored_at < self.ttl:
+                self._entries[key] = (stored_at, value)
+        self._evict()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        stored_at, value = entry
+        if time.time() - stored_at >= self.ttl:
+            del self._entries[key]
+            self._dirty = True
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        self._evict()
+        self._dirty = True
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        self.write(self.snapshot())
+
+    def snapshot(self):
+        """A copy of the entries to write, or None if nothing changed since the last one. Call it on the event loop."""
+        if not self.path or not self._dirty:
+            return None
+        self._dirty = False
+        return dict(self._entries)
+
+    def write(self, snapshot):
+        """Write a snapshot to the cache file. Safe to call from a worker thread."""
+        if snapshot is None:
+            return
+        with self._write_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+async def save_in_background(caches):
+    """Save caches from a worker thread, so large caches don't hold up the event loop.
+    The entries are copied on the loop first, so it can keep changing them meanwhile."""
+    snapshots = [(cache, cache.snapshot()) for cache in caches if cache is not None]
+    snapshots = [(cache, snapshot) for cache, snapshot in snapshots if snapshot is not None]
+    if snapshots:
+        await asyncio.to_thread(lambda: [cache.write(snapshot) for cache, snapshot in snapshots])
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import re
+from urllib.parse import quote
+
+from infrastructure.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from infrastructure.http_client import HttpClient
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+GEOCODE_CACHE_TTL = 30 * 24 * 60 * 60  # Addresses practically never move
+GEOCODE_CACHE_MAX_ENTRIES = 5000
+
+
+def normalize_address(address):
+    """Normalize an address so different spellings of the same address share a cache key"""
+    address = address.lower()
+    address = re.sub(r"[׳`’‘']", "'", address)
+    address = re.sub(r'[״“”"]', '"', address)
+    address = re.sub(r'\s*,\s*', ', ', address)
+    address = re.sub(r'\s+', ' ', address)
+    return address.strip(' ,')
+
+
+class Geocoder:
+    """Resolves addresses to (lat, lon) through Nominatim, backed by a persistent cache"""
+
+    def __init__(self, http_client=None, cache=None, min_request_interval=1.0):
+        self.url = NOMINATIM_URL
+        self.http_client = http_client or HttpClient()
+        self.cache = cache if cache is not None else self.default_cache()
+        # Nominatim's usage policy allows about one request per second
+        self.min_request_interval = min_request_interval
+        self._lock = asyncio.Lock()
+        self._last_request_time = None
+
+    @staticmethod
+    def default_cache():
+        return DiskCache(os.path.join(DEFAULT_CACHE_DIR, 'geocode.json'), GEOCODE_CACHE_TTL, GEOCODE_CACHE_MAX_ENTRIES)
+
+    async def get_lat_lon(self, address):
+        key = normalize_address(address)
+        cached = self.cache.get(key)
+        if cached:
+            return tuple(cached)
+
+        async with self._lock:
+            # Another caller may have resolved the same address while we waited
+            cached = self.cache.get(key)
+            if cached:
+                return tuple(cached)
+
+            loop = asyncio.get_running_loop()
+            if self._last_request_time is not None:
+                wait = self._last_request_time + self.min_request_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            try:
+                response = await self.http_client.get(f"{self.url}?q={quote(address)}&format=json")
+            finally:
+                self._last_request_time = loop.time()
+
+        if response.status != 200:
+            response.raise_for_status()
+        data = response.json()
+        if not data:
+            raise ValueError("No results found from Nominatim API")
+        location = data[0]
+        lat_lon = (float(location['lat']), float(location['lon']))
+        self.cache.set(key, lat_lon)
+        return lat_lon
@@ -0,0 +1,41 @@
+import asyncio
+from collections import deque
+
+
+class LatencyTracker:
+    """Keeps a bounded window of recent latencies to estimate percentiles"""
+
+    def __init__(self, window_size=200, min_samples=5):
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window_size)
+
+    def record(self, latency):
+        self._latencies.append(latency)
+
+    def percentile(self, percent):
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+
+async def run_hedged(request_factory, hedge_delay):
+    """Run request_factory(), and if it hasn't answered within hedge_delay seconds run it again
+    and return whichever answer arrives first. The losing request is cancelled."""
+    tasks = {asyncio.ensure_future(request_factory())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if not done:
+            tasks.add(asyncio.ensure_future(request_factory()))
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import random
+from urllib.parse import urlsplit
+
+import aiohttp
+from yarl import URL
+
+from infrastructure.rate_limiter import AdaptiveRateLimiter
+from infrastructure.hedging import LatencyTracker, run_hedged
+from infrastructure.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HEADERS = {'User-Agent': 'wolt-prices-comparer'}
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpStatusError(aiohttp.ClientError):
+    """An upstream answered with an error status"""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+class HttpResponse:
+    def __init__(self, status, body, url=None, retry_after=None):
+        self.status = status
+        self.body = body
+        self.url = url
+        self.retry_after = retry_after
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpStatusError(self.status, self.url)
+
+
+class HttpClient:
+    """Async HTTP transport keeping one keep-alive connection pool and one adaptive rate limiter per upstream host.
+
+    With hedge_requests enabled, a request that hasn't answered within its host's observed
+    p90 latency is duplicated and the first answer wins.
+    """
+
+    def __init__(self, pool_size=20, max_concurrency=10, timeout=30, keepalive_timeout=60,
+                 requests_per_second=10, max_requests_per_second=50, max_retries=3,
+                 backoff_base=0.5, max_backoff=10, hedge_requests=False, hedge_percentile=90):
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.requests_per_second = requests_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.hedge_requests = hedge_requests
+        self.hedge_percentile = hedge_percentile
+        self._sessions = {}
+        self._limiters = {}
+        self._latency_trackers = {}
+
+    def _session_for(self, host):
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=DEFAULT_HEADERS
+            )
+            self._sessions[host] = session
+        if host not in self._limiters:
+            self._limiters[host] = AdaptiveRateLimiter(
+                rate=self.requests_per_second,
+                max_rate=self.max_requests_per_second,
+                concurrency=max(1, self.max_concurrency // 2),
+                max_concurrency=self.max_concurrency
+            )
+            self._latency_trackers[host] = LatencyTracker()
+        return session
+
+    async def request(self, method, url, **kwargs):
+        host = urlsplit(url).netloc
+        self._session_for(host)
+        hedge_delay = self._latency_trackers[host].percentile(self.hedge_percentile) if self.hedge_requests else None
+        if hedge_delay is None:
+            return await self._request_with_retries(host, method, url, **kwargs)
+        return await run_hedged(lambda: self._request_with_retries(host, method, url, **kwargs), hedge_delay)
+
+    async def _request_with_retries(self, host, method, url, **kwargs):
+        session = self._session_for(host)
+        limiter = self._limiters[host]
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            start_time = loop.time()
+            response = None
+            # A cancelled request leaves latency unset so it gives the limiter no feedback
+            latency = None
+            throttled = False
+            try:
+                # The url is passed pre-encoded so the query string is sent exactly as built by the caller
+                async with session.request(method, URL(url, encoded=True), **kwargs) as raw_response:
+                    body = await raw_response.read()
+                    response = HttpResponse(raw_response.status, body, url, raw_response.headers.get('Retry-After'))
+                latency = loop.time() - start_time
+                throttled = response.status in THROTTLE_STATUSES
+                if response.status < 400:
+                    self._latency_trackers[host].record(latency)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                latency = loop.time() - start_time
+                throttled = True
+                if attempt == self.max_retries:
+                    raise
+                logger.info(f"Request to {host} failed ({e!r}), retrying...")
+            finally:
+                limiter.release(latency, throttled)
+
+            if response is not None and (response.status not in RETRY_STATUSES or attempt == self.max_retries):
+                return response
+            await asyncio.sleep(self._backoff_delay(attempt, response))
+
+    def _backoff_delay(self, attempt, response=None):
+        # Exponential backoff with full jitter, never sooner than the server's Retry-After
+        delay = random.uniform(0, min(self.max_backoff, self.backoff_base * 2 ** attempt))
+        if response is not None and response.retry_after:
+            try:
+                delay = max(delay, min(self.max_backoff, float(response.retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+    def stats(self):
+        """Current request rate, concurrency window and in-flight count per upstream host"""
+        return {host: limiter.stats() for host, limiter in self._limiters.items()}
+
+    async def get(self, url, headers=None):
+        return await self.request('GET', url, headers=headers)
+
+    async def post(self, url, json=None, headers=None):
+        return await self.request('POST', url, json=json, headers=headers)
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,9 @@
+import logging
+
+# Everything logs under this logger. main.py prints it; code embedding the comparison decides for itself
+LOGGER_NAME = 'wolt_groceries'
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+def get_logger(name):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
@@ -0,0 +1,35 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+# Responses smaller than this parse faster inline than the round trip to a worker process
+MIN_OFFLOAD_SIZE = 32 * 1024
+
+
+class ParsePool:
+    """Runs CPU-bound response parsing off the event loop.
+
+    With max_workers set, parsing runs on a ProcessPoolExecutor so it scales past one core.
+    Otherwise, and for small responses, the parse function is called inline.
+    The parse functions must be module level so they can be sent to the worker processes.
+    """
+
+    def __init__(self, max_workers=None, min_offload_size=MIN_OFFLOAD_SIZE):
+        self.max_workers = max_workers
+        self.min_offload_size = min_offload_size
+        self._executor = ProcessPoolExecutor(max_workers) if max_workers else None
+
+    async def run(self, parse_function, body):
+        if self._executor is None or len(body) < self.min_offload_size:
+            return parse_function(body)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, parse_function, body)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import threading
+import time
+
+from infrastructure.disk_cache import DEFAULT_CACHE_DIR
+
+PRICE_HISTORY_PATH = os.path.join(DEFAULT_CACHE_DIR, 'price_history.sqlite3')
+DAY = 24 * 60 * 60
+
+WOLT = 'wolt'
+CHP = 'chp'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_observations (
+    source TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    product TEXT NOT NULL,
+    searched_name TEXT NOT NULL,
+    price REAL NOT NULL,
+    observed_at REAL NOT NULL
+);
+-- Observations are only appended, in time order, so both indexes grow at their ends. price makes the item index cover trends
+CREATE INDEX IF NOT EXISTS price_observations_by_item ON price_observations (searched_name, observed_at, price);
+CREATE INDEX IF NOT EXISTS price_observations_by_venue ON price_observations (source, venue, observed_at);
+
+CREATE TABLE IF NOT EXISTS latest_prices (
+    source TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    product TEXT NOT NULL,
+    searched_name TEXT NOT NULL,
+    price REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (source, venue, product)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS latest_prices_by_item ON latest_prices (searched_name, price);
+"""
+
+
+class PriceHistory:
+    """Every price the searches saw, as (source, venue, product, searched_name, price, timestamp), in SQLite.
+
+    latest_prices keeps the last seen price per product so it doesn't need to scan the history,
+    price_observations keeps everything for trends.
+    """
+
+    def __init__(self, path=PRICE_HISTORY_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Batches are recorded from worker threads, off the event loop, one at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # WAL lets readers query while a run writes its batch
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def record(self, source, observations, observed_at=None):
+        """Add a batch of (venue, product, searched_name, price) observations and upsert the latest prices, in one transaction"""
+        observed_at = time.time() if observed_at is None else observed_at
+        rows = [(source, venue, product, searched_name, price, observed_at) for venue, product, searched_name, price in observations]
+        if not rows:
+            return
+        with self._lock, self.connection:
+            self.connection.executemany("""
+                INSERT INTO price_observations (source, venue, product, searched_name, price, observed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            self.connection.executemany("""
+                INSERT INTO latest_prices (source, venue, product, searched_name, price, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, venue, product) DO UPDATE SET
+                    price = excluded.price, searched_name = excluded.searched_name, last_seen = excluded.last_seen
+                WHERE excluded.last_seen >= latest_prices.last_seen
+            """, rows)
+
+    def last_seen_price(self, source, venue, product):
+        """(price, last_seen) or None"""
+        return self.connection.execute(
+            "SELECT price, last_seen FROM latest_prices WHERE source = ? AND venue = ? AND product = ?",
+            (source, venue, product)
+        ).fetchone()
+
+    def last_seen_prices(self, searched_name, limit=20):
+        """The cheapest last seen prices for a searched item, as (source, venue, product, price, last_seen)"""
+        return self.connection.execute("""
+            SELECT source, venue, product, price, last_seen FROM latest_prices
+            WHERE searched_name = ? ORDER BY price LIMIT ?
+        """, (searched_name, limit)).fetchall()
+
+    def price_trend(self, searched_name, since=None, bucket=DAY):
+        """(bucket start, min, average, max, observations) per bucket of seconds, oldest first"""
+        since = 0 if since is None else since
+        return self.connection.execute("""
+            SELECT CAST(observed_at / :bucket AS INTEGER) * :bucket AS bucket_start,
+                   MIN(price), ROUND(AVG(price), 2), MAX(price), COUNT(*)
+            FROM price_observations
+            WHERE searched_name = :searched_name AND observed_at >= :since
+            GROUP BY bucket_start ORDER BY bucket_start
+        """, {'bucket': bucket, 'searched_name': searched_name, 'since': since}).fetchall()
+
+    def venue_history(self, source, venue, since=None):
+        """(product, searched_name, price, observed_at) seen at a venue, oldest first"""
+        since = 0 if since is None else since
+        return self.connection.execute("""
+            SELECT product, searched_name, price, observed_at FROM price_observations
+            WHERE source = ? AND venue = ? AND observed_at >= ? ORDER BY observed_at, product
+        """, (source, venue, since)).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
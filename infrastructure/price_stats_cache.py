@@ -0,0 +1,32 @@
+import os
+
+from infrastructure.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from infrastructure.search_cache import normalize_query
+from utils.price_stats import PriceStats
+
+# Items not searched for this long start over
+PRICE_STATS_TTL = 180 * 24 * 60 * 60
+PRICE_STATS_MAX_ENTRIES = 2000
+
+
+class PriceStatsCache(DiskCache):
+    """PriceStats per searched item, kept across runs so the price bands build up over time"""
+
+    def __init__(self, path, ttl=PRICE_STATS_TTL, max_entries=PRICE_STATS_MAX_ENTRIES):
+        super().__init__(path, ttl, max_entries)
+
+    def stats_for(self, searched_name):
+        data = self.get(normalize_query(searched_name))
+        return PriceStats.from_dict(data) if data else PriceStats()
+
+    def record(self, searched_name, prices):
+        """Fold prices into the item's stats and return them. Runs without awaiting, so concurrent
+        comparisons can't lose each other's updates."""
+        stats = self.stats_for(searched_name).update_many(prices)
+        if stats.count:
+            self.set(normalize_query(searched_name), stats.to_dict())
+        return stats
+
+    @classmethod
+    def default(cls):
+        return cls(os.path.join(DEFAULT_CACHE_DIR, 'price_stats.json'))
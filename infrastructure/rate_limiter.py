@@ -0,0 +1,97 @@
+import asyncio
+from collections import deque
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket combined with an AIMD concurrency window.
+
+    Every successful, fast response additively grows both the request rate and the number of
+    requests allowed in flight. A throttling response (429/503), an error, or a response slower
+    than the latency target multiplicatively shrinks them.
+    """
+
+    def __init__(self, rate=10.0, min_rate=0.5, max_rate=50.0, burst=None,
+                 concurrency=5, min_concurrency=1, max_concurrency=10,
+                 latency_target=3.0, rate_step=1.0, decrease_factor=0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst or max(1.0, rate)
+        self.concurrency_limit = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.rate_step = rate_step
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._tokens = self.burst
+        self._last_refill = None
+        self._token_lock = asyncio.Lock()
+        self._waiters = deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while self.in_flight >= max(1, int(self.concurrency_limit)):
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass on a wake-up we were given but can no longer use
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_waiters()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        try:
+            await self._take_token()
+        except BaseException:
+            self.in_flight -= 1
+            self._wake_waiters()
+            raise
+
+    def release(self, latency=None, throttled=False):
+        """Free a slot, adapting the limits unless latency is None (e.g. the request was cancelled)"""
+        self.in_flight -= 1
+        if latency is None:
+            pass
+        elif throttled:
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit * self.decrease_factor)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        elif latency > self.latency_target:
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit * self.decrease_factor)
+        else:
+            # Additive increase, spread over a full window of requests
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+            self.rate = min(self.max_rate, self.rate + self.rate_step / self.rate)
+        self._wake_waiters()
+
+    def stats(self):
+        return {
+            'rate': round(self.rate, 2),
+            'concurrency_limit': int(self.concurrency_limit),
+            'in_flight': self.in_flight
+        }
+
+    async def _take_token(self):
+        loop = asyncio.get_running_loop()
+        async with self._token_lock:
+            while True:
+                now = loop.time()
+                if self._last_refill is not None:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def _wake_waiters(self):
+        free_slots = max(1, int(self.concurrency_limit)) - self.in_flight
+        while free_slots > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
@@ -0,0 +1,51 @@
+import math
+import os
+import re
+
+from infrastructure.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from infrastructure.geocoder import normalize_address
+
+WOLT_SEARCH_TTL = 10 * 60
+CHP_SEARCH_TTL = 30 * 60
+SEARCH_CACHE_MAX_ENTRIES = 2000
+# About 1km, so nearby addresses share cached Wolt results
+GRID_CELL_SIZE = 0.01
+
+
+def normalize_query(query):
+    query = re.sub(r"[׳`’‘']", "'", query.lower())
+    return ' '.join(query.split())
+
+
+def grid_cell(lat, lon, cell_size=GRID_CELL_SIZE):
+    return f"{math.floor(lat / cell_size)}:{math.floor(lon / cell_size)}"
+
+
+class SearchCache(DiskCache):
+    """Search results cache keyed by the normalized query and the searched location"""
+
+    def __init__(self, path, ttl, max_entries=SEARCH_CACHE_MAX_ENTRIES, cell_size=GRID_CELL_SIZE):
+        super().__init__(path, ttl, max_entries)
+        self.cell_size = cell_size
+
+    def search_key(self, query, location):
+        """location is either a (lat, lon) pair, bucketed into a grid cell, or an address string"""
+        if isinstance(location, str):
+            location_key = normalize_address(location)
+        else:
+            location_key = grid_cell(*location, self.cell_size)
+        return f"{normalize_query(query)}|{location_key}"
+
+    def get_results(self, query, location):
+        return self.get(self.search_key(query, location))
+
+    def set_results(self, query, location, results):
+        self.set(self.search_key(query, location), results)
+
+    @classmethod
+    def for_wolt(cls):
+        return cls(os.path.join(DEFAULT_CACHE_DIR, 'wolt_search.json'), WOLT_SEARCH_TTL)
+
+    @classmethod
+    def for_chp(cls):
+        return cls(os.path.join(DEFAULT_CACHE_DIR, 'chp_search.json'), CHP_SEARCH_TTL)
@@ -1,34 +1,132 @@
-import requests
+import asyncio
+import os
+import aiohttp
+from infrastructure.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from infrastructure.http_client import HttpClient
+from infrastructure.geocoder import Geocoder
+from infrastructure.search_cache import SearchCache
+from infrastructure.parse_pool import ParsePool
+from infrastructure.single_flight import SingleFlight
+from infrastructure.wolt_parser import parse_wolt_search, parse_wolt_venue
+from models.venue_details import VenueDetails
+from models.wolt_item import WoltItem
+from infrastructure.log import get_logger
+
+logger = get_logger(__name__)
+
+WOLT_SEARCH_URL = "https://restaurant-api.wolt.com/v1/pages/search"
+WOLT_VENUE_URL = "https://restaurant-api.wolt.com/v3/venues/slug/{slug}"
+# Fees change during the day, but not between runs a few minutes apart
+VENUE_DETAILS_TTL = 6 * 60 * 60
+VENUE_DETAILS_MAX_ENTRIES = 5000
 
 class WoltClient:
-    def __init__(self, address):
-        self.search_url = "https://restaurant-api.wolt.com/v1/pages/search"
-        self.lat, self.lon = self._get_lat_lon_by_address(address)
+    def __init__(self, address, http_client=None, geocoder=None, search_cache=None, parse_pool=None, single_flight=None,
+                 venue_cache=None):
+        self.search_url = WOLT_SEARCH_URL
+        self.venue_url = WOLT_VENUE_URL
+        self.address = address
+        self.http_client = http_client or HttpClient()
+        self.geocoder = geocoder or Geocoder(self.http_client)
+        self.search_cache = search_cache if search_cache is not None else SearchCache.for_wolt()
+        self.venue_cache = venue_cache if venue_cache is not None else self.default_venue_cache()
+        self.parse_pool = parse_pool or ParsePool()
+        # Shared between clients so identical searches in flight are only sent once
+        self.single_flight = single_flight or SingleFlight()
+        # Queries this client searched upstream itself, rather than taking the results from the cache or another client
+        self.fetched_queries = set()
+        self.lat, self.lon = None, None
+        self._location_task = None
+
+    @staticmethod
+    def default_venue_cache():
+        return DiskCache(os.path.join(DEFAULT_CACHE_DIR, 'wolt_venues.json'), VENUE_DETAILS_TTL, VENUE_DETAILS_MAX_ENTRIES)
+
+    def start_geocoding(self):
+        """Start resolving the address in the background so it overlaps with other startup work"""
+        if self._location_task is None:
+            self._location_task = asyncio.ensure_future(self.geocoder.get_lat_lon(self.address))
+        return self._location_task
+
+    async def get_lat_lon(self):
+        if self.lat is None:
+            self.lat, self.lon = await self.start_geocoding()
+        return self.lat, self.lon
 
-    def search(self, query):
+    async def search(self, query):
+        """Return the found items as WoltItem records"""
+        try:
+            lat, lon = await self.get_lat_lon()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            # The online stores don't need the location, so their results still count
+            logger.warning(f"Wolt search for {query} skipped, {self.address} could not be geocoded: {e!r}")
+            return []
+        cached_items = self.search_cache.get_results(query, (lat, lon))
+        if cached_items is not None:
+            return [WoltItem(*item) for item in cached_items]
+        # Addresses in the same grid cell share the search, like they share its cached results
+        return await self.single_flight.run(
+            ('wolt', self.search_cache.search_key(query, (lat, lon))),
+            lambda: self._search(query, lat, lon)
+        )
+
+    async def _search(self, query, lat, lon):
+        body = await self.fetch(query)
+        if body is None:
+            return []
+        items = await self.parse_pool.run(parse_wolt_search, body)
+        if items is None:
+            logger.warning(f"Wolt search for {query} returned an invalid response")
+            return []
+        if not items:
+            logger.info(f"No venues found for item {query}")
+        self.fetched_queries.add(query)
+        self.search_cache.set_results(query, (lat, lon), items)
+        return items
+
+    async def fetch(self, query):
+        """Return the raw search response body, or None if the search failed"""
+        lat, lon = await self.get_lat_lon()
         json_data = {
             'q': query,
             'target': 'items',
-            'lat': self.lat,
-            'lon': self.lon,
+            'lat': lat,
+            'lon': lon,
         }
-        response = requests.post(self.search_url, json=json_data)
-        items = response.json().get('sections')[0].get('items')
-        if not items:
-            print(f"No venues found for item {query}")
-            return []
-        return items
+        try:
+            response = await self.http_client.post(self.search_url, json=json_data)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Wolt search for {query} failed: {e!r}")
+            return None
+        if response.status != 200:
+            logger.warning(f"Wolt search for {query} failed with status {response.status}")
+            return None
+        return response.body
+
+    def cached_venue_details(self, slug):
+        cached = self.venue_cache.get(slug)
+        return VenueDetails(*cached) if cached is not None else None
+
+    async def venue_details(self, slug):
+        """Return the venue's delivery fee and minimum order as VenueDetails, or None if the lookup failed"""
+        details = self.cached_venue_details(slug)
+        if details is not None:
+            return details
+        return await self.single_flight.run(('venue', slug), lambda: self._venue_details(slug))
 
-    def _get_lat_lon_by_address(self, address):
-        encoded_address = requests.utils.quote(address)
-        url = f"https://nominatim.openstreetmap.org/search?q={encoded_address}&format=json"
-        response = requests.get(url, headers={"User-Agent": "wolt-prices-comparer"})
-        if response.status_code == 200:
-            data = response.json()
-            if data:
-                location = data[0]
-                return float(location['lat']), float(location['lon'])
-            else:
-                raise ValueError("No results found from Nominatim API")
-        else:
-            response.raise_for_status()
\ No newline at end of file
+    async def _venue_details(self, slug):
+        url = self.venue_url.format(slug=slug)
+        try:
+            response = await self.http_client.get(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Wolt venue lookup for {slug} failed: {e!r}")
+            return None
+        if response.status != 200:
+            logger.warning(f"Wolt venue lookup for {slug} failed with status {response.status}")
+            return None
+        details = parse_wolt_venue(response.body)
+        if details is None:
+            logger.warning(f"Wolt venue lookup for {slug} returned an invalid response")
+            return None
+        self.venue_cache.set(slug, list(details))
+        return details
@@ -0,0 +1,54 @@
+import json
+
+from models.venue_details import VenueDetails
+from models.wolt_item import WoltItem
+
+
+def parse_wolt_search(body):
+    """Decode a Wolt search response into compact WoltItem records.
+    Returns None if the response isn't valid JSON. Hits missing the fields a WoltItem needs are skipped."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    sections = data.get('sections') or [{}]
+    items = sections[0].get('items') or []
+    wolt_items = []
+    for item in items:
+        try:
+            wolt_items.append(project_wolt_item(item))
+        except (AttributeError, KeyError, TypeError):
+            continue
+    return wolt_items
+
+
+def project_wolt_item(item):
+    menu_item = item.get('menu_item')
+    return WoltItem(
+        venue_slug=item.get('link').get('menu_item_details').get('venue_slug'),
+        venue_name=menu_item['venue_name'],
+        name=menu_item['name'],
+        id=menu_item['id'],
+        price=menu_item['price'],
+        is_available=menu_item['is_available'],
+        delivery_time=menu_item.get('delivery_time', menu_item.get('estimate_range')),
+        is_wolt_plus=menu_item.get('is_wolt_plus', menu_item.get('show_wolt_plus'))
+    )
+
+
+def parse_wolt_venue(body):
+    """Decode a Wolt venue response into VenueDetails.
+    Returns None if the response isn't valid JSON or has no venue."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    results = data.get('results') if isinstance(data, dict) else None
+    if not results:
+        return None
+    venue = results[0]
+    pricing = (venue.get('delivery_specs') or {}).get('delivery_pricing') or {}
+    # Prices are in agorot, like the search's; orders below the small order surcharge limit pay the difference
+    delivery_fee = pricing.get('base_price', venue.get('delivery_price_int')) or 0
+    minimum_order = pricing.get('small_order_surcharge_limit', venue.get('small_order_surcharge_limit')) or 0
+    return VenueDetails(delivery_fee / 100, minimum_order / 100)
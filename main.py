@@ -1,7 +1,14 @@
-from services.wolt_service import WoltService
-from services.chp_service import ChpService
+from api import compare, Caches
 from utils.report_generator import ReportGenerator
+from infrastructure.http_client import HttpClient
+from infrastructure.parse_pool import ParsePool
+from infrastructure.log import LOGGER_NAME
+from infrastructure.price_history import PriceHistory
+from bidi.algorithm import get_display
+from settings import HTTP_POOL_SIZE, HTTP_MAX_CONCURRENCY, HEDGE_REQUESTS, PARSE_WORKERS
 import asyncio
+import logging
+import sys
 
 
 # A list of tuples where each tuple contains an item to search and a boolean indicating whether
@@ -31,25 +38,32 @@ ITEMS_TO_SEARCH = [
 
 ADDRESS = "ז'בוטינסקי 2, רמת גן"
 
+# Searches still running this many seconds into the run are dropped and flagged in the report
+RUN_DEADLINE_SECONDS = 30
+
 async def main():
-    wolt_service = WoltService(ADDRESS, ITEMS_TO_SEARCH)
-    chp_service = ChpService(ADDRESS, ITEMS_TO_SEARCH)
-    await asyncio.gather(
-        wolt_service.fetch_items(),
-        chp_service.fetch_items()
-    )
-    wolt_service.map_venues()
-    wolt_service.check_missing_items()
-    wolt_service.calculate_average_prices()
-    wolt_service.filter_duplicates()
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    logger.setLevel(logging.INFO)
+    with ParsePool(PARSE_WORKERS) as parse_pool, PriceHistory() as price_history:
+        async with HttpClient(HTTP_POOL_SIZE, HTTP_MAX_CONCURRENCY, hedge_requests=HEDGE_REQUESTS) as http_client:
+            print("Fetching items from Wolt and CHP asynchronously...")
+            comparison = compare(ADDRESS, ITEMS_TO_SEARCH, http_client, parse_pool, Caches(), RUN_DEADLINE_SECONDS, price_history)
+            async for ranking in comparison:
+                if ranking.cheapest_venue:
+                    print(f"Cheapest so far: {get_display(ranking.cheapest_venue.name)} "
+                          f"₪{ranking.normalized_total(ranking.cheapest_venue):.2f}")
+            result = await comparison.result()
+            print(f"Upstream request limits: {http_client.stats()}")
     
     report_generator = ReportGenerator(ITEMS_TO_SEARCH)
     report_generator.generate_report(
         "results.html",
-        wolt_service.venue_id_to_venue,
-        wolt_service.average_price_map,
-        chp_service.get_complete_venues()
+        result.ranking,
+        list(result.chp_venues),
+        list(result.timed_out_searches),
+        list(result.chp_timed_out_searches)
     )
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,4 @@
+from collections import namedtuple
+
+# One online store's offer for a searched item, as parsed from a CHP results page
+ChpResult = namedtuple('ChpResult', ['chain_name', 'store_name', 'website', 'item_url', 'price'])
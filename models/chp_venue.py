@@ -1,15 +1,29 @@
+import sys
+
+from models.item_bits import ItemBits
+
+
 class ChpVenue:
-    def __init__(self, name, website_url):
-        self.name = name
-        self.website_url = website_url
+    __slots__ = ('name', 'website_url', 'items', 'missing_items', 'item_bits', 'coverage')
+
+    def __init__(self, name, website_url, item_bits=None):
+        self.name = sys.intern(name)
+        self.website_url = sys.intern(website_url)
         self.items = {}  # Dict of item_name to (price, item_url)
         self.missing_items = set()
+        self.item_bits = item_bits if item_bits is not None else ItemBits()
+        self.coverage = 0  # item_bits mask of the searched items offered here
 
     def add_item(self, item_name, price, item_url=None):
-        self.items[item_name] = (price, item_url)
+        self.items[sys.intern(item_name)] = (price, item_url)
+        self.coverage |= self.item_bits.bit(item_name)
 
     def add_missing_item(self, item_name):
-        self.missing_items.add(item_name)
+        self.missing_items.add(sys.intern(item_name))
+
+    def missing_count(self, required):
+        """How many of the items in the required mask this store doesn't offer"""
+        return (required & ~self.coverage).bit_count()
 
     def total_price(self):
         return round(sum(price for price, _ in self.items.values()), 2)
@@ -0,0 +1,29 @@
+class ItemBits:
+    """Gives each searched item its own bit, so the items a venue covers fit in one int.
+
+    Share one between the venues of a comparison so their masks line up. Items seen for the first
+    time get the next free bit.
+    """
+
+    def __init__(self, searched_names=()):
+        self._bits = {}
+        for searched_name in searched_names:
+            self.bit(searched_name)
+
+    def bit(self, searched_name):
+        bit = self._bits.get(searched_name)
+        if bit is None:
+            bit = self._bits[searched_name] = 1 << len(self._bits)
+        return bit
+
+    def mask(self, searched_names):
+        mask = 0
+        for searched_name in searched_names:
+            mask |= self.bit(searched_name)
+        return mask
+
+    def names(self, mask):
+        return [searched_name for searched_name, bit in self._bits.items() if mask & bit]
+
+    def __len__(self):
+        return len(self._bits)
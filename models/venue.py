@@ -1,20 +1,61 @@
+import sys
+
+from models.item_bits import ItemBits
 from models.venue_item import VenueItem
 
+VENUE_URL = "https://wolt.com/he/isr/tel-aviv/venue/{slug}"
+
 
 class Venue:
-    def __init__(self, name, slug, is_wolt_plus, delivery_time, is_available):
-        self.name = name
+    __slots__ = (
+        'name', 'items', 'items_by_searched_name', 'items_price', 'missing_items', 'is_wolt_plus', 'delivery_time', 'errors',
+        'is_available', 'slug', 'item_bits', 'coverage', 'delivery_fee', 'minimum_order'
+    )
+
+    def __init__(self, name, slug, is_wolt_plus, delivery_time, is_available, item_bits=None):
+        self.name = sys.intern(name)
         self.items = set()
+        self.items_by_searched_name = {}  # searched_name -> list of the items found for it
+        self.items_price = 0.0  # Running sum of the item prices, unrounded
         self.missing_items = set()
         self.is_wolt_plus = is_wolt_plus
         self.delivery_time = delivery_time
         self.errors = []
         self.is_available = is_available
-        self.slug = slug
-        self.url = f"https://wolt.com/he/isr/tel-aviv/venue/{slug}"
+        self.slug = sys.intern(slug)
+        self.item_bits = item_bits if item_bits is not None else ItemBits()
+        self.coverage = 0  # item_bits mask of the searched items found here
+        # From the venue details, None until they are fetched
+        self.delivery_fee = None
+        self.minimum_order = None
+
+    @property
+    def url(self):
+        return VENUE_URL.format(slug=self.slug)
 
     def add_item(self, item: VenueItem):
+        if item in self.items:
+            return
         self.items.add(item)
+        self.items_by_searched_name.setdefault(item.searched_name, []).append(item)
+        self.items_price += item.price
+        self.coverage |= self.item_bits.bit(item.searched_name)
+
+    def items_for(self, searched_name):
+        return self.items_by_searched_name.get(searched_name, [])
+
+    def replace_items_for(self, searched_name, item: VenueItem = None):
+        """Drop every item found for searched_name, keeping only item if given"""
+        for old_item in self.items_by_searched_name.pop(searched_name, []):
+            self.items.discard(old_item)
+            self.items_price -= old_item.price
+        self.coverage &= ~self.item_bits.bit(searched_name)
+        if item:
+            self.add_item(item)
+
+    def missing_count(self, required):
+        """How many of the items in the required mask weren't found here"""
+        return (required & ~self.coverage).bit_count()
 
     def add_missing_item(self, item: VenueItem):
         self.missing_items.add(item)
@@ -25,17 +66,37 @@ class Venue:
     def total_price(self):
         return round(sum(item.price for item in self.items), 2)
 
+    def set_details(self, details):
+        self.delivery_fee, self.minimum_order = details
+
+    @property
+    def details_known(self):
+        """False until the venue details are fetched, and for good if the lookup failed"""
+        return self.delivery_fee is not None
+
+    def small_order_surcharge(self):
+        """What the order pays on top of its items to reach the minimum order"""
+        if not self.minimum_order:
+            return 0.0
+        return max(0.0, self.minimum_order - self.items_price)
+
+    def checkout_costs(self):
+        """The delivery fee plus the small order surcharge, 0 while the details are unknown"""
+        return (self.delivery_fee or 0) + self.small_order_surcharge()
+
     def total_normalized_price(self, average_price_map):
-        total_price = self.total_price()
+        total_price = self.total_price() + self.checkout_costs()
         for missing_item in self.missing_items:
             total_price += average_price_map.get(missing_item.searched_name, 0)
         return round(total_price, 2)
 
     def __hash__(self):
-        return hash(self.v_id)
+        return hash(self.slug)
 
     def __eq__(self, other):
-        return self.v_id == other.v_id
+        if not isinstance(other, Venue):
+            return NotImplemented
+        return self.slug == other.slug
 
     def __str__(self):
         return self.name
\ No newline at end of file
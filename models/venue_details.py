@@ -0,0 +1,4 @@
+from collections import namedtuple
+
+# What a Wolt venue charges on top of the items at checkout, in shekels
+VenueDetails = namedtuple('VenueDetails', ['delivery_fee', 'minimum_order'])
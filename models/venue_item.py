@@ -1,17 +1,30 @@
+import sys
+
+VENUE_ITEM_URL = "https://wolt.com/he/isr/tel-aviv/venue/{venue_id}/itemid-{id}"
+
 
 class VenueItem:
+    # Millions of these are created per run: no per-instance __dict__, strings that repeat across items
+    # (product, searched and venue names) are interned, the hash is computed once and the URL on demand
+    __slots__ = ('name', 'id', 'searched_name', 'price', 'venue_id', '_hash')
+
     def __init__(self, name, id, searched_name, price, venue_id):
-        self.name = name
+        self.name = sys.intern(name)
         self.id = id
-        self.searched_name = searched_name
+        self.searched_name = sys.intern(searched_name)
         self.price = round(price, 2)
-        self.url = f"https://wolt.com/he/isr/tel-aviv/venue/{venue_id}/itemid-{id}"
+        self.venue_id = sys.intern(venue_id)
+        self._hash = hash((self.name, self.price))
+
+    @property
+    def url(self):
+        return VENUE_ITEM_URL.format(venue_id=self.venue_id, id=self.id)
 
     def __str__(self):
         return f"{self.name} - ₪{self.price}"
 
     def __hash__(self):
-        return hash(self.name + str(self.price))
+        return self._hash
 
     def __eq__(self, other):
         return self.name == other.name and self.price == other.price
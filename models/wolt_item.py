@@ -0,0 +1,6 @@
+from collections import namedtuple
+
+# The fields of a Wolt search hit the pipeline uses, projected out of the raw menu item payload
+WoltItem = namedtuple('WoltItem', [
+    'venue_slug', 'venue_name', 'name', 'id', 'price', 'is_available', 'delivery_time', 'is_wolt_plus'
+])
@@ -0,0 +1,237 @@
+"""Comparison service: keeps connection pools and caches warm between comparisons.
+
+    python server.py
+
+POST /compare with {"address": "...", "items": [["כוסמת 500 גרם", true], ["שוקולית 500 גרם", false]]}
+answers with the ranking as JSON. GET /stats reports the queue, upstream limits and cache sizes.
+"""
+import asyncio
+import logging
+import sys
+
+from aiohttp import web
+
+from api import Comparison, Caches, DEFAULT_TIMEOUT
+from infrastructure.disk_cache import save_in_background
+from infrastructure.geocoder import Geocoder
+from infrastructure.http_client import HttpClient
+from infrastructure.log import LOGGER_NAME, get_logger
+from infrastructure.parse_pool import ParsePool
+from infrastructure.price_history import PriceHistory
+from settings import HTTP_POOL_SIZE, HTTP_MAX_CONCURRENCY, HEDGE_REQUESTS, PARSE_WORKERS
+
+logger = get_logger(__name__)
+
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+
+# Comparisons run at once, and how many more may wait for a turn before requests are turned away
+MAX_CONCURRENT_COMPARISONS = 4
+MAX_QUEUED_COMPARISONS = 32
+# Seconds between writes of the persistent caches, which are also written at shutdown
+CACHE_SAVE_INTERVAL = 60
+
+
+class ComparisonServer:
+    """Runs comparisons for JSON requests, sharing one HTTP client, geocoder and set of caches between them.
+
+    Requests wait in a bounded queue for one of max_concurrent comparison workers; when the queue
+    is full they are answered with 503 straight away.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_COMPARISONS, max_queued=MAX_QUEUED_COMPARISONS,
+                 http_client=None, parse_workers=None, caches=None, timeout=DEFAULT_TIMEOUT, price_history=None,
+                 cache_save_interval=CACHE_SAVE_INTERVAL):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.price_history = price_history
+        self.http_client = http_client
+        self.parse_workers = parse_workers
+        self.caches = caches or Caches.in_memory()
+        self.cache_save_interval = cache_save_interval
+        self.queue = asyncio.Queue(max_queued)
+        self.running = 0
+        self.completed = 0
+        self._own_http_client = http_client is None
+        self._workers = []
+        self._saver = None
+        self.parse_pool = None
+        self.geocoder = None
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_post('/compare', self.handle_compare)
+        app.router.add_get('/stats', self.handle_stats)
+        app.on_startup.append(self.start)
+        app.on_cleanup.append(self.close)
+        return app
+
+    async def start(self, app=None):
+        if self.http_client is None:
+            self.http_client = HttpClient(HTTP_POOL_SIZE, HTTP_MAX_CONCURRENCY, hedge_requests=HEDGE_REQUESTS)
+        self.parse_pool = ParsePool(self.parse_workers)
+        # One geocoder for every comparison, so Nominatim's rate limit holds across requests
+        self.geocoder = Geocoder(self.http_client, self.caches.geocode)
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.max_concurrent)]
+        self._saver = asyncio.ensure_future(self._save_periodically())
+
+    async def close(self, app=None):
+        for task in self._workers + [self._saver]:
+            task.cancel()
+        await asyncio.gather(*self._workers, self._saver, return_exceptions=True)
+        await self.save_caches()
+        self.parse_pool.close()
+        if self._own_http_client:
+            await self.http_client.close()
+
+    async def save_caches(self):
+        """Write the persistent caches from a worker thread, so comparisons keep running meanwhile"""
+        try:
+            await save_in_background(self.caches.disk_caches())
+        except OSError as e:
+            logger.warning(f"Saving the caches failed: {e!r}")
+
+    async def _save_periodically(self):
+        while True:
+            await asyncio.sleep(self.cache_save_interval)
+            await self.save_caches()
+
+    async def _work(self):
+        while True:
+            address, items_to_search, timeout, future = await self.queue.get()
+            try:
+                # The client may have given up while the request was queued
+                if future.done():
+                    continue
+                self.running += 1
+                try:
+                    result = await Comparison(
+                        address, items_to_search, self.http_client, self.parse_pool, self.caches, timeout, self.geocoder,
+                        self.price_history, save_caches=False
+                    ).result()
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+            finally:
+                self.queue.task_done()
+
+    async def handle_compare(self, request):
+        try:
+            address, items_to_search, timeout = self._parse_request(await request.json())
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((address, items_to_search, timeout, future))
+        except asyncio.QueueFull:
+            return web.json_response({'error': "Too many comparisons queued"}, status=503, headers={'Retry-After': '5'})
+        try:
+            result = await future
+        except Exception as e:
+            logger.warning(f"Comparison for {address} failed: {e!r}")
+            return web.json_response({'error': f"Comparison failed: {e}"}, status=502)
+        finally:
+            # Lets the worker skip a request whose client disconnected
+            future.cancel()
+        return web.json_response(result_to_json(result))
+
+    def _parse_request(self, data):
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        address = data.get('address')
+        if not isinstance(address, str) or not address.strip():
+            raise ValueError("'address' must be a non-empty string")
+        items = data.get('items')
+        if not isinstance(items, list) or not items:
+            raise ValueError("'items' must be a non-empty list of [name, must_include] pairs")
+        items_to_search = []
+        for item in items:
+            if isinstance(item, str):
+                item = [item, True]
+            if (not isinstance(item, list) or len(item) != 2 or not isinstance(item[0], str)
+                    or not item[0].strip() or not isinstance(item[1], bool)):
+                raise ValueError("'items' must be a non-empty list of [name, must_include] pairs")
+            items_to_search.append((item[0], item[1]))
+        timeout = data.get('timeout', self.timeout)
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or not 0 < timeout <= self.timeout:
+            raise ValueError(f"'timeout' must be a number of seconds up to {self.timeout}")
+        return address, items_to_search, timeout
+
+    async def handle_stats(self, request):
+        return web.json_response({
+            'queued': self.queue.qsize(),
+            'running': self.running,
+            'completed': self.completed,
+            'upstream': self.http_client.stats(),
+            'in_flight': self.caches.in_flight.stats() if self.caches.in_flight else None,
+            'cache_entries': {
+                name: len(cache) for name, cache in (
+                    ('wolt_search', self.caches.wolt_search),
+                    ('chp_search', self.caches.chp_search),
+                    ('barcodes', self.caches.barcodes),
+                    ('geocode', self.caches.geocode),
+                    ('price_stats', self.caches.price_stats),
+                    ('venue_details', self.caches.venue_details),
+                ) if cache is not None
+            },
+        })
+
+
+def venue_to_json(venue, ranking):
+    return {
+        'name': venue.name,
+        'slug': venue.slug,
+        'url': venue.url,
+        'total_price': ranking.normalized_total(venue),
+        'delivery_fee': venue.delivery_fee,
+        'minimum_order': venue.minimum_order,
+        'items': [
+            {'name': item.name, 'searched_name': item.searched_name, 'price': item.price}
+            for item in sorted(venue.items, key=lambda item: item.searched_name)
+        ],
+        'missing_items': sorted(item.searched_name for item in venue.missing_items),
+    }
+
+
+def result_to_json(result):
+    ranking = result.ranking
+    return {
+        'cheapest_venues': [venue_to_json(venue, ranking) for venue in ranking.top_venues],
+        'venues_missing_one_item': [venue_to_json(venue, ranking) for venue in ranking.one_missing_venues],
+        'most_expensive_venue': venue_to_json(ranking.most_expensive_venue, ranking) if ranking.most_expensive_venue else None,
+        'complete_venues_count': ranking.complete_venues_count,
+        'min_total_price': ranking.min_total,
+        'max_total_price': ranking.max_total,
+        'online_stores': [
+            {
+                'name': venue.name,
+                'website': venue.website_url,
+                'total_price': venue.total_price(),
+                'items': {item_name: price for item_name, (price, url) in venue.items.items()},
+            }
+            for venue in sorted(result.chp_venues, key=lambda venue: venue.total_price())
+        ],
+        'timed_out_searches': list(result.timed_out_searches),
+        'chp_timed_out_searches': list(result.chp_timed_out_searches),
+    }
+
+
+def main():
+    log = logging.getLogger(LOGGER_NAME)
+    log.addHandler(logging.StreamHandler(sys.stdout))
+    log.setLevel(logging.INFO)
+    # Persistent caches, so a restart doesn't start cold
+    with PriceHistory() as price_history:
+        server = ComparisonServer(parse_workers=PARSE_WORKERS, caches=Caches.on_disk(), price_history=price_history)
+        web.run_app(server.create_app(), host=SERVER_HOST, port=SERVER_PORT)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,49 +1,80 @@
-from bidi.algorithm import get_display
 import asyncio
+from bidi.algorithm import get_display
 
 from infrastructure.chp_client import ChpClient
 from models.chp_venue import ChpVenue
+from models.item_bits import ItemBits
+from infrastructure.price_history import CHP
+from infrastructure.log import get_logger
+
+logger = get_logger(__name__)
 
 class ChpService:
-    def __init__(self, address, items_to_search):
+    def __init__(self, address, items_to_search, http_client=None, parse_pool=None, search_cache=None, barcode_cache=None, single_flight=None,
+                 price_history=None):
         self.address = address
         self.items_to_search = items_to_search
-        self.chp_client = ChpClient(address)
+        self.chp_client = ChpClient(address, http_client, search_cache, parse_pool, barcode_cache=barcode_cache, single_flight=single_flight)
         self.venues = {}
+        self.must_include_items = {item[0] for item in items_to_search if item[1]}
+        self.item_bits = ItemBits(item[0] for item in items_to_search)
+        self.timed_out_searches = []
+        self.completed_searches = []
+        self.total_items_found = 0
+        self.price_history = price_history
+        self.price_observations = []  # (venue, product, searched_name, price), written to price_history in one batch
+
+    async def search(self, item_to_search):
+        return await self.chp_client.search(item_to_search)
+
+    def add_search_results(self, item_to_search, found_items):
+        """Fold one finished search into the online stores straight away"""
+        for result in found_items:
+            website = result.website
+            if website not in self.venues:
+                self.venues[website] = ChpVenue(result.store_name, website, self.item_bits)
+                # A store first seen now has nothing for the must-include searches that already finished
+                for searched_name in self.completed_searches:
+                    if searched_name in self.must_include_items:
+                        self.venues[website].add_missing_item(searched_name)
+            
+            self.venues[website].add_item(
+                item_to_search,
+                result.price,
+                result.item_url
+            )
+        self.completed_searches.append(item_to_search)
+        self.total_items_found += len(found_items)
+        # CHP results are matched to one product per searched item, so the searched name stands in for it.
+        # Cached and shared results were recorded by whoever fetched them
+        if item_to_search in self.chp_client.fetched_queries:
+            self.price_observations.extend((result.website, item_to_search, item_to_search, result.price) for result in found_items)
 
-    async def fetch_items(self):
-        print("\nFetching items from CHP asynchronously...")
-        tasks = []
-        for item_to_search, must_include in self.items_to_search:
-            tasks.append(asyncio.to_thread(self.chp_client.search, item_to_search))
-        results = await asyncio.gather(*tasks)
-
-        total_items_found = 0
-        for (item_to_search, must_include), found_items in zip(self.items_to_search, results):
-            total_items_found += len(found_items)
-            for result in found_items:
-                website = result['website']
-                if website not in self.venues:
-                    self.venues[website] = ChpVenue(result['store_name'], website)
-                
-                self.venues[website].add_item(
-                    item_to_search,
-                    result['price'],
-                    result['item_url']
-                )
-
-        print(f"Found {total_items_found} items from {len(self.venues)} online stores.")
-        
         # Mark missing items
-        for website, venue in self.venues.items():
-            for item_to_search, must_include in self.items_to_search:
-                if must_include and item_to_search not in venue.items:
+        if item_to_search in self.must_include_items:
+            bit = self.item_bits.bit(item_to_search)
+            for venue in self.venues.values():
+                if not venue.coverage & bit:
                     venue.add_missing_item(item_to_search)
 
+    def finish_fetching(self):
+        """Flag the searches that never finished and leave them out of the comparison"""
+        self.timed_out_searches = [item[0] for item in self.items_to_search if item[0] not in self.completed_searches]
+        if self.timed_out_searches:
+            logger.info(f"{len(self.timed_out_searches)} CHP searches failed or did not finish before the deadline.")
+            self.items_to_search = [item for item in self.items_to_search if item[0] in self.completed_searches]
+        logger.info(f"Found {self.total_items_found} items from {len(self.venues)} online stores.")
+
+    def disk_caches(self):
+        return [self.chp_client.search_cache, self.chp_client.barcode_cache]
+
+    async def record_prices(self):
+        """Write the prices seen to the price history in one batch, from a worker thread"""
+        if self.price_history and self.price_observations:
+            observations, self.price_observations = self.price_observations, []
+            await asyncio.to_thread(self.price_history.record, CHP, observations)
+
     def get_complete_venues(self):
         """Return venues that have all must-include items"""
-        must_include_items = {item[0] for item in self.items_to_search if item[1]}
-        return [
-            venue for venue in self.venues.values()
-            if not any(item in venue.missing_items for item in must_include_items)
-        ]
+        required = self.item_bits.mask(item[0] for item in self.items_to_search if item[1])
+        return [venue for venue in self.venues.values() if not venue.missing_count(required)]
@@ -0,0 +1,56 @@
+from contextlib import aclosing
+
+from infrastructure.log import get_logger
+from utils.deadline import as_completed_until
+
+logger = get_logger(__name__)
+
+
+class SearchPipeline:
+    """Runs the Wolt and CHP searches side by side and folds each one in as soon as it finishes.
+
+    run() yields a provisional Ranking after every finished search, covering the searches that are
+    in so far, so the cheapest venue is known before the slowest search returns. A search that
+    fails is logged and left out of the comparison like one that timed out.
+    """
+
+    def __init__(self, wolt_service, chp_service):
+        self.wolt_service = wolt_service
+        self.chp_service = chp_service
+
+    async def run(self, deadline=None):
+        searches = [
+            (service, item_to_search)
+            for service in (self.wolt_service, self.chp_service)
+            for item_to_search, must_include in service.items_to_search
+        ]
+        async with aclosing(as_completed_until([self._search(service, item_to_search) for service, item_to_search in searches], deadline)) as results:
+            async for index, found_items in results:
+                if found_items is None:
+                    continue
+                service, item_to_search = searches[index]
+                service.add_search_results(item_to_search, found_items)
+                yield self.ranking()
+        self.wolt_service.finish_fetching()
+        self.chp_service.finish_fetching()
+
+    @staticmethod
+    async def _search(service, item_to_search):
+        """service.search, or None if it raised, so one bad response doesn't end the comparison"""
+        try:
+            return await service.search(item_to_search)
+        except Exception:
+            logger.exception(f"{type(service).__name__} search for {item_to_search} failed")
+            return None
+
+    def ranking(self):
+        """Ranking over the searches that have finished so far"""
+        return self.wolt_service.ranking(chp_venues=self.chp_service.get_complete_venues())
+
+    @property
+    def completed_searches_count(self):
+        return len(self.wolt_service.completed_searches) + len(self.chp_service.completed_searches)
+
+    @property
+    def searches_count(self):
+        return len(self.wolt_service.items_to_search) + len(self.chp_service.items_to_search)
@@ -1,98 +1,177 @@
+import asyncio
 import os  # New import
 from infrastructure.wolt_client import WoltClient
+from models.item_bits import ItemBits
 from models.venue import Venue
 from models.venue_item import VenueItem
 from utils.duplicate_items_handler import DuplicateItemsHandler
+from utils.deadline import gather_until
+from utils.price_matrix import PriceMatrix
+from utils.ranking import Ranking
+from infrastructure.price_history import WOLT
 from bidi.algorithm import get_display
-import asyncio
+from infrastructure.log import get_logger
+
+logger = get_logger(__name__)
+
+# Venue details requests in flight at once
+VENUE_DETAILS_CONCURRENCY = 8
+# Rankings redone with the fetched details before giving up on an exact top
+MAX_CHECKOUT_ROUNDS = 5
+# Seconds the venue details lookups get once the searches are over, so a search that ran into the deadline doesn't cancel them
+VENUE_DETAILS_TIMEOUT = 5
 
 class WoltService:
-    def __init__(self, address, items_to_search):
+    def __init__(self, address, items_to_search, http_client=None, parse_pool=None, geocoder=None, search_cache=None, single_flight=None,
+                 price_history=None, price_stats=None, venue_cache=None):
         self.address = address
         self.items_to_search = items_to_search
-        self.wolt_client = WoltClient(address)
+        self.wolt_client = WoltClient(address, http_client, geocoder, search_cache, parse_pool, single_flight, venue_cache)
         self.venue_id_to_venue = {}
-        self.venue_to_items_map = {}
+        self.item_bits = ItemBits(item[0] for item in items_to_search)
+        # The venues' prices as a matrix, which the rankings are computed over
+        self.price_matrix = PriceMatrix(item[0] for item in items_to_search)
         self.item_price_map = {item[0]: [] for item in items_to_search}
         self.average_price_map = {}
+        self.timed_out_searches = []
+        self.completed_searches = []
+        self.total_items_fetched = 0
+        self.price_history = price_history
+        self.price_observations = []  # (venue, product, searched_name, price), written to price_history in one batch
+        self.price_stats = price_stats  # A PriceStatsCache; without one duplicates are filtered by this run's average
+        self.details_fetched = set()  # Slugs of the venues whose details were looked up, found or not
+
+    async def search(self, item_to_search):
+        return await self.wolt_client.search(item_to_search)
+
+    def add_search_results(self, item_to_search, items):
+        """Fold one finished search into the venues straight away.
+
+        Only this search finds items for item_to_search, so mapping, missing items, the average
+        price and duplicate filtering for it don't need to wait for the other searches.
+        """
+        venue_to_items = self.sort_found_items_by_venue(items, item_to_search)
+        for venue_id, venue_items in venue_to_items.items():
+            venue = self.venue_id_to_venue.get(venue_id)
+            if venue is None:
+                venue = self._create_venue(venue_id, venue_items[0][1])
+                # A venue first seen now has nothing for the searches that already finished
+                for searched_name in self.completed_searches:
+                    venue.add_missing_item(VenueItem(searched_name, '', searched_name, 0, venue.slug))
+            for searched_name, item in venue_items:
+                venue.add_item(VenueItem(item.name, item.id, searched_name, item.price / 100, venue.slug))
+        self.completed_searches.append(item_to_search)
+        self.total_items_fetched += len(items)
+        # Cached and shared results were recorded by whoever fetched them
+        fetched = item_to_search in self.wolt_client.fetched_queries
+        if fetched:
+            self.price_observations.extend((item.venue_slug, item.name, item_to_search, item.price / 100) for item in items)
 
-    async def fetch_items(self):
-        print("Fetching items from Wolt client asynchronously...")
-        tasks = []
-        for item_to_search, must_include in self.items_to_search:
-            tasks.append(asyncio.to_thread(self.wolt_client.search, item_to_search))
-        results = await asyncio.gather(*tasks)
-
-        total_items_fetched = 0
-        for (item_to_search, must_include), items in zip(self.items_to_search, results):
-            total_items_fetched += len(items)
-            venue_to_items = self.sort_found_items_by_venue(items, item_to_search)
-            for venue_id, venue_items in venue_to_items.items():
-                if venue_id not in self.venue_to_items_map:
-                    self.venue_to_items_map[venue_id] = []
-                self.venue_to_items_map[venue_id].extend(venue_items)
-        print(f"Finished fetching {total_items_fetched} items.")
-
-    def map_venues(self):
-        print("Mapping venues...")
-        total_venues_mapped = 0
-        for venue_id, venue_items in self.venue_to_items_map.items():
-            is_wolt_plus = venue_items[0].get('is_wolt_plus', venue_items[0].get('show_wolt_plus'))
-            delivery_time = venue_items[0].get('delivery_time', venue_items[0].get('estimate_range'))
-            venue = Venue(venue_items[0]['venue_name'], venue_id, is_wolt_plus, delivery_time, venue_items[0]['is_available'])
-            self.venue_id_to_venue[venue_id] = venue
-            for item in venue_items:
-                venue_item = VenueItem(item['name'], item['id'], item['searched_name'], item['price'] / 100, venue.slug)
-                venue.add_item(venue_item)
-            total_venues_mapped += 1
-        print(f"Finished mapping {total_venues_mapped} venues.")
-
-    def check_missing_items(self):
-        print("Checking for missing items in venues...")
-        total_missing_items = 0
-        for venue in self.venue_id_to_venue.values():
-            for item_to_search, must_include in self.items_to_search:
-                if not any(item.searched_name == item_to_search for item in venue.items):
-                    missing_item = VenueItem(item_to_search, '', item_to_search, 0, venue.slug)
-                    venue.add_missing_item(missing_item)
-                    total_missing_items += 1
-        print(f"Finished checking for missing items. Found {total_missing_items} missing items.")
-
-    def calculate_average_prices(self):
-        print("Calculating average prices...")
-        total_prices_calculated = 0
-        for item_to_search, must_include in self.items_to_search:
-            for venue in self.venue_id_to_venue.values():
-                matching_items = [item for item in venue.items if item.searched_name == item_to_search]
-                if len(matching_items) == 1:
-                    self.item_price_map[item_to_search].append(matching_items[0].price)
-                    total_prices_calculated += 1
-        self.average_price_map = {item: (round(sum(prices) / len(prices), 2)) if prices else 0 for item, prices in self.item_price_map.items()}
-        print(f"Finished calculating average prices for {total_prices_calculated} items.")
-
-    def filter_duplicates(self):
-        print("Filtering duplicate items...")
-        total_duplicates_filtered = 0
-        total_venues_processed = 0
         for venue in self.venue_id_to_venue.values():
-            for item_to_search, must_include in self.items_to_search:
-                matching_items = [item for item in venue.items if item.searched_name == item_to_search]
-                if len(matching_items) > 1:
-                    filtered_item = DuplicateItemsHandler.filter_out_duplicates(matching_items, self.average_price_map)
-                    venue.items = {item for item in venue.items if item.searched_name != item_to_search}
-                    if filtered_item:
-                        venue.add_item(filtered_item)
-                    total_duplicates_filtered += len(matching_items) - 1
-            total_venues_processed += 1
-        print(f"Finished filtering {total_duplicates_filtered} duplicate items from {total_venues_processed} venues.")
+            if item_to_search not in venue.items_by_searched_name:
+                venue.add_missing_item(VenueItem(item_to_search, '', item_to_search, 0, venue.slug))
+
+        venues_with_items = [self.venue_id_to_venue[venue_id] for venue_id in venue_to_items]
+        prices = [venue.items_for(item_to_search)[0].price for venue in venues_with_items if len(venue.items_for(item_to_search)) == 1]
+        self.item_price_map[item_to_search] = prices
+        self.average_price_map[item_to_search] = round(sum(prices) / len(prices), 2) if prices else 0
+        price_band = None
+        if self.price_stats is not None:
+            stats = self.price_stats.record(item_to_search, prices) if fetched else self.price_stats.stats_for(item_to_search)
+            price_band = stats.band()
+
+        DuplicateItemsHandler.resolve_duplicates(venues_with_items, item_to_search, self.average_price_map, price_band)
+        self.price_matrix.set_column(item_to_search, venues_with_items)
+
+    def ranking(self, items_to_search=None, chp_venues=None):
+        """Ranking of the venues over items_to_search, by default the searches that finished"""
+        if items_to_search is None:
+            items_to_search = self.completed_items_to_search()
+        return Ranking.from_price_matrix(self.price_matrix, items_to_search, self.average_price_map, chp_venues)
+
+    def completed_items_to_search(self):
+        """items_to_search narrowed to the searches that finished, in their original order"""
+        return [item for item in self.items_to_search if item[0] in self.completed_searches]
+
+    def finish_fetching(self):
+        """Flag the searches that never finished and leave them out of the comparison"""
+        self.timed_out_searches = [item[0] for item in self.items_to_search if item[0] not in self.completed_searches]
+        if self.timed_out_searches:
+            logger.info(f"{len(self.timed_out_searches)} Wolt searches failed or did not finish before the deadline.")
+            self.items_to_search = self.completed_items_to_search()
+            for item_to_search in self.timed_out_searches:
+                self.item_price_map.pop(item_to_search, None)
+        self.average_price_map = {item: self.average_price_map.get(item, 0) for item, _ in self.items_to_search}
+        logger.info(f"Finished fetching {self.total_items_fetched} items from {len(self.venue_id_to_venue)} venues.")
+
+    async def add_checkout_costs(self, timeout=VENUE_DETAILS_TIMEOUT):
+        """Fetch the delivery fee and minimum order of the venues the ranking shows, and rank again until it settles.
+
+        Checkout costs only ever raise a venue's total, so once every venue shown has its details
+        no venue without them can be cheaper, and only a few dozen venues are ever looked up.
+        The lookups get timeout seconds from now, apart from the searches' deadline.
+        """
+        deadline = asyncio.get_running_loop().time() + timeout if timeout else None
+        for _ in range(MAX_CHECKOUT_ROUNDS):
+            ranking = self.ranking(self.items_to_search)
+            shown = ranking.top_venues + ranking.one_missing_venues + (ranking.most_expensive_venue,)
+            venues = [venue for venue in dict.fromkeys(shown) if venue is not None and venue.slug not in self.details_fetched]
+            if not venues:
+                break
+            await self.fetch_venue_details(venues, deadline)
+            if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+                break
+
+    async def fetch_venue_details(self, venues, deadline=None):
+        """Set the details of venues, from the cache or with at most VENUE_DETAILS_CONCURRENCY lookups at a time"""
+        to_fetch = []
+        for venue in venues:
+            self.details_fetched.add(venue.slug)
+            details = self.wolt_client.cached_venue_details(venue.slug)
+            if details is not None:
+                self._set_details(venue, details)
+            else:
+                to_fetch.append(venue)
+        if not to_fetch:
+            return
+        semaphore = asyncio.Semaphore(VENUE_DETAILS_CONCURRENCY)
+
+        async def fetch(venue):
+            async with semaphore:
+                return await self.wolt_client.venue_details(venue.slug)
+
+        results = await gather_until([fetch(venue) for venue in to_fetch], deadline)
+        for venue, details in zip(to_fetch, results):
+            if details is not None:
+                self._set_details(venue, details)
+        logger.info(f"Fetched details for {sum(details is not None for details in results)} of {len(to_fetch)} venues.")
+
+    def _set_details(self, venue, details):
+        venue.set_details(details)
+        self.price_matrix.set_details(venue)
+
+    def disk_caches(self):
+        return [
+            self.wolt_client.search_cache, self.wolt_client.venue_cache, self.wolt_client.geocoder.cache, self.price_stats
+        ]
+
+    async def record_prices(self):
+        """Write the prices seen to the price history in one batch, from a worker thread"""
+        if self.price_history and self.price_observations:
+            observations, self.price_observations = self.price_observations, []
+            await asyncio.to_thread(self.price_history.record, WOLT, observations)
+
+    def _create_venue(self, venue_id, first_item):
+        venue = Venue(first_item.venue_name, venue_id, first_item.is_wolt_plus, first_item.delivery_time, first_item.is_available, self.item_bits)
+        self.venue_id_to_venue[venue_id] = venue
+        self.price_matrix.add_venue(venue)
+        return venue
 
     def sort_found_items_by_venue(self, items, item_to_search):
+        """Group WoltItem records by venue, as (searched_name, item) pairs"""
         venue_to_items = {}
         for item in items:
-            menu_item = item.get('menu_item')
-            venue_id = item.get('link').get('menu_item_details').get('venue_slug')
-            if venue_id not in venue_to_items:
-                venue_to_items[venue_id] = []
-            menu_item['searched_name'] = item_to_search
-            venue_to_items[venue_id].append(menu_item)
+            if item.venue_slug not in venue_to_items:
+                venue_to_items[item.venue_slug] = []
+            venue_to_items[item.venue_slug].append((item_to_search, item))
         return venue_to_items
@@ -0,0 +1,10 @@
+"""Run settings main.py and server.py share"""
+
+# Connection pool size and max in-flight requests, per upstream host
+HTTP_POOL_SIZE = 20
+HTTP_MAX_CONCURRENCY = 10
+
+# Duplicate searches that take longer than their source's p90 latency, and use the first answer
+HEDGE_REQUESTS = True
+# Worker processes for parsing CHP pages and large Wolt responses, None to parse on the event loop
+PARSE_WORKERS = 4
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import Mock, AsyncMock, patch
+from api import compare, compare_batch, Caches
+from infrastructure.http_client import HttpResponse
+from infrastructure.price_history import PriceHistory, WOLT, CHP
+from tests.test_chp_client import results_page
+
+ITEMS_TO_SEARCH = [("milk", True), ("bread", True)]
+WOLT_PRICES = {"milk": {"venue-1": 600, "venue-2": 500}, "bread": {"venue-1": 1000, "venue-2": 1200}}
+
+def wolt_page(query):
+    return json.dumps({'sections': [{'items': [
+        {'menu_item': {'name': query, 'id': f"{venue}-{query}", 'price': price, 'venue_name': venue, 'is_available': True},
+         'link': {'menu_item_details': {'venue_slug': venue}}}
+        for venue, price in WOLT_PRICES[query].items()
+    ]}]}).encode()
+
+def wolt_venue_page(delivery_fee, minimum_order):
+    return json.dumps({'results': [{'delivery_specs': {'delivery_pricing': {
+        'base_price': delivery_fee, 'small_order_surcharge_limit': minimum_order
+    }}}]}).encode()
+
+class TestCompare(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.venue_details = {}
+
+        async def get(url, headers=None):
+            if '/venues/slug/' in url:
+                slug = url.rsplit('/', 1)[1]
+                if slug in self.venue_details:
+                    return HttpResponse(200, wolt_venue_page(*self.venue_details[slug]))
+                return HttpResponse(404, b'')
+            if 'nominatim' in url:
+                return HttpResponse(200, b'[{"lat": "32.08", "lon": "34.80"}]')
+            if 'autocompletion' in url:
+                return HttpResponse(200, b'[]')
+            if 'from=0' in url:
+                return HttpResponse(200, results_page([('a.co.il', 10.0)]))
+            return HttpResponse(200, results_page([]))
+
+        async def post(url, json=None, headers=None):
+            return HttpResponse(200, wolt_page(json['q']))
+
+        self.http_client = Mock()
+        self.http_client.get = AsyncMock(side_effect=get)
+        self.http_client.post = AsyncMock(side_effect=post)
+
+    def slow_down_chp_search(self, query):
+        get = self.http_client.get.side_effect
+
+        async def slow_get(url, headers=None):
+            if query in url and 'autocompletion' not in url:
+                await asyncio.sleep(1)
+            return await get(url, headers)
+
+        self.http_client.get.side_effect = slow_get
+
+    async def test_yields_rankings_then_result(self):
+        with patch('builtins.print') as mock_print, patch('os.system') as mock_system, patch('builtins.open') as mock_open:
+            comparison = compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client)
+            rankings = [ranking async for ranking in comparison]
+            result = await comparison.result()
+        mock_print.assert_not_called()
+        mock_system.assert_not_called()
+        mock_open.assert_not_called()
+
+        self.assertEqual(len(rankings), 2 * len(ITEMS_TO_SEARCH))
+        self.assertEqual(result.ranking.cheapest_venue.slug, "venue-1")
+        self.assertEqual(result.ranking.normalized_total(result.ranking.cheapest_venue), 16.0)
+        self.assertEqual(result.ranking.chp_min_price, 20.0)
+        self.assertEqual(result.timed_out_searches, ())
+        self.assertEqual(dict(result.average_price_map), {"milk": 5.5, "bread": 11.0})
+
+    async def test_result_runs_the_comparison(self):
+        caches = Caches.in_memory()
+        result = await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, caches=caches).result()
+        self.assertEqual(result.ranking.complete_venues_count, 2)
+
+        # Shared caches are warm for the next comparison
+        self.http_client.post.reset_mock()
+        await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, caches=caches).result()
+        self.http_client.post.assert_not_called()
+
+    async def test_split_basket(self):
+        result = await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client).result()
+        self.assertEqual(result.split_basket(max_venues=1).total, 16.0)
+        basket = result.split_basket()
+        self.assertEqual(basket.total, 15.0)
+        self.assertEqual(sorted(items for _, items in basket.purchases), [(("bread", 10.0),), (("milk", 5.0),)])
+
+    async def test_ranks_by_checkout_total(self):
+        # venue-1 has the cheaper items but a delivery fee, venue-2 charges up to a 20 minimum order
+        self.venue_details = {"venue-1": (500, 0), "venue-2": (0, 2000)}
+        caches = Caches.in_memory()
+        result = await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, caches=caches).result()
+        self.assertEqual([venue.slug for venue in result.ranking.top_venues], ["venue-2", "venue-1"])
+        self.assertEqual((result.ranking.min_total, result.ranking.max_total), (20.0, 21.0))
+        self.assertEqual(len(caches.venue_details), 2)
+
+    async def test_records_price_history(self):
+        with PriceHistory(':memory:') as price_history:
+            await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, price_history=price_history).result()
+            self.assertEqual(price_history.last_seen_price(WOLT, "venue-2", "milk")[0], 5.0)
+            self.assertEqual(price_history.last_seen_price(CHP, "a.co.il", "bread")[0], 10.0)
+            self.assertEqual(len(price_history.last_seen_prices("milk")), 3)
+
+    async def test_cached_prices_are_not_recorded_again(self):
+        caches = Caches.in_memory()
+        with PriceHistory(':memory:') as price_history:
+            await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, caches=caches, price_history=price_history).result()
+            await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, caches=caches, price_history=price_history).result()
+            self.assertEqual(price_history.connection.execute("SELECT COUNT(*) FROM price_observations").fetchone()[0], 6)
+        # Each Wolt price went into the price statistics once
+        self.assertEqual(caches.price_stats.stats_for("milk").count, 2)
+
+    async def test_online_store_timeout_keeps_the_item_in_the_wolt_ranking(self):
+        self.slow_down_chp_search("bread")
+        WOLT_PRICES["bread"].pop("venue-2")
+        try:
+            result = await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, timeout=0.2).result()
+        finally:
+            WOLT_PRICES["bread"]["venue-2"] = 1200
+        self.assertEqual((result.timed_out_searches, result.chp_timed_out_searches), ((), ("bread",)))
+        self.assertEqual(result.items_to_search, tuple(ITEMS_TO_SEARCH))
+        # venue-2 has no bread, so it isn't complete
+        self.assertEqual([venue.slug for venue in result.ranking.top_venues], ["venue-1"])
+        self.assertEqual([venue.slug for venue in result.ranking.one_missing_venues], ["venue-2"])
+
+    async def test_checkout_costs_after_a_search_times_out(self):
+        self.slow_down_chp_search("bread")
+        self.venue_details = {"venue-1": (500, 0), "venue-2": (0, 2000)}
+        result = await compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client, timeout=0.2).result()
+        self.assertEqual(result.chp_timed_out_searches, ("bread",))
+        self.assertTrue(all(venue.details_known for venue in result.ranking.top_venues))
+        self.assertEqual([venue.slug for venue in result.ranking.top_venues], ["venue-2", "venue-1"])
+
+    async def test_result_after_stopping_early(self):
+        comparison = compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client)
+        async for ranking in comparison:
+            break
+        result = await comparison.result()
+        self.assertEqual(result.ranking.cheapest_venue.slug, "venue-1")
+        self.assertEqual(result.timed_out_searches, ())
+
+    async def test_iterates_once(self):
+        comparison = compare("Tel Aviv", ITEMS_TO_SEARCH, self.http_client)
+        await comparison.result()
+        with self.assertRaises(RuntimeError):
+            comparison.__aiter__()
+
+class TestCompareBatch(unittest.IsolatedAsyncioTestCase):
+    async def test_identical_requests_are_sent_once(self):
+        requests = []
+
+        async def get(url, headers=None):
+            requests.append(url)
+            if 'nominatim' in url:
+                # Every address is in the same Wolt search grid cell
+                return HttpResponse(200, b'[{"lat": "32.081", "lon": "34.801"}]')
+            if 'autocompletion' in url:
+                return HttpResponse(200, b'[]')
+            if 'from=0' in url:
+                return HttpResponse(200, results_page([('a.co.il', 10.0)]))
+            return HttpResponse(200, results_page([]))
+
+        async def post(url, json=None, headers=None):
+            requests.append(json['q'])
+            await asyncio.sleep(0.01)
+            return HttpResponse(200, wolt_page(json['q']))
+
+        http_client = Mock()
+        http_client.get = AsyncMock(side_effect=get)
+        http_client.post = AsyncMock(side_effect=post)
+
+        addresses = ["Tel Aviv 1", "Tel Aviv 2", "Tel Aviv 1"]
+        shopping_lists = [ITEMS_TO_SEARCH, [("milk", True)]]
+        caches = Caches.in_memory()
+        with PriceHistory(':memory:') as price_history:
+            results = await compare_batch(addresses, shopping_lists, http_client, caches=caches, price_history=price_history)
+            recorded = price_history.connection.execute("SELECT source, COUNT(*) FROM price_observations GROUP BY source").fetchall()
+
+        self.assertEqual(set(results), {(address, list_index) for address in addresses for list_index in range(2)})
+        self.assertEqual(results[("Tel Aviv 2", 0)].ranking.cheapest_venue.slug, "venue-1")
+        self.assertEqual(results[("Tel Aviv 1", 1)].ranking.cheapest_venue.slug, "venue-2")
+        # One Wolt search per item, shared by the addresses in the grid cell
+        self.assertEqual(http_client.post.await_count, 2)
+        # One geocode per address, one barcode lookup per item and CHP pages per address and item
+        self.assertEqual(sum('nominatim' in url for url in requests), 2)
+        self.assertEqual(sum('autocompletion' in url for url in requests), 2)
+        self.assertEqual(sum('compare_results' in url and 'from=0&' in url for url in requests), 4)
+        self.assertGreater(caches.in_flight.stats()['shared'], 0)
+        # Prices are recorded once per upstream response, not once per comparison that used it
+        self.assertEqual(dict(recorded), {WOLT: 4, CHP: 4})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import Mock, AsyncMock
+from infrastructure.chp_client import ChpClient
+from infrastructure.search_cache import SearchCache
+from infrastructure.disk_cache import DiskCache
+
+def results_page(stores):
+    rows = ''.join(
+        f'<tr><td>chain</td><td><a href="https://{website}/item">{website} store</a></td><td>{website}</td><td></td><td>₪ {price}</td></tr>'
+        for website, price in stores
+    )
+    return f'<h4>תוצאות מחנויות באינטרנט</h4><table class="results-table">{rows}</table>'.encode()
+
+class TestChpClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.pages = {
+            '0': results_page([('a.co.il', 10.0), ('b.co.il', 12.0)]),
+            '2': results_page([('b.co.il', 13.0), ('c.co.il', 14.0)]),
+            '4': results_page([]),
+            '6': results_page([('d.co.il', 15.0)]),
+        }
+        self.requested_pages = []
+        self.autocomplete_response = b'[]'
+        self.autocomplete_calls = 0
+
+        async def get(url, headers=None):
+            if 'autocompletion' in url:
+                self.autocomplete_calls += 1
+                return Mock(status=200, body=self.autocomplete_response)
+            self.requested_barcode = url.split('product_barcode=')[1].split('&')[0]
+            offset = url.split('from=')[1].split('&')[0]
+            self.requested_pages.append(offset)
+            return Mock(status=200, body=self.pages[offset])
+
+        self.http_client = Mock()
+        self.http_client.get = AsyncMock(side_effect=get)
+        self.search_cache = SearchCache(None, ttl=60)
+        self.barcode_cache = DiskCache(None, ttl=60)
+
+    async def test_fetches_pages_until_empty_and_dedups_stores(self):
+        client = ChpClient("Tel Aviv", self.http_client, self.search_cache, page_size=2, max_pages=4, barcode_cache=self.barcode_cache)
+        results = await client.search("item")
+        self.assertEqual([(result.website, result.price) for result in results],
+                         [('a.co.il', 10.0), ('b.co.il', 12.0), ('c.co.il', 14.0)])
+        self.assertEqual(sorted(self.requested_pages), ['0', '2', '4', '6'])
+
+    async def test_results_are_cached(self):
+        client = ChpClient("Tel Aviv", self.http_client, self.search_cache, page_size=2, max_pages=3, barcode_cache=self.barcode_cache)
+        first_results = await client.search("item")
+        self.assertEqual(await client.search("item"), first_results)
+        self.assertEqual(self.http_client.get.await_count, 4)
+
+    async def test_failed_first_page(self):
+        self.http_client.get = AsyncMock(return_value=Mock(status=500))
+        client = ChpClient("Tel Aviv", self.http_client, self.search_cache, barcode_cache=self.barcode_cache)
+        self.assertEqual(await client.search("item"), [])
+        self.assertEqual(len(self.search_cache), 0)
+
+    async def test_queries_by_resolved_barcode(self):
+        self.autocomplete_response = b'[{"label": "item 850g", "id": "7290000066318"}]'
+        client = ChpClient("Tel Aviv", self.http_client, self.search_cache, page_size=2, max_pages=1, barcode_cache=self.barcode_cache)
+        await client.search("item")
+        self.assertEqual(self.requested_barcode, '7290000066318')
+
+        # The barcode is remembered, and results are shared by spellings resolving to it
+        other_client = ChpClient("Tel Aviv", self.http_client, SearchCache(None, ttl=60), page_size=2, max_pages=1, barcode_cache=self.barcode_cache)
+        await other_client.search("item")
+        self.assertEqual(self.autocomplete_calls, 1)
+        self.barcode_cache.set('item other spelling', '7290000066318')
+        await client.search("item other spelling")
+        self.assertEqual(self.requested_pages, ['0', '0'])
+
+    async def test_falls_back_to_free_text_without_barcode(self):
+        client = ChpClient("Tel Aviv", self.http_client, self.search_cache, page_size=2, max_pages=1, barcode_cache=self.barcode_cache)
+        await client.search("item")
+        self.assertEqual(self.requested_barcode, '0')
+        await client.search("item")
+        self.assertEqual(self.autocomplete_calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import unittest
+from infrastructure.chp_parser import parse_compare_results
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+class TestChpParser(unittest.TestCase):
+    def test_fast_parse_matches_full_parse(self):
+        for page_name in ['chp_compare_results.html', 'chp_compare_results_no_online.html']:
+            html = read_fixture(page_name)
+            self.assertEqual(parse_compare_results(html), parse_compare_results(html, fast=False))
+
+    def test_online_stores_rows(self):
+        results = parse_compare_results(read_fixture('chp_compare_results.html'))
+        self.assertEqual(len(results), 19)
+        self.assertEqual(results[1], {
+            'chain_name': 'רמי לוי',
+            'store_name': 'רמי לוי אונליין 1',
+            'website': 'www.store1.co.il',
+            'item_url': 'https://www.store1.co.il/item/1001',
+            'price': 26.12
+        })
+        self.assertIsNone(results[0]['item_url'])
+
+    def test_header_outside_h4_falls_back_to_full_parse(self):
+        html = '''
+        <p>תוצאות מחנויות באינטרנט</p>
+        <table class="results-table"><tr><td>a</td><td>b</td><td>c</td><td></td><td>1</td></tr></table>
+        <h4>תוצאות מחנויות באינטרנט</h4>
+        <table class="results-table"><tr><td>x</td><td>y</td><td>z</td><td></td><td>₪ 2.5</td></tr></table>
+        '''
+        results = parse_compare_results(html)
+        self.assertEqual([result['chain_name'] for result in results], ['x'])
+        self.assertEqual(results[0]['price'], 2.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,9 @@
 import unittest
-from unittest.mock import Mock, patch
 from utils.docx_results_formatter import DocxResultFormatter
 from models.venue import Venue
 from models.venue_item import VenueItem
 from models.chp_venue import ChpVenue
+from utils.ranking import Ranking
 import os
 
 class TestDocxResultFormatter(unittest.TestCase):
@@ -22,9 +22,21 @@ class TestDocxResultFormatter(unittest.TestCase):
         self.assertEqual(self.formatter.document.paragraphs[0].text, "Test Paragraph")
 
     def test_add_venue(self):
-        self.formatter.add_venue(self.venue, {"item1": 10.0})
+        ranking = Ranking.from_venues([self.venue], [("item1", True)], {"item1": 10.0})
+        self.formatter.add_venue(self.venue, ranking)
         self.assertIn("Test Venue", self.formatter.document.paragraphs[0].text)
 
+    def test_add_venue_checkout_costs(self):
+        ranking = Ranking.from_venues([self.venue], [("item1", True)], {"item1": 10.0})
+        self.formatter.add_venue(self.venue, ranking)
+        self.assertTrue(any('לא ידועים' in p.text for p in self.formatter.document.paragraphs))
+
+        self.venue.set_details((5.0, 15.0))
+        self.formatter.add_venue(self.venue, ranking)
+        texts = [p.text for p in self.formatter.document.paragraphs]
+        self.assertIn("דמי משלוח: ₪5.00", texts)
+        self.assertIn("מינימום הזמנה: ₪15.00 (תוספת - ₪5.00)", texts)
+
     def test_add_chp_venues(self):
         # Create test CHP venues
         venue1 = ChpVenue("Test Store 1", "http://store1.com")
@@ -44,15 +56,13 @@ class TestDocxResultFormatter(unittest.TestCase):
 
     def test_statistics_with_chp_venues(self):
         # Create test data
-        venues = [Mock(total_normalized_price=lambda x: 100)]
-        average_price_map = {}
-        
         chp_venue = ChpVenue("Online Store", "http://store.com")
         chp_venue.add_item("item1", 90.0)
         chp_venues = [chp_venue]
+        ranking = Ranking.from_venues([self.venue], [("item1", True)], {"item1": 10.0}, chp_venues)
 
         # Add statistics with CHP venues
-        self.formatter.add_statistics(venues, average_price_map, chp_venues)
+        self.formatter.add_statistics(ranking)
 
         # Verify statistics include online price
         stats_paragraphs = [p for p in self.formatter.document.paragraphs if 'מחיר מינימלי באונליין' in p.text]
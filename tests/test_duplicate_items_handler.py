@@ -1,4 +1,5 @@
 import unittest
+from models.venue import Venue
 from models.venue_item import VenueItem
 from utils.duplicate_items_handler import DuplicateItemsHandler
 
@@ -43,5 +44,27 @@ class TestDuplicateItemsHandler(unittest.TestCase):
         filtered_item = DuplicateItemsHandler.filter_out_duplicates(items, average_price_map)
         self.assertEqual(filtered_item.name, "item1")
 
+    def test_sizes_and_quotes_match(self):
+        # The searched words appear verbatim in the wrong fat percentage, but sizes and geresh normalize
+        items = [
+            VenueItem("קוטג' 3% 250 גרם", "1", "קוטג' 5% 250 גרם", 6.0, "venue1"),
+            VenueItem("קוטג׳ 5% 250 ג", "2", "קוטג' 5% 250 גרם", 6.0, "venue1"),
+        ]
+        average_price_map = {"קוטג' 5% 250 גרם": 6.0}
+        filtered_item = DuplicateItemsHandler.filter_out_duplicates(items, average_price_map)
+        self.assertEqual(filtered_item.id, "2")
+
+    def test_resolve_duplicates(self):
+        searched_name = "item1 extra words"
+        venues = [Venue(f"Venue {number}", f"venue{number}", False, "30", True) for number in range(3)]
+        for venue in venues[:2]:
+            venue.add_item(VenueItem("item1 other words", "1", searched_name, 15.0, venue.slug))
+            venue.add_item(VenueItem("item1 extra words long", "2", searched_name, 16.0, venue.slug))
+        venues[2].add_item(VenueItem("item1 other words", "1", searched_name, 15.0, "venue2"))
+        dropped = DuplicateItemsHandler.resolve_duplicates(venues, searched_name, {searched_name: 15.0})
+        self.assertEqual(dropped, 2)
+        self.assertEqual([venue.items_for(searched_name)[0].name for venue in venues],
+                         ["item1 extra words long", "item1 extra words long", "item1 other words"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, AsyncMock, patch
+from infrastructure.disk_cache import DiskCache
+from infrastructure.geocoder import Geocoder, normalize_address
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'cache.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_persists_between_instances(self):
+        cache = DiskCache(self.path, ttl=60)
+        cache.set('key', [1, 2])
+        cache.save()
+        self.assertEqual(DiskCache(self.path, ttl=60).get('key'), [1, 2])
+
+    def test_expired_entries_are_dropped(self):
+        cache = DiskCache(self.path, ttl=60)
+        cache.set('key', 'value')
+        with patch('infrastructure.disk_cache.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get('key'))
+
+    def test_evicts_least_recently_used(self):
+        cache = DiskCache(self.path, ttl=60, max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+class TestGeocoder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self.tmp_dir.name, 'geocode.json'), ttl=60)
+        response = Mock(status=200)
+        response.json.return_value = [{'lat': '32.0853', 'lon': '34.7818'}]
+        self.http_client = Mock()
+        self.http_client.get = AsyncMock(return_value=response)
+        self.geocoder = Geocoder(self.http_client, self.cache, min_request_interval=0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_normalize_address(self):
+        self.assertEqual(normalize_address(" ז׳בוטינסקי  2 ,רמת גן "), normalize_address("ז'בוטינסקי 2, רמת גן"))
+
+    async def test_get_lat_lon(self):
+        lat, lon = await self.geocoder.get_lat_lon("Tel Aviv")
+        self.assertEqual((lat, lon), (32.0853, 34.7818))
+
+    async def test_cache_hit_skips_network(self):
+        await self.geocoder.get_lat_lon("Tel Aviv")
+        self.cache.save()
+        other_geocoder = Geocoder(self.http_client, DiskCache(self.cache.path, ttl=60))
+        self.assertEqual(await other_geocoder.get_lat_lon("  tel aviv"), (32.0853, 34.7818))
+        self.http_client.get.assert_awaited_once()
+
+    async def test_no_results(self):
+        self.http_client.get.return_value.json.return_value = []
+        with self.assertRaises(ValueError):
+            await self.geocoder.get_lat_lon("Nowhere")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from infrastructure.hedging import LatencyTracker, run_hedged
+from utils.deadline import gather_until, as_completed_until
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_percentile_needs_min_samples(self):
+        tracker = LatencyTracker(min_samples=5)
+        for latency in range(4):
+            tracker.record(latency)
+        self.assertIsNone(tracker.percentile(90))
+
+    def test_percentile(self):
+        tracker = LatencyTracker(min_samples=1)
+        for latency in range(1, 11):
+            tracker.record(latency / 10)
+        self.assertEqual(tracker.percentile(90), 1.0)
+        self.assertEqual(tracker.percentile(50), 0.6)
+
+class TestRunHedged(unittest.IsolatedAsyncioTestCase):
+    async def test_fast_request_is_not_hedged(self):
+        calls = []
+
+        async def request():
+            calls.append(1)
+            return 'fast'
+
+        self.assertEqual(await run_hedged(request, 0.1), 'fast')
+        self.assertEqual(len(calls), 1)
+
+    async def test_slow_request_is_hedged_and_loser_cancelled(self):
+        delays = [1.0, 0.01]
+        cancelled = []
+
+        async def request():
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        self.assertEqual(await run_hedged(request, 0.02), 0.01)
+        await asyncio.sleep(0)
+        self.assertEqual(cancelled, [1.0])
+
+    async def test_failed_request_falls_back_to_hedge(self):
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.05)
+                raise ValueError()
+            await asyncio.sleep(0.1)
+            return 'hedge'
+
+        self.assertEqual(await run_hedged(request, 0.01), 'hedge')
+
+class TestGatherUntil(unittest.IsolatedAsyncioTestCase):
+    async def test_unfinished_results_are_none(self):
+        async def search(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        deadline = asyncio.get_running_loop().time() + 0.05
+        self.assertEqual(await gather_until([search(0), search(1), search(0.01)], deadline), [0, None, 0.01])
+
+    async def test_no_deadline(self):
+        async def search():
+            return 1
+
+        self.assertEqual(await gather_until([search(), search()]), [1, 1])
+
+class TestAsCompletedUntil(unittest.IsolatedAsyncioTestCase):
+    async def test_yields_in_completion_order_until_deadline(self):
+        cancelled = []
+
+        async def search(delay):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        deadline = asyncio.get_running_loop().time() + 0.1
+        results = [result async for result in as_completed_until([search(0.05), search(1), search(0)], deadline)]
+        self.assertEqual(results, [(2, 0), (0, 0.05)])
+        await asyncio.sleep(0)
+        self.assertEqual(cancelled, [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from aiohttp import web
+from infrastructure.http_client import HttpClient, HttpResponse, HttpStatusError
+
+class TestHttpClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.peers = set()
+
+        async def echo(request):
+            self.peers.add(request.transport.get_extra_info('peername'))
+            return web.json_response({'path': request.raw_path, 'method': request.method})
+
+        self.throttled_calls = 0
+
+        async def throttled(request):
+            self.throttled_calls += 1
+            if self.throttled_calls < 3:
+                return web.Response(status=429)
+            return web.json_response({'ok': True})
+
+        app = web.Application()
+        app.router.add_route('*', '/echo', echo)
+        app.router.add_get('/throttled', throttled)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_reuses_pooled_connection(self):
+        async with HttpClient(pool_size=1, max_concurrency=1) as client:
+            for _ in range(5):
+                response = await client.get(f"{self.base_url}/echo")
+                self.assertEqual(response.status, 200)
+        self.assertEqual(len(self.peers), 1)
+
+    async def test_preserves_encoded_query(self):
+        async with HttpClient() as client:
+            response = await client.get(f"{self.base_url}/echo?q=%D7%90%20b")
+            self.assertEqual(response.json()['path'], '/echo?q=%D7%90%20b')
+
+    async def test_post(self):
+        async with HttpClient() as client:
+            response = await client.post(f"{self.base_url}/echo", json={'q': 'x'})
+            self.assertEqual(response.json()['method'], 'POST')
+
+    async def test_retries_throttled_requests(self):
+        async with HttpClient(backoff_base=0.01) as client:
+            response = await client.get(f"{self.base_url}/throttled")
+            self.assertEqual(response.status, 200)
+            self.assertEqual(self.throttled_calls, 3)
+            stats = client.stats()[self.base_url.split('//')[1]]
+            self.assertEqual(stats['in_flight'], 0)
+            self.assertLess(stats['rate'], 10)
+
+    async def test_gives_up_after_max_retries(self):
+        async with HttpClient(max_retries=1, backoff_base=0.01) as client:
+            response = await client.get(f"{self.base_url}/throttled")
+            self.assertEqual(response.status, 429)
+            self.assertEqual(self.throttled_calls, 2)
+
+    def test_raise_for_status(self):
+        HttpResponse(200, b'').raise_for_status()
+        with self.assertRaises(HttpStatusError) as raised:
+            HttpResponse(404, b'', url="https://example.com/missing").raise_for_status()
+        self.assertEqual(raised.exception.status, 404)
+        self.assertEqual(str(raised.exception), "HTTP 404 for https://example.com/missing")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from models.chp_venue import ChpVenue
+from models.item_bits import ItemBits
+
+class TestItemBits(unittest.TestCase):
+    def test_masks(self):
+        item_bits = ItemBits(["a", "b", "c"])
+        self.assertEqual(item_bits.mask(["a", "c"]), 0b101)
+        self.assertEqual(item_bits.names(0b110), ["b", "c"])
+
+    def test_new_items_get_the_next_bit(self):
+        item_bits = ItemBits(["a"])
+        self.assertEqual(item_bits.bit("z"), 0b10)
+        self.assertEqual(len(item_bits), 2)
+
+    def test_chp_venue_coverage(self):
+        item_bits = ItemBits(["a", "b", "c"])
+        venue = ChpVenue("Store", "store.com", item_bits)
+        venue.add_item("a", 10.0)
+        venue.add_item("c", 12.0)
+        self.assertEqual(venue.missing_count(item_bits.mask(["a", "b", "c"])), 1)
+        self.assertEqual(venue.missing_count(item_bits.mask(["a", "c"])), 0)
+
+if __name__ == '__main__':
+    unittest.main()
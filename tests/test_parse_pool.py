@@ -0,0 +1,42 @@
+import json
+import os
+import unittest
+from infrastructure.parse_pool import ParsePool
+from infrastructure.chp_parser import parse_chp_page
+from infrastructure.wolt_parser import parse_wolt_search
+from models.chp_result import ChpResult
+from models.wolt_item import WoltItem
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+class TestParsePool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with open(os.path.join(FIXTURES_DIR, 'chp_compare_results.html'), 'rb') as f:
+            self.chp_page = f.read()
+
+    async def test_inline_and_process_pool_agree(self):
+        with ParsePool() as inline_pool, ParsePool(max_workers=2, min_offload_size=0) as process_pool:
+            inline_results = await inline_pool.run(parse_chp_page, self.chp_page)
+            pool_results = await process_pool.run(parse_chp_page, self.chp_page)
+        self.assertEqual(inline_results, pool_results)
+        self.assertEqual(len(pool_results), 19)
+        self.assertIsInstance(pool_results[0], ChpResult)
+
+    def test_parse_wolt_search(self):
+        menu_item = {'name': 'item1', 'id': '1', 'price': 1000, 'venue_name': 'Venue 1', 'is_available': False,
+                     'estimate_range': '30-40', 'is_wolt_plus': False, 'image': {}}
+        body = json.dumps({'sections': [{'items': [
+            {'menu_item': menu_item, 'link': {'menu_item_details': {'venue_slug': 'venue1'}}},
+            # Malformed hits are skipped: no link, a null link, no venue name, no menu item
+            {'menu_item': menu_item},
+            {'menu_item': menu_item, 'link': None},
+            {'menu_item': {key: value for key, value in menu_item.items() if key != 'venue_name'},
+             'link': {'menu_item_details': {'venue_slug': 'venue2'}}},
+            {'link': {'menu_item_details': {'venue_slug': 'venue3'}}}
+        ]}]}).encode()
+        self.assertEqual(parse_wolt_search(body), [WoltItem('venue1', 'Venue 1', 'item1', '1', 1000, False, '30-40', False)])
+        self.assertEqual(parse_wolt_search(b'{"sections": []}'), [])
+        self.assertIsNone(parse_wolt_search(b'<html>'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from infrastructure.price_history import PriceHistory, WOLT, CHP, DAY
+
+class TestPriceHistory(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.history = PriceHistory(os.path.join(self.directory.name, 'history.sqlite3'))
+
+    def tearDown(self):
+        self.history.close()
+        self.directory.cleanup()
+
+    def test_last_seen_price(self):
+        self.history.record(WOLT, [("venue-1", "Milk 1L", "milk", 6.5)], observed_at=DAY)
+        self.history.record(WOLT, [("venue-1", "Milk 1L", "milk", 6.9)], observed_at=3 * DAY)
+        # An older batch recorded late doesn't replace the latest price
+        self.history.record(WOLT, [("venue-1", "Milk 1L", "milk", 5.0)], observed_at=2 * DAY)
+        self.history.record(CHP, [("shop.co.il", "milk", "milk", 6.0)], observed_at=2 * DAY)
+
+        self.assertEqual(self.history.last_seen_price(WOLT, "venue-1", "Milk 1L"), (6.9, 3 * DAY))
+        self.assertIsNone(self.history.last_seen_price(WOLT, "venue-2", "Milk 1L"))
+        self.assertEqual(
+            self.history.last_seen_prices("milk"),
+            [(CHP, "shop.co.il", "milk", 6.0, 2 * DAY), (WOLT, "venue-1", "Milk 1L", 6.9, 3 * DAY)]
+        )
+
+    def test_price_trend_and_venue_history(self):
+        self.history.record(WOLT, [("venue-1", "Milk 1L", "milk", 6.0), ("venue-2", "Milk", "milk", 8.0)], observed_at=DAY + 10)
+        self.history.record(WOLT, [("venue-1", "Milk 1L", "milk", 7.0), ("venue-1", "Bread", "bread", 9.0)], observed_at=2 * DAY + 10)
+
+        self.assertEqual(self.history.price_trend("milk"), [(DAY, 6.0, 7.0, 8.0, 2), (2 * DAY, 7.0, 7.0, 7.0, 1)])
+        self.assertEqual(self.history.price_trend("milk", since=2 * DAY), [(2 * DAY, 7.0, 7.0, 7.0, 1)])
+        self.assertEqual(
+            [row[:3] for row in self.history.venue_history(WOLT, "venue-1")],
+            [("Milk 1L", "milk", 6.0), ("Bread", "bread", 9.0), ("Milk 1L", "milk", 7.0)]
+        )
+
+    def test_wal_mode(self):
+        self.assertEqual(self.history.connection.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+
+if __name__ == '__main__':
+    unittest.main()
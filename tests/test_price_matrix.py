@@ -0,0 +1,67 @@
+import random
+import unittest
+from unittest.mock import Mock
+from models.venue_details import VenueDetails
+from models.wolt_item import WoltItem
+from services.wolt_service import WoltService
+from utils.price_matrix import PriceMatrix, INITIAL_ROWS
+from utils.ranking import Ranking
+
+ITEMS_TO_SEARCH = [("milk", True), ("bread", True), ("chocolate", False), ("eggs", False)]
+
+def make_search_results(rng, venues):
+    """Few distinct prices, so totals tie often, and some venues with several items for a search"""
+    return {
+        item_to_search: [
+            WoltItem(f"venue-{venue}", f"Venue {venue}", f"{item_to_search} {'big ' * variant}".strip(), f"{venue}-{variant}",
+                     rng.choice([450, 600, 999, 1250]), True, '30', False)
+            for venue in range(venues) if rng.random() < 0.7
+            for variant in range(rng.choice([1, 1, 1, 2]))
+        ]
+        for item_to_search, _ in ITEMS_TO_SEARCH
+    }
+
+def make_service():
+    wolt_service = WoltService("Tel Aviv", ITEMS_TO_SEARCH, Mock())
+    wolt_service.wolt_client = Mock(fetched_queries=set())
+    return wolt_service
+
+class TestPriceMatrix(unittest.IsolatedAsyncioTestCase):
+    async def test_ranking_matches_from_venues(self):
+        rng = random.Random(5)
+        for venues_count in [0, 3, 40, INITIAL_ROWS + 200]:
+            search_results = make_search_results(rng, venues_count)
+            wolt_service = make_service()
+            for item_to_search in rng.sample(list(search_results), len(search_results)):
+                wolt_service.add_search_results(item_to_search, search_results[item_to_search])
+                # Provisional rankings cover the searches that finished so far
+                items_to_search = wolt_service.completed_items_to_search()
+                expected = Ranking.from_venues(wolt_service.venue_id_to_venue.values(), items_to_search, wolt_service.average_price_map)
+                self.assertEqual(wolt_service.ranking(), expected)
+
+            venues = list(wolt_service.venue_id_to_venue.values())
+            details = {venue.slug: VenueDetails(rng.choice([0, 5.0, 9.9]), rng.choice([0, 20.0, 45.0])) for venue in venues}
+            wolt_service.wolt_client.cached_venue_details = details.get
+            await wolt_service.fetch_venue_details(rng.sample(venues, len(venues) // 2))
+            expected = Ranking.from_venues(venues, ITEMS_TO_SEARCH, wolt_service.average_price_map, top_k=6, fallback_k=2)
+            ranking = Ranking.from_price_matrix(wolt_service.price_matrix, ITEMS_TO_SEARCH, wolt_service.average_price_map, top_k=6, fallback_k=2)
+            self.assertEqual(ranking, expected)
+
+    def test_missing_items(self):
+        wolt_service = make_service()
+        wolt_service.add_search_results("milk", [WoltItem("venue-1", "Venue 1", "milk", "1", 600, True, '30', False)])
+        # venue-2 is first seen after the milk search, so it is missing milk too
+        wolt_service.add_search_results("bread", [WoltItem("venue-2", "Venue 2", "bread", "2", 1000, True, '30', False)])
+        price_matrix = wolt_service.price_matrix
+        self.assertEqual(len(price_matrix), 2)
+        self.assertEqual(price_matrix.missing_counts(["milk", "bread"]).tolist(), [1, 1])
+        self.assertEqual(price_matrix.approximate_totals({"milk": 6.0, "bread": 10.0}).tolist(), [16.0, 16.0])
+        self.assertEqual(price_matrix.item_price_ranges(["milk", "bread", "eggs"]), {"milk": (6.0, 6.0), "bread": (10.0, 10.0), "eggs": None})
+
+    def test_no_venues(self):
+        price_matrix = PriceMatrix(["milk"])
+        self.assertEqual(price_matrix.approximate_totals({"milk": 6.0}).tolist(), [])
+        self.assertEqual(Ranking.from_price_matrix(price_matrix, [("milk", True)], {}).top_venues, ())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import random
+import statistics
+import tempfile
+import unittest
+from infrastructure.price_stats_cache import PriceStatsCache
+from models.venue_item import VenueItem
+from utils.duplicate_items_handler import DuplicateItemsHandler
+from utils.price_stats import PriceStats, QuantileDigest, RunningStats
+
+class TestRunningStats(unittest.TestCase):
+    def test_matches_statistics_module(self):
+        rng = random.Random(1)
+        values = [rng.uniform(5, 50) for _ in range(1000)]
+        stats = RunningStats()
+        for value in values:
+            stats.update(value)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(values))
+        self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+
+class TestQuantileDigest(unittest.TestCase):
+    def test_quantiles_in_bounded_memory(self):
+        rng = random.Random(2)
+        values = [rng.lognormvariate(3, 0.5) for _ in range(100000)]
+        digest = QuantileDigest()
+        for value in values:
+            digest.update(value)
+        values.sort()
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            exact = values[int(q * len(values))]
+            self.assertAlmostEqual(digest.quantile(q), exact, delta=exact * 0.02)
+        self.assertLessEqual(len(digest.centroids), digest.compression)
+
+    def test_few_values(self):
+        digest = QuantileDigest()
+        self.assertIsNone(digest.quantile(0.5))
+        digest.update(10.0)
+        self.assertEqual(digest.quantile(0.5), 10.0)
+
+class TestPriceStats(unittest.TestCase):
+    def test_band_ignores_outliers(self):
+        stats = PriceStats().update_many([10.0, 10.5, 11.0, 11.5, 12.0, 9.5, 10.0, 11.0, 500.0])
+        low, high = stats.band()
+        self.assertLess(low, 9.5)
+        self.assertTrue(12.0 < high < 20.0)
+
+    def test_no_band_before_enough_observations(self):
+        self.assertIsNone(PriceStats().update_many([10.0, 11.0]).band())
+
+    def test_band_is_never_a_point(self):
+        low, high = PriceStats().update_many([10.0] * 20).band()
+        self.assertEqual((low, high), (7.5, 12.5))
+
+    def test_round_trip(self):
+        stats = PriceStats().update_many(range(1, 501))
+        restored = PriceStats.from_dict(stats.to_dict())
+        self.assertEqual(restored.count, 500)
+        self.assertAlmostEqual(restored.moments.variance, stats.moments.variance)
+        self.assertAlmostEqual(restored.median, stats.median, delta=1)
+
+class TestPriceStatsCache(unittest.TestCase):
+    def test_persists_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'price_stats.json')
+            cache = PriceStatsCache(path)
+            cache.record("כוסמת 500 גרם", [10.0, 12.0])
+            cache.save()
+            stats = PriceStatsCache(path).record("כוסמת  500 גרם", [14.0])
+            self.assertEqual(stats.count, 3)
+            self.assertAlmostEqual(stats.moments.mean, 12.0)
+
+class TestDuplicateFilteringWithBand(unittest.TestCase):
+    def test_band_replaces_skewed_average(self):
+        items = [
+            VenueItem("item1 small", "1", "item1", 10.0, "venue1"),
+            VenueItem("item1 family pack", "2", "item1", 40.0, "venue1"),
+        ]
+        # An outlier pulled the average up to 30, which keeps the family pack and drops the real item
+        self.assertEqual(DuplicateItemsHandler.filter_out_duplicates(items, {"item1": 30.0}).price, 40.0)
+        self.assertEqual(DuplicateItemsHandler.filter_out_duplicates(items, {"item1": 30.0}, (7.5, 14.0)).price, 10.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from models.venue_item import VenueItem
+from utils.product_matcher import ProductMatcher, tokenize
+
+class TestTokenize(unittest.TestCase):
+    def test_sizes(self):
+        self.assertEqual(tokenize("שוקולית 500 גרם"), ("שוקולית", "500g"))
+        self.assertEqual(tokenize("שוקולית 500גרם"), ("שוקולית", "500g"))
+        self.assertEqual(tokenize("עגבניות 1 ק\"ג"), ("עגבניות", "1000g"))
+        self.assertEqual(tokenize("משקה חלב 1.5 ל'"), ("משקה", "חלב", "1500ml"))
+        self.assertEqual(tokenize("פיראוס בולגרית 16%"), ("פיראוס", "בולגרית", "16%"))
+        self.assertEqual(tokenize("טונה 850"), ("טונה", "850"))
+
+    def test_quotes(self):
+        self.assertEqual(tokenize("קוטג' 5%"), tokenize("קוטג׳ 5%"))
+        self.assertEqual(tokenize("ק\"ג"), tokenize("ק״ג"))
+
+    def test_superscript_digits_are_words(self):
+        self.assertEqual(tokenize("מגבות ² שכבות"), ("מגבות", "²", "שכבות"))
+        self.assertGreater(ProductMatcher("מגבות 2 שכבות", ["מגבות ² שכבות"]).score("מגבות ² שכבות"), 0)
+
+class TestProductMatcher(unittest.TestCase):
+    def test_identical_tokens_score_one(self):
+        matcher = ProductMatcher("קוטג' 5% 250 גרם", ["קוטג׳ 5% 250 ג", "קוטג' 3% 250 גרם"])
+        self.assertAlmostEqual(matcher.score("קוטג׳ 5% 250 ג"), 1.0)
+        self.assertLess(matcher.score("קוטג' 3% 250 גרם"), 1.0)
+        self.assertEqual(matcher.score("טונה"), 0.0)
+
+    def test_prefixes_and_bare_sizes(self):
+        matcher = ProductMatcher("חלב 3% 250 מ\"ל", ["והחלב 3% 250", "שוקו 3% 250 מ\"ל"])
+        self.assertAlmostEqual(matcher.score("והחלב 3% 250"), 1.0)
+        self.assertGreater(matcher.score("והחלב 3% 250"), matcher.score("שוקו 3% 250 מ\"ל"))
+
+    def test_distinguishing_words_weigh_more(self):
+        product_names = ["גבינה לבנה 5% 250 גרם", "גבינה לבנה 9% 250 גרם", "גבינה צהובה 28% 200 גרם"]
+        matcher = ProductMatcher("גבינה לבנה 5%", product_names)
+        items = [VenueItem(name, str(index), "גבינה לבנה 5%", 5.0, "venue1") for index, name in enumerate(product_names)]
+        self.assertEqual(matcher.best_match(items).name, "גבינה לבנה 5% 250 גרם")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import dataclasses
+import random
+import unittest
+from models.chp_venue import ChpVenue
+from models.venue import Venue
+from models.venue_item import VenueItem
+from utils.ranking import Ranking
+
+ITEMS_TO_SEARCH = [("milk", True), ("bread", True), ("chocolate", False)]
+AVERAGE_PRICE_MAP = {"milk": 6.0, "bread": 10.0, "chocolate": 8.0}
+
+def make_venue(slug, prices):
+    venue = Venue(slug, slug, False, "30", True)
+    for searched_name, _ in ITEMS_TO_SEARCH:
+        if searched_name in prices:
+            venue.add_item(VenueItem(f"{searched_name} {slug}", "1", searched_name, prices[searched_name], slug))
+        else:
+            venue.add_missing_item(VenueItem(searched_name, "", searched_name, 0, slug))
+    return venue
+
+
+class TestRanking(unittest.TestCase):
+    def setUp(self):
+        self.venues = [
+            make_venue("full", {"milk": 5.0, "bread": 9.5, "chocolate": 7.0}),
+            make_venue("no-chocolate", {"milk": 6.5, "bread": 9.0}),
+            make_venue("no-bread", {"milk": 4.0, "chocolate": 5.0}),
+            make_venue("cheap-full", {"milk": 4.5, "bread": 8.0, "chocolate": 6.0}),
+        ]
+        chp_venue = ChpVenue("Online Store", "http://store.com")
+        chp_venue.add_item("milk", 5.0)
+        chp_venue.add_item("bread", 12.0)
+        self.ranking = Ranking.from_venues(self.venues, ITEMS_TO_SEARCH, AVERAGE_PRICE_MAP, [chp_venue], top_k=2)
+
+    def test_from_venues(self):
+        self.assertEqual([venue.slug for venue in self.ranking.top_venues], ["cheap-full", "full"])
+        self.assertEqual(self.ranking.cheapest_venue.slug, "cheap-full")
+        self.assertEqual(self.ranking.complete_venues_count, 3)
+        self.assertEqual([venue.slug for venue in self.ranking.one_missing_venues], ["no-bread"])
+        self.assertEqual(self.ranking.most_expensive_venue.slug, "no-chocolate")
+        self.assertEqual((self.ranking.min_total, self.ranking.max_total), (18.5, 23.5))
+        self.assertEqual(self.ranking.chp_min_price, 17.0)
+
+    def test_normalized_total_matches_venue(self):
+        for venue in self.venues:
+            self.assertEqual(self.ranking.normalized_total(venue), venue.total_normalized_price(AVERAGE_PRICE_MAP))
+
+    def test_matches_sorting_every_venue(self):
+        rng = random.Random(3)
+        venues = []
+        for venue_number in range(300):
+            prices = {searched_name: rng.choice([4.0, 6.5, 9.99, 12.0]) for searched_name, _ in ITEMS_TO_SEARCH if rng.random() < 0.8}
+            venues.append(make_venue(f"venue-{venue_number}", prices))
+        venues[0].replace_items_for("milk", VenueItem("milk deal", "2", "milk", 1.0, "venue-0"))
+        ranking = Ranking.from_venues(venues, ITEMS_TO_SEARCH, AVERAGE_PRICE_MAP)
+
+        def missing_must_include(venue):
+            return sum(searched_name not in venue.items_by_searched_name for searched_name in ("milk", "bread"))
+
+        def by_total(selected):
+            return sorted(selected, key=lambda venue: venue.total_normalized_price(AVERAGE_PRICE_MAP))
+
+        complete = by_total(venue for venue in venues if missing_must_include(venue) == 0)
+        self.assertEqual(list(ranking.top_venues), complete[:4])
+        self.assertEqual(list(ranking.one_missing_venues), by_total(venue for venue in venues if missing_must_include(venue) == 1)[:3])
+        self.assertEqual(ranking.most_expensive_venue.total_normalized_price(AVERAGE_PRICE_MAP),
+                         complete[-1].total_normalized_price(AVERAGE_PRICE_MAP))
+        self.assertEqual(ranking.min_total, complete[0].total_normalized_price(AVERAGE_PRICE_MAP))
+        self.assertEqual(ranking.complete_venues_count, len(complete))
+
+    def test_is_immutable(self):
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            self.ranking.top_venues = ()
+        with self.assertRaises(TypeError):
+            self.ranking.average_price_map["milk"] = 0
+
+    def test_no_venues(self):
+        ranking = Ranking.from_venues([], ITEMS_TO_SEARCH, AVERAGE_PRICE_MAP)
+        self.assertIsNone(ranking.cheapest_venue)
+        self.assertIsNone(ranking.most_expensive_venue)
+        self.assertIsNone(ranking.chp_min_price)
+        self.assertEqual(ranking.complete_venues_count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from infrastructure.rate_limiter import AdaptiveRateLimiter
+
+class TestAdaptiveRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_limits_in_flight_requests(self):
+        limiter = AdaptiveRateLimiter(rate=1000, concurrency=2, max_concurrency=2)
+        max_in_flight = 0
+
+        async def request():
+            nonlocal max_in_flight
+            await limiter.acquire()
+            max_in_flight = max(max_in_flight, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            limiter.release(0.01)
+
+        await asyncio.gather(*(request() for _ in range(10)))
+        self.assertEqual(max_in_flight, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_token_bucket_spaces_requests(self):
+        limiter = AdaptiveRateLimiter(rate=50, burst=1, max_rate=50, concurrency=10)
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        for _ in range(6):
+            await limiter.acquire()
+            limiter.release(None)
+        self.assertGreaterEqual(loop.time() - start_time, 0.09)
+
+    async def test_throttling_decreases_and_success_increases(self):
+        limiter = AdaptiveRateLimiter(rate=10, burst=100, concurrency=8, max_concurrency=10)
+        await limiter.acquire()
+        limiter.release(0.1, throttled=True)
+        self.assertEqual(limiter.stats()['concurrency_limit'], 4)
+        self.assertEqual(limiter.rate, 5)
+
+        for _ in range(20):
+            await limiter.acquire()
+            limiter.release(0.1)
+        self.assertGreater(limiter.concurrency_limit, 4)
+        self.assertGreater(limiter.rate, 5)
+
+    async def test_slow_responses_shrink_window(self):
+        limiter = AdaptiveRateLimiter(concurrency=8, latency_target=1.0)
+        await limiter.acquire()
+        limiter.release(2.0)
+        self.assertEqual(limiter.concurrency_limit, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from infrastructure.disk_cache import save_in_background
+from infrastructure.search_cache import SearchCache, grid_cell
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'search.json')
+        self.cache = SearchCache(self.path, ttl=60)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_nearby_locations_share_entries(self):
+        self.cache.set_results("כוסמת 500 גרם", (32.0831, 34.8011), [{'price': 1}])
+        self.assertEqual(self.cache.get_results("כוסמת  500 גרם", (32.0839, 34.8019)), [{'price': 1}])
+        self.assertIsNone(self.cache.get_results("כוסמת 500 גרם", (32.0931, 34.8011)))
+
+    def test_address_locations(self):
+        self.cache.set_results("item", "ז'בוטינסקי 2, רמת גן", [])
+        self.assertEqual(self.cache.get_results("item", "ז׳בוטינסקי 2 ,רמת גן"), [])
+
+    def test_persists_between_runs(self):
+        self.cache.set_results("item", (32.0, 34.0), [{'name': 'item'}])
+        self.cache.save()
+        self.assertEqual(SearchCache(self.path, ttl=60).get_results("item", (32.0, 34.0)), [{'name': 'item'}])
+
+    def test_saves_in_background_only_when_changed(self):
+        self.cache.set_results("item", (32.0, 34.0), [{'name': 'item'}])
+        asyncio.run(save_in_background([self.cache]))
+        self.assertEqual(SearchCache(self.path, ttl=60).get_results("item", (32.0, 34.0)), [{'name': 'item'}])
+        os.remove(self.path)
+        asyncio.run(save_in_background([self.cache]))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_grid_cell_negative_coordinates(self):
+        self.assertNotEqual(grid_cell(0.001, 0.001), grid_cell(-0.001, -0.001))
+
+if __name__ == '__main__':
+    unittest.main()
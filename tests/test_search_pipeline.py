@@ -0,0 +1,131 @@
+import asyncio
+import random
+import unittest
+from contextlib import aclosing
+from unittest.mock import Mock
+from infrastructure.search_cache import SearchCache
+from models.chp_result import ChpResult
+from models.venue_details import VenueDetails
+from models.wolt_item import WoltItem
+from services.chp_service import ChpService
+from services.search_pipeline import SearchPipeline
+from services.wolt_service import WoltService
+from utils.ranking import Ranking
+
+ITEMS_TO_SEARCH = [("milk 1 liter", True), ("bread", True), ("chocolate", False)]
+
+def make_wolt_results(seed=0):
+    rng = random.Random(seed)
+    results = {}
+    for item_to_search, _ in ITEMS_TO_SEARCH:
+        results[item_to_search] = [
+            WoltItem(f"venue-{venue}", f"Venue {venue}", f"{item_to_search} {'big ' * variant}".strip(), f"{venue}-{variant}", rng.randint(500, 1500), True, '30', False)
+            for venue in range(20) if rng.random() < 0.8
+            for variant in range(rng.choice([1, 1, 2]))
+        ]
+    return results
+
+def make_services(wolt_results, chp_results=None, delays=None):
+    delays = delays or {}
+
+    async def search(item_to_search, results):
+        await asyncio.sleep(delays.get(item_to_search, 0))
+        return results.get(item_to_search, [])
+
+    wolt_service = WoltService("Tel Aviv", ITEMS_TO_SEARCH, Mock())
+    wolt_service.wolt_client = Mock(search_cache=SearchCache(None, ttl=60), fetched_queries=set())
+    wolt_service.wolt_client.search = lambda item_to_search: search(item_to_search, wolt_results)
+    chp_service = ChpService("Tel Aviv", ITEMS_TO_SEARCH, Mock())
+    chp_service.chp_client = Mock(search_cache=SearchCache(None, ttl=60), barcode_cache=SearchCache(None, ttl=60), fetched_queries=set())
+    chp_service.chp_client.search = lambda item_to_search: search(item_to_search, chp_results or {})
+    return wolt_service, chp_service
+
+class TestSearchPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_search_order_does_not_matter(self):
+        wolt_results = make_wolt_results()
+        # Finish the searches in reverse order to exercise venues first seen late
+        wolt_service, chp_service = make_services(wolt_results, delays={"milk 1 liter": 0.02, "bread": 0.01})
+        pipeline = SearchPipeline(wolt_service, chp_service)
+        rankings = [ranking async for ranking in pipeline.run()]
+        self.assertEqual(len(rankings), 2 * len(ITEMS_TO_SEARCH))
+
+        in_order_service, in_order_chp_service = make_services(wolt_results, delays={"bread": 0.01, "chocolate": 0.02})
+        async with aclosing(SearchPipeline(in_order_service, in_order_chp_service).run()) as in_order_rankings:
+            async for _ in in_order_rankings:
+                pass
+
+        self.assertEqual(wolt_service.average_price_map, in_order_service.average_price_map)
+        self.assertEqual(wolt_service.venue_id_to_venue.keys(), in_order_service.venue_id_to_venue.keys())
+        for venue_id, venue in in_order_service.venue_id_to_venue.items():
+            self.assertEqual(wolt_service.venue_id_to_venue[venue_id].items, venue.items)
+            self.assertEqual(wolt_service.venue_id_to_venue[venue_id].missing_items, venue.missing_items)
+
+        final_ranking = pipeline.ranking()
+        self.assertEqual(rankings[-1].top_venues, final_ranking.top_venues)
+
+    async def test_provisional_ranking_before_slowest_search(self):
+        wolt_results = {
+            "milk 1 liter": [WoltItem("venue-1", "Venue 1", "milk 1 liter", "1", 600, True, '30', False)],
+            "bread": [WoltItem("venue-1", "Venue 1", "bread", "2", 1000, True, '30', False)],
+        }
+        chp_results = {"bread": [ChpResult("Chain", "Store", "http://store.com", "http://store.com/bread", 8.0)]}
+        wolt_service, chp_service = make_services(wolt_results, chp_results, delays={"chocolate": 0.05})
+        pipeline = SearchPipeline(wolt_service, chp_service)
+        deadline = asyncio.get_running_loop().time() + 0.02
+
+        cheapest = [ranking.cheapest_venue for ranking in [ranking async for ranking in pipeline.run(deadline)]]
+        self.assertEqual(cheapest[-1].slug, "venue-1")
+        self.assertEqual(wolt_service.timed_out_searches, ["chocolate"])
+        self.assertEqual(chp_service.timed_out_searches, ["chocolate"])
+        self.assertEqual(wolt_service.items_to_search, ITEMS_TO_SEARCH[:2])
+        self.assertEqual([venue.name for venue in chp_service.get_complete_venues()], [])
+
+    async def test_failed_search_is_left_out(self):
+        wolt_results = make_wolt_results()
+        wolt_service, chp_service = make_services(wolt_results)
+        search = wolt_service.wolt_client.search
+
+        async def failing_search(item_to_search):
+            if item_to_search == "bread":
+                raise AttributeError("'NoneType' object has no attribute 'get'")
+            return await search(item_to_search)
+
+        wolt_service.wolt_client.search = failing_search
+        with self.assertLogs('wolt_groceries', level='ERROR'):
+            rankings = [ranking async for ranking in SearchPipeline(wolt_service, chp_service).run()]
+        self.assertEqual(len(rankings), 2 * len(ITEMS_TO_SEARCH) - 1)
+        self.assertEqual(wolt_service.timed_out_searches, ["bread"])
+        self.assertEqual(chp_service.timed_out_searches, [])
+        self.assertEqual(set(wolt_service.average_price_map), {"milk 1 liter", "chocolate"})
+
+    async def test_checkout_costs_rank_exactly(self):
+        wolt_service, chp_service = make_services(make_wolt_results(seed=1))
+        async with aclosing(SearchPipeline(wolt_service, chp_service).run()) as rankings:
+            async for _ in rankings:
+                pass
+        venues = list(wolt_service.venue_id_to_venue.values())
+        # The two venues with the cheapest items charge a high delivery fee
+        fees = {venue.slug: 0 for venue in venues}
+        for venue in sorted(venues, key=lambda venue: venue.items_price)[:2]:
+            fees[venue.slug] = 40
+        looked_up = []
+
+        async def venue_details(slug):
+            looked_up.append(slug)
+            return VenueDetails(fees[slug], 0)
+
+        wolt_service.wolt_client.cached_venue_details = lambda slug: None
+        wolt_service.wolt_client.venue_details = venue_details
+        await wolt_service.add_checkout_costs()
+        ranking = Ranking.from_venues(venues, wolt_service.items_to_search, wolt_service.average_price_map)
+
+        for venue in venues:
+            venue.set_details((fees[venue.slug], 0))
+        expected = Ranking.from_venues(venues, wolt_service.items_to_search, wolt_service.average_price_map)
+        self.assertEqual([ranking.normalized_total(venue) for venue in ranking.top_venues],
+                         [expected.normalized_total(venue) for venue in expected.top_venues])
+        self.assertEqual(ranking.max_total, expected.max_total)
+        self.assertLess(len(looked_up), len(venues))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from infrastructure.http_client import HttpStatusError
+from server import ComparisonServer
+from tests.test_api import ITEMS_TO_SEARCH, wolt_page, wolt_venue_page
+from tests.test_chp_client import results_page
+
+class TestComparisonServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.upstream_calls = []
+        self.wolt_delay = 0
+        self.geocode_status = 200
+
+        async def wolt(request):
+            query = (await request.json())['q']
+            self.upstream_calls.append(('wolt', query))
+            await asyncio.sleep(self.wolt_delay)
+            return web.Response(body=wolt_page(query), content_type='application/json')
+
+        async def venue(request):
+            self.upstream_calls.append(('venue', request.match_info['slug']))
+            return web.Response(body=wolt_venue_page(0, 0), content_type='application/json')
+
+        async def chp(request):
+            self.upstream_calls.append(('chp', request.query['product_name_or_barcode']))
+            stores = [('a.co.il', 10.0)] if request.query['from'] == '0' else []
+            return web.Response(body=results_page(stores), content_type='text/html')
+
+        async def autocomplete(request):
+            return web.json_response([])
+
+        async def nominatim(request):
+            self.upstream_calls.append(('geocode', request.query['q']))
+            if self.geocode_status != 200:
+                return web.json_response([], status=self.geocode_status)
+            return web.json_response([{'lat': '32.08', 'lon': '34.80'}])
+
+        upstream = web.Application()
+        upstream.router.add_post('/wolt', wolt)
+        upstream.router.add_get('/venue/{slug}', venue)
+        upstream.router.add_get('/chp', chp)
+        upstream.router.add_get('/autocomplete', autocomplete)
+        upstream.router.add_get('/nominatim', nominatim)
+        self.upstream = TestServer(upstream)
+        await self.upstream.start_server()
+        base_url = str(self.upstream.make_url(''))
+        self.patches = [
+            patch('infrastructure.wolt_client.WOLT_SEARCH_URL', f"{base_url}/wolt"),
+            patch('infrastructure.wolt_client.WOLT_VENUE_URL', f"{base_url}/venue/{{slug}}"),
+            patch('infrastructure.chp_client.CHP_COMPARE_RESULTS_URL', f"{base_url}/chp"),
+            patch('infrastructure.chp_client.CHP_AUTOCOMPLETE_URL', f"{base_url}/autocomplete"),
+            patch('infrastructure.geocoder.NOMINATIM_URL', f"{base_url}/nominatim"),
+        ]
+        for url_patch in self.patches:
+            url_patch.start()
+
+        self.server = ComparisonServer(max_concurrent=1, max_queued=1, timeout=5)
+        self.client = TestClient(TestServer(self.server.create_app()))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.upstream.close()
+        for url_patch in self.patches:
+            url_patch.stop()
+
+    async def compare(self, address="Tel Aviv", items=ITEMS_TO_SEARCH):
+        return await self.client.post('/compare', json={'address': address, 'items': [list(item) for item in items]})
+
+    async def test_compare(self):
+        response = await self.compare()
+        self.assertEqual(response.status, 200)
+        result = await response.json()
+        self.assertEqual([venue['slug'] for venue in result['cheapest_venues']], ["venue-1", "venue-2"])
+        self.assertEqual(result['cheapest_venues'][0]['total_price'], 16.0)
+        self.assertEqual(result['online_stores'][0]['total_price'], 20.0)
+        self.assertEqual(result['timed_out_searches'], [])
+        self.assertEqual(result['chp_timed_out_searches'], [])
+        self.assertIn(('venue', "venue-1"), self.upstream_calls)
+
+    async def test_caches_stay_warm_between_requests(self):
+        await self.compare()
+        calls = len(self.upstream_calls)
+        response = await self.compare()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(self.upstream_calls), calls)
+
+        stats = await (await self.client.get('/stats')).json()
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['cache_entries']['geocode'], 1)
+
+    async def test_full_queue_is_turned_away(self):
+        self.wolt_delay = 0.2
+        running = asyncio.ensure_future(self.compare("Address 0"))
+        while not self.server.running:
+            await asyncio.sleep(0.01)
+        # One comparison runs and one waits, the third has no room
+        responses = await asyncio.gather(running, self.compare("Address 1"), self.compare("Address 2"))
+        self.assertEqual(sorted(response.status for response in responses), [200, 200, 503])
+
+    async def test_geocoding_failure_keeps_online_stores(self):
+        self.geocode_status = 404
+        response = await self.compare()
+        self.assertEqual(response.status, 200)
+        result = await response.json()
+        self.assertEqual(result['cheapest_venues'], [])
+        self.assertEqual(result['online_stores'][0]['total_price'], 20.0)
+        self.assertNotIn('wolt', [source for source, _ in self.upstream_calls])
+
+    async def test_failed_comparison(self):
+        with patch('server.Comparison.result', side_effect=HttpStatusError(404, "https://upstream/missing")):
+            response = await self.compare()
+        self.assertEqual(response.status, 502)
+        self.assertIn("HTTP 404", (await response.json())['error'])
+
+    async def test_invalid_request(self):
+        response = await self.client.post('/compare', json={'address': "Tel Aviv", 'items': [["milk", "yes"]]})
+        self.assertEqual(response.status, 400)
+        self.assertIn('items', (await response.json())['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from infrastructure.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_are_shared(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def search(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return [key]
+
+        results = await asyncio.gather(*(single_flight.run(key, lambda key=key: search(key)) for key in "aaba"))
+        self.assertEqual(results, [["a"], ["a"], ["b"], ["a"]])
+        self.assertIs(results[0], results[1])
+        self.assertEqual(sorted(calls), ["a", "b"])
+        self.assertEqual(single_flight.stats(), {'started': 2, 'shared': 2, 'in_flight': 0})
+
+        # Finished calls aren't remembered, that's what the caches are for
+        await single_flight.run("a", lambda: search("a"))
+        self.assertEqual(len(calls), 3)
+
+    async def test_cancelled_waiter_does_not_cancel_the_others(self):
+        single_flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def search():
+            started.set()
+            await asyncio.sleep(0.02)
+            return 1
+
+        first = asyncio.ensure_future(single_flight.run("a", search))
+        second = asyncio.ensure_future(single_flight.run("a", search))
+        await started.wait()
+        first.cancel()
+        self.assertEqual(await second, 1)
+
+    async def test_call_is_cancelled_with_its_last_waiter(self):
+        single_flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def search():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.ensure_future(single_flight.run("a", search))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertEqual(single_flight.stats()['in_flight'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import itertools
+import random
+import unittest
+from models.chp_venue import ChpVenue
+from models.venue import Venue
+from models.venue_item import VenueItem
+from utils.split_basket import SplitBasket
+
+ITEMS_TO_SEARCH = [(f"item{i}", True) for i in range(6)]
+
+def make_venue(slug, prices):
+    venue = Venue(slug, slug, False, '30-40', True)
+    for searched_name, price in prices.items():
+        venue.add_item(VenueItem(f"{searched_name} at {slug}", '1', searched_name, price, slug))
+    return venue
+
+def brute_force_total(venues, max_venues, venue_cost, missing_prices):
+    best = float('inf')
+    for size in range(1, max_venues + 1):
+        for chosen in itertools.combinations(venues, size):
+            spent = {venue: 0.0 for venue in chosen}
+            total = 0.0
+            # Items no venue has are left out
+            for searched_name in missing_prices:
+                offers = [(venue.items_for(searched_name)[0].price, venue) for venue in chosen if venue.items_for(searched_name)]
+                if offers:
+                    price, venue = min(offers, key=lambda offer: offer[0])
+                    spent[venue] += price
+                    total += price
+                else:
+                    total += missing_prices[searched_name]
+            for venue in chosen:
+                total += venue_cost + (venue.delivery_fee or 0) + max(0.0, (venue.minimum_order or 0) - spent[venue])
+            best = min(best, total)
+    return round(best, 2)
+
+class TestSplitBasket(unittest.TestCase):
+    def test_two_venues_beat_one(self):
+        venues = [
+            make_venue("a", {"item0": 5.0, "item1": 20.0}),
+            make_venue("b", {"item0": 15.0, "item1": 8.0}),
+            make_venue("c", {"item0": 9.0, "item1": 9.0}),
+        ]
+        items_to_search = ITEMS_TO_SEARCH[:2]
+        self.assertEqual(SplitBasket.optimize(venues, [], items_to_search, {}, max_venues=1).total, 18.0)
+        basket = SplitBasket.optimize(venues, [], items_to_search, {}, max_venues=2)
+        self.assertEqual(basket.total, 13.0)
+        self.assertEqual({venue.slug for venue, _ in basket.purchases}, {"a", "b"})
+        # A cost per venue makes splitting not worth it
+        basket = SplitBasket.optimize(venues, [], items_to_search, {}, max_venues=2, venue_cost=6.0)
+        self.assertEqual([venue.slug for venue, _ in basket.purchases], ["c"])
+        self.assertEqual((basket.total, basket.venue_costs), (24.0, 6.0))
+
+    def test_online_stores(self):
+        store = ChpVenue("Store", "store.co.il")
+        store.add_item("item1", 3.0)
+        basket = SplitBasket.optimize([make_venue("a", {"item0": 5.0, "item1": 20.0})], [store], ITEMS_TO_SEARCH[:2], {})
+        self.assertEqual(basket.total, 8.0)
+        self.assertIn((store, (("item1", 3.0),)), basket.purchases)
+
+    def test_missing_items(self):
+        venues = [make_venue("a", {"item0": 5.0}), make_venue("b", {"item1": 6.0}), make_venue("c", {"item2": 7.0})]
+        basket = SplitBasket.optimize(venues, [], ITEMS_TO_SEARCH, {"item0": 5.5, "item1": 8.0, "item2": 10.0}, max_venues=2)
+        # The cheapest item is the one left out, at its average price; items nobody has don't count
+        self.assertEqual(basket.missing_items, ("item0",))
+        self.assertEqual(basket.total, 18.5)
+        self.assertEqual(SplitBasket.optimize(venues, [], ITEMS_TO_SEARCH, {}, max_venues=3).missing_items, ())
+
+    def test_no_venues(self):
+        self.assertEqual(SplitBasket.optimize([], [], ITEMS_TO_SEARCH, {}).total, 0.0)
+
+    def test_checkout_costs(self):
+        venues = [make_venue("a", {"item0": 5.0, "item1": 10.0}), make_venue("b", {"item0": 15.0, "item1": 8.0})]
+        items_to_search = ITEMS_TO_SEARCH[:2]
+        # b's delivery fee makes the split cost more than buying everything at a
+        venues[1].set_details((6.0, 0.0))
+        basket = SplitBasket.optimize(venues, [], items_to_search, {}, max_venues=2)
+        self.assertEqual(([venue.slug for venue, _ in basket.purchases], basket.total), (["a"], 15.0))
+        # Free delivery, but buying only item1 at b falls far short of its minimum order
+        venues[1].set_details((0.0, 16.0))
+        basket = SplitBasket.optimize(venues, [], items_to_search, {}, max_venues=2)
+        self.assertEqual(([venue.slug for venue, _ in basket.purchases], basket.total), (["a"], 15.0))
+        venues[1].set_details((0.0, 9.0))
+        basket = SplitBasket.optimize(venues, [], items_to_search, {}, max_venues=2)
+        self.assertEqual((len(basket.purchases), basket.total, basket.venue_costs), (2, 14.0, 1.0))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        for _ in range(30):
+            venues = [
+                make_venue(f"v{number}", {
+                    searched_name: rng.uniform(5, 30) for searched_name, _ in ITEMS_TO_SEARCH if rng.random() < 0.7
+                })
+                for number in range(12)
+            ]
+            for venue in venues:
+                if rng.random() < 0.5:
+                    venue.set_details((rng.choice([0.0, 3.0]), rng.choice([0.0, 20.0, 40.0])))
+            max_venues, venue_cost = rng.randint(1, 3), rng.choice([0.0, 4.0])
+            average_price_map = {searched_name: 20.0 for searched_name, _ in ITEMS_TO_SEARCH}
+            basket = SplitBasket.optimize(venues, [], ITEMS_TO_SEARCH, average_price_map, max_venues, venue_cost)
+            missing_prices = {
+                name: max([20.0] + [venue.items_for(name)[0].price + 0.01 for venue in venues if venue.items_for(name)])
+                for name, _ in ITEMS_TO_SEARCH if any(venue.items_for(name) for venue in venues)
+            }
+            self.assertAlmostEqual(basket.total, brute_force_total(venues, max_venues, venue_cost, missing_prices), places=2)
+            self.assertLessEqual(len(basket.purchases), max_venues)
+
+if __name__ == '__main__':
+    unittest.main()
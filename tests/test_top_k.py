@@ -0,0 +1,35 @@
+import random
+import unittest
+from utils.top_k import TopK
+
+class TestTopK(unittest.TestCase):
+    def test_matches_stable_sort(self):
+        rng = random.Random(1)
+        totals = [rng.choice([10.0, 12.5, 15.0, 20.0, 30.0]) for _ in range(200)]
+        top_k = TopK(4, most_expensive_k=2)
+        for venue, total in enumerate(totals):
+            top_k.offer(venue, total)
+        ranked = sorted(range(len(totals)), key=lambda venue: totals[venue])
+        most_expensive = sorted(range(len(totals)), key=lambda venue: -totals[venue])
+        self.assertEqual([venue for _, venue in top_k.cheapest()], ranked[:4])
+        self.assertEqual([venue for _, venue in top_k.most_expensive()], most_expensive[:2])
+
+    def test_wants(self):
+        top_k = TopK(2, most_expensive_k=1)
+        self.assertTrue(top_k.wants(100))
+        top_k.offer("a", 10)
+        top_k.offer("b", 20)
+        top_k.offer("c", 30)
+        self.assertTrue(top_k.wants(15, 25))
+        self.assertTrue(top_k.wants(25, 35))
+        # Ties lose to the venue already in the heap
+        self.assertFalse(top_k.wants(20, 30))
+
+    def test_empty(self):
+        top_k = TopK(0)
+        self.assertFalse(top_k.wants(0))
+        self.assertEqual(top_k.cheapest(), [])
+        self.assertEqual(top_k.most_expensive(), [])
+
+if __name__ == '__main__':
+    unittest.main()
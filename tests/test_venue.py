@@ -31,5 +31,46 @@ class TestVenue(unittest.TestCase):
         average_price_map = {"item2": 20.0}
         self.assertEqual(self.venue.total_normalized_price(average_price_map), 30.0)
 
+    def test_checkout_costs(self):
+        self.venue.add_item(VenueItem("item1", "1", "item1", 30.0, "test_slug"))
+        self.assertEqual(self.venue.checkout_costs(), 0)
+        self.venue.set_details((10.0, 50.0))
+        # The delivery fee plus the surcharge up to the minimum order
+        self.assertEqual(self.venue.checkout_costs(), 30.0)
+        self.assertEqual(self.venue.total_normalized_price({}), 60.0)
+        self.venue.add_item(VenueItem("item2", "2", "item2", 25.0, "test_slug"))
+        self.assertEqual(self.venue.total_normalized_price({}), 65.0)
+
+    def test_items_indexed_by_searched_name(self):
+        item1 = VenueItem("item1", "1", "searched", 10.0, "test_slug")
+        item2 = VenueItem("item1 big", "2", "searched", 12.0, "test_slug")
+        self.venue.add_item(item1)
+        self.venue.add_item(item2)
+        self.venue.add_item(VenueItem("item1", "3", "searched", 10.0, "test_slug"))
+        self.assertEqual(self.venue.items_for("searched"), [item1, item2])
+        self.assertEqual(self.venue.items_for("other"), [])
+
+    def test_replace_items_for(self):
+        item1 = VenueItem("item1", "1", "searched", 10.0, "test_slug")
+        item2 = VenueItem("item1 big", "2", "searched", 12.0, "test_slug")
+        other = VenueItem("other", "3", "other", 5.0, "test_slug")
+        for item in (item1, item2, other):
+            self.venue.add_item(item)
+        self.venue.replace_items_for("searched", item2)
+        self.assertEqual(self.venue.items, {item2, other})
+        self.assertEqual(self.venue.items_for("searched"), [item2])
+        self.venue.replace_items_for("searched")
+        self.assertEqual(self.venue.items, {other})
+        self.assertNotIn("searched", self.venue.items_by_searched_name)
+
+    def test_coverage_follows_items(self):
+        item_bits = self.venue.item_bits
+        self.venue.add_item(VenueItem("item1", "1", "searched", 10.0, "test_slug"))
+        self.venue.add_item(VenueItem("other", "2", "other", 5.0, "test_slug"))
+        required = item_bits.mask(["searched", "other", "third"])
+        self.assertEqual(self.venue.missing_count(required), 1)
+        self.venue.replace_items_for("searched")
+        self.assertEqual(self.venue.missing_count(required), 2)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,32 +1,74 @@
+import json
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import Mock, AsyncMock
+from infrastructure.disk_cache import DiskCache
 from infrastructure.wolt_client import WoltClient
+from infrastructure.search_cache import SearchCache
+from models.venue_details import VenueDetails
+from models.wolt_item import WoltItem
 
-class TestWoltClient(unittest.TestCase):
-    @patch('infrastructure.wolt_client.requests.get')
-    def test_get_lat_lon_by_address(self, mock_get):
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [{'lat': '32.0853', 'lon': '34.7818'}]
-        mock_get.return_value = mock_response
-
-        client = WoltClient("Tel Aviv")
-        lat, lon = client._get_lat_lon_by_address("Tel Aviv")
-        self.assertEqual(lat, 32.0853)
-        self.assertEqual(lon, 34.7818)
-
-    @patch('infrastructure.wolt_client.requests.post')
-    def test_search(self, mock_post):
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            'sections': [{'items': [{'menu_item': {'name': 'item1'}, 'link': {'menu_item_details': {'venue_slug': 'venue1'}}}]}]
-        }
-        mock_post.return_value = mock_response
-
-        client = WoltClient("Tel Aviv")
-        items = client.search("item1")
+class TestWoltClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.geocoder = Mock()
+        self.geocoder.get_lat_lon = AsyncMock(return_value=(32.0853, 34.7818))
+        self.search_cache = SearchCache(None, ttl=60)
+        self.venue_cache = DiskCache(None, ttl=60)
+
+    async def test_geocodes_lazily_once(self):
+        client = WoltClient("Tel Aviv", Mock(), self.geocoder, self.search_cache)
+        self.geocoder.get_lat_lon.assert_not_called()
+        lat, lon = await client.get_lat_lon()
+        await client.get_lat_lon()
+        self.assertEqual((lat, lon), (32.0853, 34.7818))
+        self.geocoder.get_lat_lon.assert_awaited_once_with("Tel Aviv")
+
+    async def test_search(self):
+        mock_response = Mock(status=200)
+        mock_response.body = json.dumps({
+            'sections': [{'items': [{'menu_item': {'name': 'item1', 'id': '1', 'price': 1090, 'venue_name': 'Venue 1', 'is_available': True, 'show_wolt_plus': True, 'big_unused_field': 'x' * 1000}, 'link': {'menu_item_details': {'venue_slug': 'venue1'}}}]}]
+        }).encode()
+        http_client = Mock()
+        http_client.post = AsyncMock(return_value=mock_response)
+
+        client = WoltClient("Tel Aviv", http_client, self.geocoder, self.search_cache)
+        items = await client.search("item1")
         self.assertEqual(len(items), 1)
-        self.assertEqual(items[0]['menu_item']['name'], 'item1')
+        self.assertEqual(items[0], WoltItem('venue1', 'Venue 1', 'item1', '1', 1090, True, None, True))
+        self.assertEqual(http_client.post.call_args.kwargs['json']['lat'], 32.0853)
+
+        # Repeated searches are served from the cache
+        self.assertEqual(await client.search(" ITEM1 "), items)
+        http_client.post.assert_awaited_once()
+
+    async def test_search_failure_is_not_cached(self):
+        http_client = Mock()
+        http_client.post = AsyncMock(return_value=Mock(status=429))
+
+        client = WoltClient("Tel Aviv", http_client, self.geocoder, self.search_cache)
+        self.assertEqual(await client.search("item1"), [])
+        self.assertEqual(len(self.search_cache), 0)
+
+    async def test_venue_details(self):
+        mock_response = Mock(status=200)
+        mock_response.body = json.dumps({'results': [{'delivery_specs': {'delivery_pricing': {
+            'base_price': 1500, 'small_order_surcharge_limit': 5000
+        }}}]}).encode()
+        http_client = Mock()
+        http_client.get = AsyncMock(return_value=mock_response)
+
+        client = WoltClient("Tel Aviv", http_client, self.geocoder, self.search_cache, venue_cache=self.venue_cache)
+        self.assertEqual(await client.venue_details("venue1"), VenueDetails(15.0, 50.0))
+        self.assertTrue(http_client.get.call_args.args[0].endswith("/venue1"))
+        self.assertEqual(await client.venue_details("venue1"), VenueDetails(15.0, 50.0))
+        http_client.get.assert_awaited_once()
+
+    async def test_venue_details_failure_is_not_cached(self):
+        http_client = Mock()
+        http_client.get = AsyncMock(return_value=Mock(status=404))
+
+        client = WoltClient("Tel Aviv", http_client, self.geocoder, self.search_cache, venue_cache=self.venue_cache)
+        self.assertIsNone(await client.venue_details("venue1"))
+        self.assertEqual(len(self.venue_cache), 0)
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,55 +1,47 @@
 from bidi.algorithm import get_display
 
 class ConsoleReportFormatter:
-    def generate_console_report(self, wolt_venues, average_price_map, items_to_search, chp_venues=None):
+    def generate_console_report(self, ranking, chp_venues=None, timed_out_searches=None, chp_timed_out_searches=None):
+        if timed_out_searches:
+            print("\nThese searches did not finish in time and were left out of the comparison:")
+            for item_to_search in timed_out_searches:
+                print(f"  - {get_display(item_to_search)}")
+        if chp_timed_out_searches:
+            print("\nThese online store searches did not finish in time, the online stores are compared without them:")
+            for item_to_search in chp_timed_out_searches:
+                print(f"  - {get_display(item_to_search)}")
+
         print("\n=== Wolt Venues Report ===")
-        self._generate_wolt_report(wolt_venues, average_price_map, items_to_search)
+        self._generate_wolt_report(ranking)
         
         if chp_venues:
             print("\n=== Online Stores Report ===")
             self._generate_chp_report(chp_venues)
 
         print("\n===================")
-        self._print_statistics(wolt_venues, average_price_map, chp_venues)
+        self._print_statistics(ranking)
 
-    def _generate_wolt_report(self, venues, average_price_map, items_to_search):
-        must_include_items = [item_to_search for item_to_search, must_include in items_to_search if must_include]
-        sorted_venues = sorted(
-            [venue for venue in venues.values() if all(
-                any(item.searched_name == item_to_search for item in venue.items) for item_to_search in must_include_items)],
-            key=lambda v: v.total_normalized_price(average_price_map)
-        )
+    def _generate_wolt_report(self, ranking):
+        sorted_venues = ranking.top_venues
         if sorted_venues:
             print("\n\n=====================")
             print("\nCheapest total:")
-            self.print_venue(sorted_venues[0], average_price_map)
+            self.print_venue(sorted_venues[0], ranking)
             print("\n=====================\n\n")
 
             if len(sorted_venues) > 1:
                 print("\nOther Options:")
                 for rank, venue in enumerate(sorted_venues[1:3], start=2):
-                    self.print_venue(venue, average_price_map, rank)
+                    self.print_venue(venue, ranking, rank)
         else:
             print("\nNo venues found that sell all must-have items.")
-            venues_with_one_missing_item = [
-                venue for venue in venues.values()
-                if len([item for item in venue.missing_items if any(
-                    item.searched_name == item_to_search and must_include for item_to_search, must_include in items_to_search)]) == 1
-            ]
-            venues_with_one_missing_item.sort(key=lambda v: v.total_normalized_price(average_price_map))
             print("\nTop 3 venues with at least one missing must-have item:")
-            for venue in venues_with_one_missing_item[:3]:
-                self.print_venue(venue, average_price_map)
-        most_expensive_venue = max(
-            [venue for venue in venues.values() if all(
-                any(item.searched_name == item_to_search for item in venue.items) for item_to_search in must_include_items)],
-            key=lambda v: v.total_normalized_price(average_price_map),
-            default=None
-        )
-        if most_expensive_venue:
+            for venue in ranking.one_missing_venues:
+                self.print_venue(venue, ranking)
+        if ranking.most_expensive_venue:
             print("---------------------")
             print("\nMost Expensive Venue:")
-            self.print_venue(most_expensive_venue, average_price_map)
+            self.print_venue(ranking.most_expensive_venue, ranking)
 
     def _generate_chp_report(self, venues):
         if not venues:
@@ -68,36 +60,33 @@ class ConsoleReportFormatter:
                     item_text += f" ({url})"
                 print(item_text)
 
-    def print_venue(self, venue, average_price_map, rank=None):
+    def print_venue(self, venue, ranking, rank=None):
         if rank:
             print(f"\nOption {rank}:")
         print(f"Venue: {get_display(venue.name)}")
         print(venue.url)
-        print(f"Total Normalized Price: {venue.total_normalized_price(average_price_map)}")
+        print(f"Total Normalized Price: {ranking.normalized_total(venue)}")
         print("Items:")
         for item in venue.items:
             print(f"  - {get_display(item.name)}: {item.price}")
+        self.print_checkout_costs(venue)
 
-    def _print_statistics(self, venues, average_price_map, chp_venues=None):
-        must_include_items = [venue for venue in venues.values() if all(
-            any(item.searched_name == item_to_search for item in venue.items) 
-            for item_to_search, must_include in average_price_map.items() if must_include
-        )]
-        
-        num_venues = len(must_include_items)
-        if num_venues > 0:
-            total_prices = [venue.total_normalized_price(average_price_map) for venue in must_include_items]
-            min_price = min(total_prices) if total_prices else 0
-            max_price = max(total_prices) if total_prices else 0
+    def print_checkout_costs(self, venue):
+        if not venue.details_known:
+            print("Delivery fee and minimum order unknown, not included in the total")
+            return
+        print(f"Delivery Fee: {venue.delivery_fee:.2f}")
+        if venue.minimum_order:
+            print(f"Minimum Order: {venue.minimum_order:.2f} (surcharge {venue.small_order_surcharge():.2f})")
 
+    def _print_statistics(self, ranking):
+        num_venues = ranking.complete_venues_count
+        if num_venues > 0:
             print(get_display(f"\nחנויות שמצאו את כל הפריטים החיוניים: {num_venues}"))
-            stats_text = f"מחיר מינימלי: ₪{min_price}   |   מחיר מקסימלי: ₪{max_price}"
+            stats_text = f"מחיר מינימלי: ₪{ranking.min_total}   |   מחיר מקסימלי: ₪{ranking.max_total}"
             
             # Add CHP venue statistics if available
-            if chp_venues:
-                chp_prices = [venue.total_price() for venue in chp_venues]
-                if chp_prices:
-                    chp_min_price = min(chp_prices)
-                    stats_text += f"   |   מחיר מינימלי באונליין: ₪{chp_min_price:.2f}"
+            if ranking.chp_min_price is not None:
+                stats_text += f"   |   מחיר מינימלי באונליין: ₪{ranking.chp_min_price:.2f}"
             
             print(get_display(stats_text))
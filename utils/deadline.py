@@ -0,0 +1,43 @@
+import asyncio
+
+
+async def gather_until(awaitables, deadline=None):
+    """Like asyncio.gather, but stops waiting at deadline (an event loop time).
+    Awaitables that haven't finished by then are cancelled and their result is None."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    if not tasks:
+        return []
+    timeout = None
+    if deadline is not None:
+        timeout = max(0, deadline - asyncio.get_running_loop().time())
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+    for task in pending:
+        task.cancel()
+    return [task.result() if task not in pending else None for task in tasks]
+
+
+async def as_completed_until(awaitables, deadline=None):
+    """Yield (index, result) for each awaitable as soon as it finishes, stopping at deadline (an event loop time).
+    Awaitables that haven't finished by then are cancelled and never yielded.
+    Close the generator (contextlib.aclosing) when stopping early so the rest get cancelled."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    index_of = {task: index for index, task in enumerate(tasks)}
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = None
+            if deadline is not None:
+                timeout = max(0, deadline - asyncio.get_running_loop().time())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in sorted(done, key=index_of.get):
+                yield index_of[task], task.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -50,8 +50,8 @@ class DocxResultFormatter:
         for run in paragraph.runs:
             run.font.rtl = True
 
-    def add_venue(self, venue, average_price_map):
-        self.add_heading(f"חנות - {venue.name} - מחיר כולל: ₪{venue.total_normalized_price(average_price_map)} ", level=2)
+    def add_venue(self, venue, ranking):
+        self.add_heading(f"חנות - {venue.name} - מחיר כולל: ₪{ranking.normalized_total(venue)} ", level=2)
         paragraph = self.document.add_paragraph()
         self.add_hyperlink(paragraph, venue.url, venue.url)
         paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.RIGHT
@@ -60,13 +60,14 @@ class DocxResultFormatter:
         self.add_heading("פריטים:", level=3)
         for item in venue.items:
             self.add_bullet_point(f"{item.name}: ₪{item.price}", url=item.url)
+        self.add_checkout_costs(venue)
         if venue.missing_items:
             self.add_heading("פריטים חסרים:", level=3)
             for missing_item in venue.missing_items:
-                self.add_bullet_point(f"{missing_item.name}. (מחיר ממוצע - ₪{average_price_map[missing_item.searched_name]})", font_size=10, color=RGBColor(128, 128, 128))
+                self.add_bullet_point(f"{missing_item.name}. (מחיר ממוצע - ₪{ranking.average_price_map[missing_item.searched_name]})", font_size=10, color=RGBColor(128, 128, 128))
 
-    def add_secondary_venue(self, venue, average_price_map, rank):
-        self.add_heading(f"חנות {rank} - {venue.name} - מחיר כולל: ₪{venue.total_normalized_price(average_price_map)} ", level=3)
+    def add_secondary_venue(self, venue, ranking, rank):
+        self.add_heading(f"חנות {rank} - {venue.name} - מחיר כולל: ₪{ranking.normalized_total(venue)} ", level=3)
         paragraph = self.document.add_paragraph()
         self.add_hyperlink(paragraph, venue.url, venue.url)
         paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.RIGHT
@@ -75,10 +76,21 @@ class DocxResultFormatter:
         self.add_heading("פריטים:", level=4)
         for item in venue.items:
             self.add_bullet_point(f"{item.name}: ₪{item.price}", font_size=10, color=RGBColor(128, 128, 128), url=item.url)
+        self.add_checkout_costs(venue, font_size=10)
         if venue.missing_items:
             self.add_heading("פריטים חסרים:", level=4)
             for missing_item in venue.missing_items:
-                self.add_bullet_point(f"{missing_item.name}. (מחיר ממוצע - ₪{average_price_map[missing_item.searched_name]})", font_size=10, color=RGBColor(128, 128, 128))
+                self.add_bullet_point(f"{missing_item.name}. (מחיר ממוצע - ₪{ranking.average_price_map[missing_item.searched_name]})", font_size=10, color=RGBColor(128, 128, 128))
+
+    def add_checkout_costs(self, venue, font_size=12):
+        if not venue.details_known:
+            self.add_bullet_point("דמי משלוח ומינימום הזמנה לא ידועים - לא נכללו במחיר הכולל", font_size, RGBColor(200, 0, 0))
+            return
+        self.add_bullet_point(f"דמי משלוח: ₪{venue.delivery_fee:.2f}", font_size, RGBColor(128, 128, 128))
+        if venue.minimum_order:
+            self.add_bullet_point(
+                f"מינימום הזמנה: ₪{venue.minimum_order:.2f} (תוספת - ₪{venue.small_order_surcharge():.2f})", font_size, RGBColor(128, 128, 128)
+            )
 
     def add_bullet_point(self, text, font_size=12, color=RGBColor(0, 0, 0), url=None):
         paragraph = self.document.add_paragraph(style='ListBullet')
@@ -93,23 +105,15 @@ class DocxResultFormatter:
         run.font.rtl = True
         run.font.name = 'Arial'
 
-    def add_most_expensive_venue(self, venue, average_price_map):
+    def add_most_expensive_venue(self, venue, ranking):
         self.add_heading("הסל היקר ביותר", level=1)
-        self.add_venue(venue, average_price_map)
-
-    def add_statistics(self, venues, average_price_map, chp_venues=None):
-        num_venues = len(venues)
-        total_prices = [venue.total_normalized_price(average_price_map) for venue in venues]
-        avg_price = round(sum(total_prices) / num_venues, 2) if num_venues > 0 else 0
-        min_price = min(total_prices) if total_prices else 0
-        max_price = max(total_prices) if total_prices else 0
-
-        # Calculate cheapest CHP venue price if available
-        chp_min_price = None
-        if chp_venues:
-            chp_prices = [venue.total_price() for venue in chp_venues]
-            if chp_prices:
-                chp_min_price = min(chp_prices)
+        self.add_venue(venue, ranking)
+
+    def add_statistics(self, ranking):
+        num_venues = ranking.complete_venues_count
+        min_price = ranking.min_total
+        max_price = ranking.max_total
+        chp_min_price = ranking.chp_min_price
 
         self.add_heading(f"מספר חנויות שמצאו את כל הפריטים החיוניים: {num_venues}", level=1)
         stats_text = f"מחיר מינימלי: ₪{min_price}   |   מחיר מקסימלי: ₪{max_price}"
@@ -1,42 +1,51 @@
+from utils.product_matcher import ProductMatcher
+
+
 class DuplicateItemsHandler:
     @staticmethod
-    def filter_out_duplicates(items, average_price_map):
+    def filter_out_duplicates(items, average_price_map, price_band=None, matcher=None):
+        """price_band is a (low, high) range from the item's PriceStats; without one, items within 50% of the average price are kept.
+        matcher is the searched item's ProductMatcher; without one it is built from items alone."""
         searched_item = items[0].searched_name
         average_price = DuplicateItemsHandler._calculate_average_price(items, average_price_map)
-        # print("\n\n---------------------")
-        # print(f"Filtering out duplicates for item: {searched_item}")
-        # print(f"Average price: ₪{average_price}")
-        # print("Contestants: ")
-        # for item in items:
-        #     print(f"  - {item.name}: ₪{item.price}")
-
-        # Filter out items that are more than 50% cheaper or more expensive than the average price
+        low_price, high_price = price_band or (average_price * 0.5, average_price * 1.5)
+
+        # Filter out items priced outside the band
         avg_price_filtered_items = [
             item for item in items
-            if average_price * 0.5 <= item.price <= average_price * 1.5
+            if low_price <= item.price <= high_price
         ]
         if not avg_price_filtered_items:
-            # print("No items within 50% of the average price")
             return None
 
+        # Only one item within the price band
         if len(avg_price_filtered_items) == 1:
-            # print(f"Winner: {avg_price_filtered_items[0]} (only one item within 50% range)")
             return avg_price_filtered_items[0]
 
         exact_match = DuplicateItemsHandler._first_exact_match(avg_price_filtered_items, searched_item)
         if exact_match:
-            # print(f"Winner: {exact_match} (exact match)")
             return exact_match
 
-        similar_words_items = DuplicateItemsHandler._most_similar_words(avg_price_filtered_items, searched_item)
-        if len(similar_words_items) == 1:
-            # print(f"Winner: {similar_words_items[0]} (words count match)")
-            return similar_words_items[0]
+        matcher = matcher or ProductMatcher(searched_item, [item.name for item in items])
+        return matcher.best_match(avg_price_filtered_items)
 
-        # check for item with lowest words counts
-        similar_words_items.sort(key=lambda x: len(x.name.split()))
-        # print(f"Winner: {similar_words_items[0]} (lowest words count)")
-        return similar_words_items[0]
+    @staticmethod
+    def resolve_duplicates(venues, searched_name, average_price_map, price_band=None):
+        """Keep at most one item for searched_name at each venue, in one pass over the venues.
+        Every venue shares one ProductMatcher, so each product name is tokenized and scored once.
+        Returns how many items were dropped."""
+        found = [(venue, venue.items_for(searched_name)) for venue in venues]
+        duplicates = [(venue, items) for venue, items in found if len(items) > 1]
+        if not duplicates:
+            return 0
+        matcher = ProductMatcher(searched_name, [item.name for _, items in found for item in items])
+        dropped = 0
+        for venue, items in duplicates:
+            venue.replace_items_for(
+                searched_name, DuplicateItemsHandler.filter_out_duplicates(items, average_price_map, price_band, matcher)
+            )
+            dropped += len(items) - len(venue.items_for(searched_name))
+        return dropped
 
     @staticmethod
     def _calculate_average_price(items, average_price_map):
@@ -49,13 +58,3 @@ class DuplicateItemsHandler:
             if item.name == searched_item:
                 return item
         return None
-
-    @staticmethod
-    def _most_similar_words(items, searched_item):
-        deconstructed_searched_item = searched_item.split()
-        hits = []
-        for item in items:
-            deconstructed_item = item.name.split()
-            hits.append((item, len(set(deconstructed_searched_item) & set(deconstructed_item))))
-        hits.sort(key=lambda x: x[1], reverse=True)
-        return [item for item, hit in hits if hit == hits[0][1]]
\ No newline at end of file
@@ -10,14 +10,20 @@ class HtmlReportFormatter:
         self.statistics = {}
         self.items_to_search = []  # Initialize empty list for searched items
         self._saved_content = []  # Add this line
-        self.average_price_map = {}  # Add this line
-        self.venue_id_to_venue = {}  # Add this line
+        self.ranking = None
         self._init_template()
 
     def set_items_to_search(self, items):
         """Set the items to search after initialization"""
         self.items_to_search = items
 
+    def set_ranking(self, ranking):
+        """Set the Ranking the report is rendered from"""
+        self.ranking = ranking
+
+    def add_heading(self, text, level=2):
+        self.content.append(f'<h{level} class="section-title mt-4">{text}</h{level}>')
+
     def _init_template(self):
         self.html_template = '''
 <!DOCTYPE html>
@@ -96,6 +102,17 @@ class HtmlReportFormatter:
             color: var(--secondary-color);
             font-size: 0.9rem;
         }}
+
+        .checkout-costs {{
+            color: var(--secondary-color);
+            font-size: 0.9rem;
+            list-style: none;
+            padding: 0;
+        }}
+
+        .unknown-costs {{
+            color: #dc3545;
+        }}
         
         .carousel-control-prev,
         .carousel-control-next {{
@@ -338,20 +355,12 @@ class HtmlReportFormatter:
 </html>
 '''
 
-    def add_statistics(self, venues, average_price_map, chp_venues=None):
-        """Add statistics and store average prices for later use"""
-        self.average_price_map = average_price_map  # Store the average prices
-        
-        num_venues = len(venues)
-        total_prices = [venue.total_normalized_price(average_price_map) for venue in venues]
-        min_price = min(total_prices) if total_prices else 0
-        max_price = max(total_prices) if total_prices else 0
-
-        chp_min_price = None
-        if chp_venues:
-            chp_prices = [venue.total_price() for venue in chp_venues]
-            if chp_prices:
-                chp_min_price = min(chp_prices)
+    def add_statistics(self, ranking):
+        """Add statistics about the venues that have every must-include item"""
+        num_venues = ranking.complete_venues_count
+        min_price = ranking.min_total
+        max_price = ranking.max_total
+        chp_min_price = ranking.chp_min_price
 
         stats_html = f'''
         <div class="stats-section">
@@ -371,7 +380,23 @@ class HtmlReportFormatter:
         '''
         self.content.append(stats_html)
 
-    def _get_sorted_items_html(self, venue, average_price_map):
+    def add_timed_out_searches(self, timed_out_searches, chp_timed_out_searches=()):
+        """Flag searches that did not finish before the run deadline, and online store searches that didn't on their own"""
+        for searches, heading in [
+            (timed_out_searches, "חיפושים שלא הסתיימו בזמן ולא נכללו בהשוואה:"),
+            (chp_timed_out_searches, "חיפושים בחנויות המקוונות שלא הסתיימו בזמן ולא נכללו בהשוואת החנויות המקוונות:"),
+        ]:
+            if not searches:
+                continue
+            items_html = "".join(f'<li>{item}</li>' for item in searches)
+            self.content.append(f'''
+            <div class="missing-items timed-out-searches mb-4">
+                <h6>{heading}</h6>
+                <ul>{items_html}</ul>
+            </div>
+            ''')
+
+    def _get_sorted_items_html(self, venue):
         """Helper method to get items HTML in consistent order"""
         items_html = []
         
@@ -388,16 +413,25 @@ class HtmlReportFormatter:
         
         return "".join(items_html)
 
-    def add_venue_card(self, venue, average_price_map, title=None, card_class=""):
+    def _get_checkout_costs_html(self, venue):
+        """The delivery fee and minimum order the total includes, or a warning that they are unknown"""
+        if not venue.details_known:
+            return '<div class="checkout-costs unknown-costs mt-2">דמי משלוח ומינימום הזמנה לא ידועים - לא נכללו במחיר</div>'
+        costs = [f'<li>דמי משלוח: ₪{venue.delivery_fee:.2f}</li>']
+        if venue.minimum_order:
+            costs.append(f'<li>מינימום הזמנה: ₪{venue.minimum_order:.2f} (תוספת - ₪{venue.small_order_surcharge():.2f})</li>')
+        return f'<ul class="checkout-costs mt-2">{"".join(costs)}</ul>'
+
+    def add_venue_card(self, venue, ranking, title=None, card_class=""):
         # Create HTML content for items in consistent order
-        items_html = self._get_sorted_items_html(venue, average_price_map)
+        items_html = self._get_sorted_items_html(venue)
         
         # Create HTML content for missing items
         missing_items_html = ""
         if venue.missing_items:
             missing_items = []
             for item in venue.missing_items:
-                avg_price = average_price_map.get(item.searched_name, 0)
+                avg_price = ranking.average_price_map.get(item.searched_name, 0)
                 missing_items.append(f'<li>{item.name} (מחיר ממוצע - ₪{avg_price:.2f})</li>')
             
             missing_items_html = f'''
@@ -413,33 +447,33 @@ class HtmlReportFormatter:
         <div class="venue-card {card_class}">
             <h3>{venue_title}</h3>
             <a href="{venue.url}" class="text-decoration-none" target="_blank" rel="noopener noreferrer">קישור לחנות</a>
-            <div class="price-tag mt-2">₪{venue.total_normalized_price(average_price_map):.2f}</div>
+            <div class="price-tag mt-2">₪{ranking.normalized_total(venue):.2f}</div>
             <ul class="item-list mt-3">
                 {items_html}
             </ul>
+            {self._get_checkout_costs_html(venue)}
             {missing_items_html}
         </div>
         '''
         self.content.append(venue_html)
 
-    def add_carousel(self, venues, average_price_map, id_prefix, title):
+    def add_carousel(self, venues, ranking, id_prefix, title):
+        """Add the venues in the order given, which is already the ranking's order"""
         if not venues:
             return
 
         carousel_items = []
-        venues = sorted(venues, 
-                      key=lambda v: v.total_normalized_price(average_price_map))
         
         for i, venue in enumerate(venues):
             # Create items HTML in consistent order
-            items_html = self._get_sorted_items_html(venue, average_price_map)
+            items_html = self._get_sorted_items_html(venue)
             
             # Create missing items HTML
             missing_items_html = ""
             if venue.missing_items:
                 missing_items = []
                 for item in venue.missing_items:
-                    avg_price = average_price_map.get(item.searched_name, 0)
+                    avg_price = ranking.average_price_map.get(item.searched_name, 0)
                     missing_items.append(f'<li>{item.name} (מחיר ממוצע - ₪{avg_price:.2f})</li>')
                 
                 missing_items_html = f'''
@@ -454,10 +488,11 @@ class HtmlReportFormatter:
                 <div class="venue-card">
                     <h3>{venue.name}</h3>
                     <a href="{venue.url}" class="text-decoration-none" target="_blank" rel="noopener noreferrer">קישור לחנות</a>
-                    <div class="price-tag mt-2">₪{venue.total_normalized_price(average_price_map):.2f}</div>
+                    <div class="price-tag mt-2">₪{ranking.normalized_total(venue):.2f}</div>
                     <ul class="item-list mt-3">
                         {items_html}
                     </ul>
+                    {self._get_checkout_costs_html(venue)}
                     {missing_items_html}
                 </div>
             </div>
@@ -503,9 +538,8 @@ class HtmlReportFormatter:
             missing_items_html = ""
             if venue.missing_items:
                 missing_items = []
-                for item in venue.missing_items:
-                    avg_price = average_price_map.get(item.searched_name, 0)
-                    missing_items.append(f'<li>{item.name} (מחיר ממוצע - ₪{avg_price:.2f})</li>')
+                for item_name in venue.missing_items:
+                    missing_items.append(f'<li>{item_name}</li>')
                 
                 missing_items_html = f'''
                 <div class="missing-items mt-3">
@@ -650,16 +684,9 @@ class HtmlReportFormatter:
 
     def _get_price_range(self, item_name):
         """Get min-max price range for an item"""
-        prices = []
-        # Collect prices from all venues
-        for venue in self.venue_id_to_venue.values():
-            matching_items = [item for item in venue.items if item.searched_name == item_name]
-            if len(matching_items) == 1:
-                prices.append(matching_items[0].price)
-        
-        if prices:
-            min_price = min(prices)
-            max_price = max(prices)
+        price_range = self.ranking.item_price_ranges.get(item_name) if self.ranking else None
+        if price_range:
+            min_price, max_price = price_range
             # Show cheaper price on the left
             return f"₪{max_price:.2f} - ₪{min_price:.2f}"
         return "מחיר לא ידוע"
@@ -686,23 +713,3 @@ class HtmlReportFormatter:
             </div>
         </div>
         '''
-
-    def generate_report(self, file_name, chp_venues=None):
-        # ...existing code...
-        # Add cheapest venue as main card with special styling
-        result_formatter.add_venue_card(
-            sorted_venues[0], 
-            self.average_price_map,
-            "החנות הזולה ביותר",
-            "cheapest-venue"
-        )
-        
-        # Change most expensive venue styling
-        if most_expensive_venue:
-            result_formatter.add_venue_card(
-                most_expensive_venue,
-                self.average_price_map,
-                "החנות היקרה ביותר",
-                "most-expensive"
-            )
-        # ...existing code...
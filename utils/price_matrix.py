@@ -0,0 +1,94 @@
+import numpy as np
+
+# Rows the arrays start with, and grow by at least, as venues are added
+INITIAL_ROWS = 1024
+
+
+class PriceMatrix:
+    """Venues x searched items prices of one comparison, filled in as its searches finish.
+
+    Each cell holds the price of the items a venue has for a searched item and how many there are,
+    alongside a mask of the items the venue is missing and each venue's checkout details. Only the
+    search for an item changes its column, so a column is written once, after that search's
+    duplicates are resolved. Totals, basket coverage and price ranges are then taken over every
+    venue at once.
+    """
+
+    def __init__(self, searched_names):
+        self.column_of = {searched_name: column for column, searched_name in enumerate(searched_names)}
+        self.venues = []  # row -> venue, in the order they were added
+        self.row_of = {}  # venue slug -> row
+        shape = (INITIAL_ROWS, len(self.column_of))
+        self.prices = np.zeros(shape)
+        self.item_counts = np.zeros(shape, dtype=np.int32)
+        self.missing = np.zeros(shape, dtype=bool)
+        self.delivery_fees = np.zeros(INITIAL_ROWS)
+        self.minimum_orders = np.zeros(INITIAL_ROWS)
+        self.completed = np.zeros(len(self.column_of), dtype=bool)  # Columns already written
+
+    def __len__(self):
+        return len(self.venues)
+
+    def add_venue(self, venue):
+        """Add a row for venue, missing the items of the searches that already finished"""
+        row = len(self.venues)
+        if row == len(self.prices):
+            self._grow(2 * row)
+        self.venues.append(venue)
+        self.row_of[venue.slug] = row
+        self.missing[row] = self.completed
+
+    def _grow(self, rows):
+        extra = rows - len(self.prices)
+        self.prices = np.concatenate([self.prices, np.zeros((extra, self.prices.shape[1]))])
+        self.item_counts = np.concatenate([self.item_counts, np.zeros((extra, self.item_counts.shape[1]), dtype=np.int32)])
+        self.missing = np.concatenate([self.missing, np.zeros((extra, self.missing.shape[1]), dtype=bool)])
+        self.delivery_fees = np.concatenate([self.delivery_fees, np.zeros(extra)])
+        self.minimum_orders = np.concatenate([self.minimum_orders, np.zeros(extra)])
+
+    def set_column(self, searched_name, venues_with_items):
+        """Write searched_name's finished search: the items venues_with_items have for it, and every other venue missing it"""
+        column = self.column_of[searched_name]
+        rows, prices, counts = [], [], []
+        for venue in venues_with_items:
+            items = venue.items_by_searched_name.get(searched_name, ())
+            rows.append(self.row_of[venue.slug])
+            prices.append(sum([item.price for item in items]))
+            counts.append(len(items))
+        self.missing[:len(self.venues), column] = True
+        self.missing[rows, column] = False
+        self.prices[rows, column] = prices
+        self.item_counts[rows, column] = counts
+        self.completed[column] = True
+
+    def set_details(self, venue):
+        """Take in venue's delivery fee and minimum order, once they're set on the venue"""
+        row = self.row_of[venue.slug]
+        self.delivery_fees[row] = venue.delivery_fee or 0
+        self.minimum_orders[row] = venue.minimum_order or 0
+
+    def approximate_totals(self, average_price_map):
+        """Every venue's normalized total, as Venue.total_normalized_price computes it but without its rounding"""
+        rows = len(self.venues)
+        average_prices = np.array([average_price_map.get(searched_name, 0) for searched_name in self.column_of], dtype=float)
+        items_prices = self.prices[:rows].sum(axis=1)
+        checkout_costs = self.delivery_fees[:rows] + np.maximum(self.minimum_orders[:rows] - items_prices, 0)
+        return items_prices + checkout_costs + self.missing[:rows] @ average_prices
+
+    def missing_counts(self, searched_names):
+        """How many of searched_names each venue has no item for"""
+        columns = [self.column_of[searched_name] for searched_name in searched_names]
+        return (self.item_counts[:len(self.venues), columns] == 0).sum(axis=1)
+
+    def item_price_ranges(self, searched_names):
+        """searched_name -> (min, max) price over venues with exactly one item for it, or None"""
+        columns = [self.column_of[searched_name] for searched_name in searched_names]
+        prices = self.prices[:len(self.venues), columns]
+        single_item = self.item_counts[:len(self.venues), columns] == 1
+        min_prices = np.where(single_item, prices, np.inf).min(axis=0, initial=np.inf)
+        max_prices = np.where(single_item, prices, -np.inf).max(axis=0, initial=-np.inf)
+        has_price = single_item.any(axis=0)
+        return {
+            searched_name: (float(min_prices[index]), float(max_prices[index])) if has_price[index] else None
+            for index, searched_name in enumerate(searched_names)
+        }
@@ -0,0 +1,171 @@
+import math
+
+# Higher keeps more centroids for more accurate quantiles; 100 keeps about 60
+DEFAULT_COMPRESSION = 100
+# Values buffered before they are merged into the centroids
+BUFFER_SIZE = 200
+# Observations needed before the quantiles are trusted over a single run's average
+MIN_OBSERVATIONS = 8
+# Tukey's fences: items more than IQR_FENCE × IQR outside the quartiles are outliers
+IQR_FENCE = 1.5
+# The band never gets narrower than ±MIN_BAND of the median, so items sold at one price everywhere don't pin it to a point
+MIN_BAND = 0.25
+
+
+class RunningStats:
+    """Count, mean and variance updated one value at a time (Welford's method), plus min and max"""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min=math.inf, max=-math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self):
+        """Sample variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileDigest:
+    """Approximate quantiles of a stream in bounded memory, a merging t-digest.
+
+    Values are summarized by (mean, weight) centroids, small near the tails and larger around the
+    median, so the extreme quantiles stay accurate while the size stays below compression.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, centroids=None):
+        self.compression = compression
+        self.centroids = [tuple(centroid) for centroid in centroids or []]  # (mean, weight), sorted by mean
+        self.weight = sum(weight for _, weight in self.centroids)
+        self._buffer = []
+
+    def update(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= BUFFER_SIZE:
+            self.compress()
+
+    def compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + [(value, 1) for value in self._buffer])
+        self._buffer = []
+        self.weight = sum(weight for _, weight in points)
+
+        merged = []
+        mean, weight = points[0]
+        weight_before = 0
+        q_limit = self._q_limit(0)
+        for point_mean, point_weight in points[1:]:
+            if (weight_before + weight + point_weight) / self.weight <= q_limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                merged.append((mean, weight))
+                weight_before += weight
+                q_limit = self._q_limit(weight_before / self.weight)
+                mean, weight = point_mean, point_weight
+        merged.append((mean, weight))
+        self.centroids = merged
+
+    def _q_limit(self, q):
+        """The furthest quantile a centroid starting at q may reach, by the arcsine scale function"""
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def quantile(self, q, min_value=None, max_value=None):
+        """Interpolated between centroid centers, and towards min_value and max_value past the outer ones"""
+        self.compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+        target = q * self.weight
+        first_mean, first_weight = self.centroids[0]
+        if target < first_weight / 2:
+            low = first_mean if min_value is None else min_value
+            return low + (first_mean - low) * target / (first_weight / 2)
+
+        weight_before = 0
+        for (left_mean, left_weight), (right_mean, right_weight) in zip(self.centroids, self.centroids[1:]):
+            left_center = weight_before + left_weight / 2
+            right_center = weight_before + left_weight + right_weight / 2
+            if target <= right_center:
+                return left_mean + (right_mean - left_mean) * (target - left_center) / (right_center - left_center)
+            weight_before += left_weight
+
+        last_mean, last_weight = self.centroids[-1]
+        high = last_mean if max_value is None else max_value
+        return last_mean + (high - last_mean) * (target - (self.weight - last_weight / 2)) / (last_weight / 2)
+
+
+class PriceStats:
+    """Streaming price statistics for one searched item: mean and variance, and quantiles for a median/IQR band"""
+
+    def __init__(self, moments=None, digest=None):
+        self.moments = moments or RunningStats()
+        self.digest = digest or QuantileDigest()
+
+    def update(self, price):
+        self.moments.update(price)
+        self.digest.update(price)
+
+    def update_many(self, prices):
+        for price in prices:
+            self.update(price)
+        return self
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def quantile(self, q):
+        return self.digest.quantile(q, self.moments.min, self.moments.max)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def band(self, min_observations=MIN_OBSERVATIONS):
+        """(low, high) prices a product for this item should fall in, or None while there are too few observations"""
+        if self.count < min_observations:
+            return None
+        q1, median, q3 = self.quantile(0.25), self.quantile(0.5), self.quantile(0.75)
+        iqr = q3 - q1
+        return (
+            max(0.0, min(q1 - IQR_FENCE * iqr, median * (1 - MIN_BAND))),
+            max(q3 + IQR_FENCE * iqr, median * (1 + MIN_BAND))
+        )
+
+    def to_dict(self):
+        self.digest.compress()
+        return {
+            'count': self.moments.count,
+            'mean': self.moments.mean,
+            'm2': self.moments.m2,
+            'min': self.moments.min,
+            'max': self.moments.max,
+            'centroids': [[round(mean, 4), weight] for mean, weight in self.digest.centroids],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            RunningStats(data['count'], data['mean'], data['m2'], data['min'], data['max']),
+            QuantileDigest(centroids=data['centroids'])
+        )
@@ -0,0 +1,129 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Geresh, gershayim and the quotes stores type instead of them: ק"ג, קוטג'
+QUOTES_PATTERN = re.compile(r"[׳״'\"`’‘“”]")
+TOKEN_PATTERN = re.compile(r"\d+(?:[.,]\d+)?(?:\s*%)?|[^\W\d_]+")
+NUMBER_PATTERN = re.compile(r"[\d.]+")
+# Letters that attach to the front of Hebrew words: and, the, in, to, from, that, as
+PREFIX_LETTERS = frozenset('והבלמשכ')
+MAX_PREFIX_LETTERS = 2
+# Units, as (base unit, factor), so 1 ק"ג and 1000 גרם are the same size
+UNITS = {
+    'ג': ('g', 1), 'גר': ('g', 1), 'גרם': ('g', 1), 'גרמים': ('g', 1), 'g': ('g', 1), 'gr': ('g', 1),
+    'קג': ('g', 1000), 'קילו': ('g', 1000), 'kg': ('g', 1000),
+    'מל': ('ml', 1), 'ml': ('ml', 1),
+    'ל': ('ml', 1000), 'ליטר': ('ml', 1000), 'ליטרים': ('ml', 1000), 'l': ('ml', 1000),
+    'יח': ('units', 1), 'יחידות': ('units', 1),
+}
+TOKEN_CACHE_SIZE = 50000
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tokenize(name):
+    """Normalized tokens of a product name, with sizes such as "500 גרם", "1.5 ל'" and "16%" as single tokens like '500g', '1500ml' and '16%'"""
+    words = TOKEN_PATTERN.findall(QUOTES_PATTERN.sub('', name.lower()))
+    tokens = []
+    index = 0
+    while index < len(words):
+        word = words[index]
+        # isdecimal, like \d, and unlike isdigit, which takes superscripts such as '²' that float() rejects
+        if word[0].isdecimal():
+            number = _parse_number(word.rstrip('% '))
+            unit = UNITS.get(words[index + 1]) if index + 1 < len(words) else None
+            if word.endswith('%'):
+                tokens.append(f"{number:g}%")
+            elif unit:
+                base_unit, factor = unit
+                tokens.append(f"{number * factor:g}{base_unit}")
+                index += 1
+            else:
+                tokens.append(f"{number:g}")
+        else:
+            tokens.append(word)
+        index += 1
+    return tuple(tokens)
+
+
+def _number_part(token):
+    return NUMBER_PATTERN.match(token).group()
+
+
+def _parse_number(text):
+    # A comma before three digits separates thousands, otherwise it is a decimal point
+    if re.fullmatch(r"\d{1,3},\d{3}", text):
+        return float(text.replace(',', ''))
+    return float(text.replace(',', '.'))
+
+
+class ProductMatcher:
+    """Scores product names against one searched item by TF-IDF cosine similarity of their tokens.
+
+    Document frequencies come from every product name the item's search returned, so words all
+    of them share (the brand, the product type) count for little and the ones that tell them apart
+    (fat percentage, size) count for more. A product token that is a searched token with Hebrew
+    prefix letters, or the same size with or without its unit, counts as the searched token.
+    Scores are computed once per distinct name.
+    """
+
+    def __init__(self, searched_name, product_names=()):
+        self.searched_name = searched_name
+        self.searched_tokens = frozenset(tokenize(searched_name))
+        product_names = set(product_names)
+        self.document_count = len(product_names)
+        self.document_frequencies = Counter(
+            token for name in product_names for token in set(self._canonical_tokens(tokenize(name)))
+        )
+        self.searched_vector = self._vector(tokenize(searched_name))
+        self.searched_norm = math.sqrt(sum(weight * weight for weight in self.searched_vector.values()))
+        self._rank_keys = {}  # product name -> (score, -token count)
+
+    def _canonical_tokens(self, tokens):
+        return [self._canonical(token) for token in tokens]
+
+    def _canonical(self, token):
+        if token in self.searched_tokens:
+            return token
+        if token[0].isdecimal():
+            # '850' and '850g' are the same size when only one of the names gives the unit
+            number = _number_part(token)
+            if number in self.searched_tokens:
+                return number
+            for searched_token in self.searched_tokens:
+                if searched_token[0].isdecimal() and _number_part(searched_token) == token:
+                    return searched_token
+            return token
+        for prefix_length in range(1, MAX_PREFIX_LETTERS + 1):
+            if len(token) - prefix_length < 2 or token[prefix_length - 1] not in PREFIX_LETTERS:
+                break
+            if token[prefix_length:] in self.searched_tokens:
+                return token[prefix_length:]
+        return token
+
+    def _idf(self, token):
+        return math.log((1 + self.document_count) / (1 + self.document_frequencies[token])) + 1
+
+    def _vector(self, tokens):
+        return {token: count * self._idf(token) for token, count in Counter(tokens).items()}
+
+    def score(self, product_name):
+        """Cosine similarity between the product and the searched item, from 0 to 1"""
+        return self._rank_key(product_name)[0]
+
+    def _rank_key(self, product_name):
+        rank_key = self._rank_keys.get(product_name)
+        if rank_key is None:
+            tokens = tokenize(product_name)
+            vector = self._vector(self._canonical_tokens(tokens))
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            dot = sum(weight * self.searched_vector.get(token, 0) for token, weight in vector.items())
+            score = dot / (norm * self.searched_norm) if norm and self.searched_norm else 0.0
+            rank_key = self._rank_keys[product_name] = (score, -len(tokens))
+        return rank_key
+
+    def best_match(self, items):
+        """The item whose name scores highest, the one with fewer tokens on a tie"""
+        rank_key = self._rank_key
+        return max(items, key=lambda item: rank_key(item.name))
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+from utils.top_k import TopK, ROUNDING_SLACK
+
+# The reports show the cheapest venue and up to three more options
+TOP_K = 4
+# Venues shown when no venue has every must-include item
+FALLBACK_K = 3
+
+
+@dataclass(frozen=True)
+class Ranking:
+    """Everything the report formatters show about the Wolt venues, computed once"""
+    top_venues: tuple  # Cheapest complete venues first, at most TOP_K
+    complete_venues_count: int
+    one_missing_venues: tuple  # Cheapest venues missing exactly one must-include item, at most FALLBACK_K
+    most_expensive_venue: object
+    min_total: float
+    max_total: float
+    normalized_totals: MappingProxyType  # venue slug -> normalized total, for the venues above
+    item_price_ranges: MappingProxyType  # searched name -> (min, max) or None
+    average_price_map: MappingProxyType
+    chp_min_price: float = None
+
+    @classmethod
+    def from_venues(cls, venues, items_to_search, average_price_map, chp_venues=None, top_k=TOP_K, fallback_k=FALLBACK_K):
+        must_include_items = [item_to_search for item_to_search, must_include in items_to_search if must_include]
+        required_masks = {}  # ItemBits -> mask of the must-include items, venues of one comparison share one
+        # Each missing item adds its average, so the number of missing items bounds what they add
+        min_average_price = min(average_price_map.values(), default=0)
+        max_average_price = max(average_price_map.values(), default=0)
+        complete_venues = TopK(top_k, most_expensive_k=1)
+        one_missing_venues = TopK(fallback_k)
+        complete_venues_count = 0
+        single_item_prices = {item_to_search: [] for item_to_search, _ in items_to_search}
+
+        for venue in venues:
+            for searched_name, items in venue.items_by_searched_name.items():
+                if len(items) == 1 and searched_name in single_item_prices:
+                    single_item_prices[searched_name].append(items[0].price)
+
+            required = required_masks.get(venue.item_bits)
+            if required is None:
+                required = required_masks[venue.item_bits] = venue.item_bits.mask(must_include_items)
+            missing_count = venue.missing_count(required)
+            if missing_count == 0:
+                complete_venues_count += 1
+                top_venues = complete_venues
+            elif missing_count == 1:
+                top_venues = one_missing_venues
+            else:
+                continue
+            # Bounds that need no per-item work, so most venues never get summed
+            missing_items_count = len(venue.missing_items)
+            checkout_price = venue.items_price + venue.checkout_costs()
+            lower_bound = checkout_price + missing_items_count * min_average_price - ROUNDING_SLACK
+            upper_bound = checkout_price + missing_items_count * max_average_price + ROUNDING_SLACK
+            if top_venues.wants(lower_bound, upper_bound):
+                top_venues.offer(venue, venue.total_normalized_price(average_price_map))
+
+        item_price_ranges = {
+            item_to_search: (min(prices), max(prices)) if prices else None for item_to_search, prices in single_item_prices.items()
+        }
+        return cls._from_top_venues(
+            complete_venues, complete_venues_count, one_missing_venues, item_price_ranges, average_price_map, chp_venues
+        )
+
+    @classmethod
+    def from_price_matrix(cls, price_matrix, items_to_search, average_price_map, chp_venues=None, top_k=TOP_K, fallback_k=FALLBACK_K):
+        """The same Ranking as from_venues over the PriceMatrix's venues, with coverage, totals and price ranges
+        taken over the whole matrix at once. Only the venues whose total, give or take its rounding, could
+        place them get their exact total computed."""
+        must_include_items = [item_to_search for item_to_search, must_include in items_to_search if must_include]
+        totals = price_matrix.approximate_totals(average_price_map)
+        missing_counts = price_matrix.missing_counts(must_include_items)
+        complete_rows = np.flatnonzero(missing_counts == 0)
+        complete_venues = TopK(top_k, most_expensive_k=1)
+        one_missing_venues = TopK(fallback_k)
+        for rows, top_venues in [(complete_rows, complete_venues), (np.flatnonzero(missing_counts == 1), one_missing_venues)]:
+            for row in _contenders(totals, rows, top_venues.k, top_venues.most_expensive_k):
+                venue = price_matrix.venues[row]
+                top_venues.offer(venue, venue.total_normalized_price(average_price_map))
+        item_price_ranges = price_matrix.item_price_ranges([item_to_search for item_to_search, _ in items_to_search])
+        return cls._from_top_venues(
+            complete_venues, len(complete_rows), one_missing_venues, item_price_ranges, average_price_map, chp_venues
+        )
+
+    @classmethod
+    def _from_top_venues(cls, complete_venues, complete_venues_count, one_missing_venues, item_price_ranges, average_price_map, chp_venues):
+        cheapest = complete_venues.cheapest()
+        most_expensive = complete_venues.most_expensive()
+        fallback = one_missing_venues.cheapest()
+        chp_prices = [venue.total_price() for venue in chp_venues or []]
+        return cls(
+            top_venues=tuple(venue for _, venue in cheapest),
+            complete_venues_count=complete_venues_count,
+            one_missing_venues=tuple(venue for _, venue in fallback),
+            most_expensive_venue=most_expensive[0][1] if most_expensive else None,
+            min_total=cheapest[0][0] if cheapest else 0,
+            max_total=most_expensive[0][0] if most_expensive else 0,
+            normalized_totals=MappingProxyType({venue.slug: total for total, venue in cheapest + most_expensive + fallback}),
+            item_price_ranges=MappingProxyType(item_price_ranges),
+            average_price_map=MappingProxyType(dict(average_price_map)),
+            chp_min_price=min(chp_prices) if chp_prices else None
+        )
+
+    @property
+    def cheapest_venue(self):
+        return self.top_venues[0] if self.top_venues else None
+
+    def normalized_total(self, venue):
+        total = self.normalized_totals.get(venue.slug)
+        if total is None:
+            return venue.total_normalized_price(self.average_price_map)
+        return total
+
+
+def _contenders(totals, rows, k, most_expensive_k):
+    """The rows whose total could be among the k lowest or most_expensive_k highest, in row order so ties go the same way"""
+    if len(rows) <= k + most_expensive_k:
+        return rows
+    row_totals = totals[rows]
+    # Twice the slack, as both the exact totals and these differ from the true sums by up to the rounding
+    keep = np.zeros(len(rows), dtype=bool)
+    if k:
+        keep |= row_totals <= np.partition(row_totals, k - 1)[k - 1] + 2 * ROUNDING_SLACK
+    if most_expensive_k:
+        keep |= row_totals >= np.partition(row_totals, -most_expensive_k)[-most_expensive_k] - 2 * ROUNDING_SLACK
+    return rows[keep]
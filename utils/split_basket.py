@@ -0,0 +1,220 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import numpy as np
+
+# Venues a basket may be split between by default
+MAX_VENUES = 2
+# How much more than its highest price a missing item costs at least, so buying it wins a tie with leaving it out
+MISSING_ITEM_SLACK = 0.01
+
+
+@dataclass(frozen=True)
+class SplitBasket:
+    """The cheapest way to buy the list from at most max_venues Wolt venues and online stores"""
+    total: float  # Item prices plus venue costs, and missing items at their missing price
+    purchases: tuple  # (venue, ((searched name, price), ...)) per venue bought from, biggest share first
+    venue_costs: float  # Delivery fees, minimum order surcharges and venue_cost of the venues bought from
+    missing_items: tuple  # Searched items none of the chosen venues has
+
+    @classmethod
+    def optimize(cls, wolt_venues, chp_venues, items_to_search, average_price_map, max_venues=MAX_VENUES, venue_cost=0.0):
+        """Exact search over sets of up to max_venues venues for the lowest total.
+
+        Wolt venues add their delivery fee, and the surcharge up to their minimum order for the items
+        bought there; venues whose details weren't fetched count as free. venue_cost is an extra
+        fixed cost of buying from a venue, either a number or a function of the venue.
+        An item none of the chosen venues has costs its average price, or just over the highest price any
+        venue asks for it if that is more, in the search and the total alike, so leaving an item out is
+        never cheaper than buying it.
+        Items no venue has are left out.
+        """
+        searched_names = [item_to_search for item_to_search, _ in items_to_search]
+        column_of = {searched_name: column for column, searched_name in enumerate(searched_names)}
+        venues = list(wolt_venues) + list(chp_venues or [])
+        # Collect cell coordinates first and fill the matrix in one go
+        rows, columns, offer_prices = [], [], []
+        for row, venue in enumerate(venues):
+            for searched_name, price in _offers(venue):
+                column = column_of.get(searched_name)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    offer_prices.append(price)
+        prices = np.full((len(venues), len(searched_names)), np.inf)
+        np.minimum.at(prices, (rows, columns), offer_prices)
+        costs = np.array([
+            (venue_cost(venue) if callable(venue_cost) else venue_cost) + (getattr(venue, 'delivery_fee', None) or 0)
+            for venue in venues
+        ], dtype=float)
+        minimum_orders = np.array([getattr(venue, 'minimum_order', None) or 0 for venue in venues], dtype=float)
+
+        offered = np.isfinite(prices).any(axis=0) if venues else np.zeros(len(searched_names), dtype=bool)
+        if not offered.any():
+            return cls(0.0, (), 0.0, ())
+        searched_names = [searched_name for searched_name, is_offered in zip(searched_names, offered) if is_offered]
+        prices = prices[:, offered]
+        missing_prices = np.array([
+            max(average_price_map.get(searched_name, 0), np.max(column[np.isfinite(column)]) + MISSING_ITEM_SLACK)
+            for searched_name, column in zip(searched_names, prices.T)
+        ])
+
+        chosen = _BranchAndBound(prices, costs, minimum_orders, missing_prices, max_venues).solve()
+        return cls._from_choice(
+            [venues[row] for row in chosen], prices[chosen], costs[chosen], minimum_orders[chosen], searched_names, missing_prices
+        )
+
+    @classmethod
+    def _from_choice(cls, venues, prices, costs, minimum_orders, searched_names, missing_prices):
+        purchases = {row: [] for row in range(len(venues))}
+        missing_items = []
+        missing_total = 0.0
+        for column, searched_name in enumerate(searched_names):
+            row = int(np.argmin(prices[:, column]))
+            if np.isfinite(prices[row, column]):
+                purchases[row].append((searched_name, float(prices[row, column])))
+            else:
+                missing_items.append(searched_name)
+                missing_total += missing_prices[column]
+        # A venue left with nothing to buy isn't ordered from, so its costs don't count
+        rows = sorted((row for row in purchases if purchases[row]), key=lambda row: -len(purchases[row]))
+        spent = {row: sum(price for _, price in purchases[row]) for row in rows}
+        venue_costs = float(sum(costs[row] + max(0.0, minimum_orders[row] - spent[row]) for row in rows))
+        items_total = sum(spent.values())
+        return cls(
+            total=round(items_total + venue_costs + missing_total, 2),
+            purchases=tuple((venues[row], tuple(purchases[row])) for row in rows),
+            venue_costs=round(venue_costs, 2),
+            missing_items=tuple(missing_items)
+        )
+
+
+def _offers(venue):
+    """(searched name, price) pairs of a Wolt venue or an online store"""
+    if hasattr(venue, 'items_by_searched_name'):
+        return ((item.searched_name, item.price) for item in venue.items)
+    return ((searched_name, price) for searched_name, (price, _) in venue.items.items())
+
+
+class _BranchAndBound:
+    """Depth-first search over venue sets for the lowest total.
+
+    A set pays, per item, the cheapest price among its venues. Each venue in turn is taken as the
+    first of a set, with the rest picked from the venues after it, so every set is tried once.
+    Within a branch the candidates are ordered by how much they would save on their own; since
+    adding venues saves at most the sum of what each saves alone, once the best remaining
+    candidates can't beat the best total found the rest of the branch is skipped, and the picks
+    below a candidate are only taken from those that save enough to make up the difference.
+    Minimum order surcharges only ever raise a set's total, so the bounds leave them out and they
+    are only added to the sets that could beat the best total.
+    """
+
+    def __init__(self, offers, costs, minimum_orders, missing_prices, max_venues):
+        # Chains list the same prices at many venues, only one of each identical row needs trying
+        _, unique_rows = np.unique(np.column_stack([offers, costs, minimum_orders]), axis=0, return_index=True)
+        prices = np.minimum(offers[unique_rows], missing_prices)
+        order = np.lexsort((unique_rows, prices.sum(axis=1) + costs[unique_rows]))
+        self.rows = unique_rows[order]
+        # float32 halves the memory traffic; the chosen basket's total is recomputed exactly
+        self.prices = prices[order].astype(np.float32)
+        self.offers = offers[self.rows].astype(np.float32)
+        self.costs = costs[self.rows].astype(np.float32)
+        self.minimum_orders = minimum_orders[self.rows].astype(np.float32)
+        self.has_minimum_orders = bool(self.minimum_orders.any())
+        self.own_totals = self.prices.sum(axis=1) + self.costs
+        self.max_venues = max_venues
+        self._cheapest = np.empty_like(self.prices)
+        self._ones = np.ones(self.prices.shape[1], dtype=np.float32)
+        totals = self.own_totals + self._surcharges([], np.arange(len(self.prices)))
+        best = int(np.argmin(totals))
+        self.best_total = float(totals[best])
+        self.best_choice = [best]
+
+    def solve(self):
+        if self.max_venues > 1:
+            for row in range(len(self.prices)):
+                self._extend(
+                    [row], self.prices[row], float(self.own_totals[row]),
+                    np.arange(row + 1, len(self.prices)), self.prices[row + 1:], self.costs[row + 1:], self.max_venues - 1
+                )
+        return [int(self.rows[row]) for row in self.best_choice]
+
+    def _surcharges(self, chosen, candidates):
+        """Minimum order surcharges of chosen plus each of candidates, with every item bought where it's cheapest"""
+        if not self.has_minimum_orders:
+            return 0
+        offers = self.offers[candidates]
+        if chosen:
+            chosen_offers = self.offers[chosen]
+            best_offers, owners = chosen_offers.min(axis=0), chosen_offers.argmin(axis=0)
+        else:
+            best_offers, owners = np.full(offers.shape[1], np.inf, dtype=np.float32), None
+        # A candidate takes over the items it is strictly cheaper for, ties stay with the venues chosen first
+        taken = offers < best_offers
+        surcharges = np.maximum(self.minimum_orders[candidates] - np.where(taken, offers, 0).sum(axis=1), 0)
+        spent = np.where(np.isfinite(best_offers), best_offers, 0)
+        for position, row in enumerate(chosen):
+            if self.minimum_orders[row]:
+                kept = np.where(owners == position, spent, 0)
+                surcharges += np.maximum(self.minimum_orders[row] - (kept.sum() - taken @ kept), 0)
+        return surcharges
+
+    def _consider(self, chosen, total):
+        """Take chosen as the best set if its total, with surcharges, beats the best found"""
+        if self.has_minimum_orders:
+            total += self._surcharges(chosen[:-1], chosen[-1:])[0]
+        if total < self.best_total:
+            self.best_total = float(total)
+            self.best_choice = chosen
+
+    def _pick_last(self, chosen, totals, candidates):
+        """Take the best of chosen plus one of candidates, given their totals before surcharges"""
+        if self.has_minimum_orders:
+            hopeful = np.flatnonzero(totals < self.best_total)
+            if not len(hopeful):
+                return
+            totals, candidates = totals[hopeful] + self._surcharges(chosen, candidates[hopeful]), candidates[hopeful]
+        best = int(np.argmin(totals))
+        if totals[best] < self.best_total:
+            self.best_total = float(totals[best])
+            self.best_choice = chosen + [int(candidates[best])]
+
+    def _extend(self, chosen, item_costs, total, rows, prices, costs, picks_left):
+        if not len(rows):
+            return
+        # The totals with each candidate added, from the item costs' row sums as one product
+        cheapest = np.minimum(prices, item_costs, out=self._cheapest[:len(rows)])
+        totals = cheapest @ self._ones + costs + (total - item_costs.sum())
+        if picks_left == 1:
+            self._pick_last(chosen, totals, rows)
+            return
+
+        savings = total - totals
+
+        # A candidate can only be in a better set if it saves what the best picks_left - 1 others can't make up
+        others = np.maximum(np.partition(savings, -picks_left + 1)[-picks_left + 1:], 0).sum() if len(savings) >= picks_left else 0
+        order = np.flatnonzero(savings > max(total - self.best_total - others, 0))
+        order = order[np.argsort(-savings[order], kind='stable')]
+        # Copied into savings order once, so every branch below works on a slice
+        rows, prices, costs, savings = rows[order], prices[order], costs[order], savings[order]
+        # What a branch can save at most: its first candidate plus the next picks_left - 1 after it
+        positive_sums = np.concatenate([[0], np.cumsum(savings)])
+        positions = np.arange(len(savings))
+        bounds = total - savings - (positive_sums[np.minimum(positions + picks_left, len(savings))] - positive_sums[positions + 1])
+        # Plain floats from here on, the loop below runs once per branch
+        savings, bounds, positive_sums = savings.tolist(), bounds.tolist(), positive_sums.tolist()
+        descending_savings = [-saving for saving in savings]
+        for position, saving in enumerate(savings):
+            if bounds[position] >= self.best_total:
+                break
+            row, row_total = int(rows[position]), total - saving
+            if row_total < self.best_total:
+                self._consider(chosen + [row], row_total)
+            # Each pick below has to save what the others can't make up for on their own
+            others = positive_sums[min(position + picks_left - 1, len(savings))] - positive_sums[position + 1]
+            needed = max(row_total - self.best_total - others, 0)
+            end = max(bisect_left(descending_savings, -needed), position + 1)
+            self._extend(
+                chosen + [row], np.minimum(item_costs, prices[position]), row_total,
+                rows[position + 1:end], prices[position + 1:end], costs[position + 1:end], picks_left - 1
+            )
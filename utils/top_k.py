@@ -0,0 +1,57 @@
+import heapq
+
+# Venue totals are rounded to agorot, so bounds taken on unrounded sums get half an agora of slack and then some
+ROUNDING_SLACK = 0.01
+
+
+class TopK:
+    """The k cheapest and most_expensive_k most expensive venues offered, kept in bounded heaps.
+
+    Callers check wants() with cheap bounds on a venue's total before computing the total itself,
+    so venues that cannot make either heap are skipped. Ties go to the venue offered first, the
+    same order a stable sort would give.
+    """
+
+    def __init__(self, k, most_expensive_k=0):
+        self.k = k
+        self.most_expensive_k = most_expensive_k
+        self._cheapest = []  # (-total, -order, venue), the root is the most expensive of the cheapest
+        self._most_expensive = []  # (total, -order, venue), the root is the cheapest of the most expensive
+        self._offered = 0
+
+    def wants(self, lower_bound, upper_bound=float('inf')):
+        """Whether a venue whose total lies within the bounds could enter either heap"""
+        return self._could_be_cheapest(lower_bound) or self._could_be_most_expensive(upper_bound)
+
+    def _could_be_cheapest(self, lower_bound):
+        if len(self._cheapest) < self.k:
+            return True
+        return bool(self._cheapest) and lower_bound < -self._cheapest[0][0]
+
+    def _could_be_most_expensive(self, upper_bound):
+        if len(self._most_expensive) < self.most_expensive_k:
+            return True
+        return bool(self._most_expensive) and upper_bound > self._most_expensive[0][0]
+
+    def offer(self, venue, total):
+        order = self._offered
+        self._offered += 1
+        if self._could_be_cheapest(total):
+            self._push(self._cheapest, self.k, (-total, -order, venue))
+        if self._could_be_most_expensive(total):
+            self._push(self._most_expensive, self.most_expensive_k, (total, -order, venue))
+
+    @staticmethod
+    def _push(heap, size, entry):
+        if len(heap) < size:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heapreplace(heap, entry)
+
+    def cheapest(self):
+        """(total, venue) pairs, cheapest first"""
+        return [(-total, venue) for total, _, venue in sorted(self._cheapest, reverse=True)]
+
+    def most_expensive(self):
+        """(total, venue) pairs, most expensive first"""
+        return [(total, venue) for total, _, venue in sorted(self._most_expensive, reverse=True)]